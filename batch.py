@@ -0,0 +1,168 @@
+"""Command line runner for command scripts over pcn files.
+
+A command script, like input/cmd1.txt, holds one command per line on
+numbered function slots; `r N` reads N.pcn from the input directory and
+`p N` writes slot N to N.pcn in the output directory:
+
+    r N        read N.pcn into slot N
+    ! d s      slot d = complement of slot s
+    + d a b    slot d = slot a OR slot b
+    & d a b    slot d = slot a AND slot b
+    ^ d a b    slot d = slot a XOR slot b
+    sx d s x   slot d = smoothing of slot s with respect to x
+    cx d s x   slot d = consensus of slot s with respect to x
+    bx d s x   slot d = boolean difference of slot s with respect to x
+    p N        write slot N to N.pcn
+    q          stop the script
+
+Every script is run on every input directory (the script's own directory
+by default), the jobs are spread over a process pool and the timing of
+each command is written as JSON.
+
+    python batch.py input/cmd1.txt --workers 4 --bdd --json timings.json
+"""
+import argparse
+import concurrent.futures
+import importlib
+import json
+import os
+import sys
+import time
+import boolfunc
+import pcn
+
+# commands on a slot and a variable and the expression method implementing them
+VARIABLE_COMMANDS = {"sx": "smoothingWith", "cx": "consensusWith", "bx": "boolDiffWith"}
+# binary commands and the expression method implementing them
+BINARY_COMMANDS = {"+": "orExp", "&": "andExp", "^": "xorExp"}
+
+
+def parseScript(filePath):
+    """returns the commands of a script as (line number, name, int arguments) tuples"""
+    commands = list()
+    with open(filePath) as f:
+        for number, line in enumerate(f, 1):
+            words = line.split()
+            if not words or words[0].startswith("#"):
+                continue
+            try:
+                commands.append((number, words[0], tuple(map(int, words[1:]))))
+            except ValueError as error:
+                raise ValueError(f"{filePath}:{number}: bad command {line.strip()}") from error
+    return commands
+
+
+def _execute(slots, name, args, inputDir, outputDir, backend, withBdd):
+    """runs one command on the slots, returns the fields recorded for it"""
+    record = dict()
+    if name == "r":
+        (n,) = args
+        slots[n] = boolfunc.Expression(cubes=pcn.CubeSource(
+            os.path.join(inputDir, f"{n}.pcn")), backend=backend)
+        result = slots[n]
+    elif name == "!":
+        d, s = args
+        result = slots[d] = slots[s].complement()
+    elif name in BINARY_COMMANDS:
+        d, a, b = args
+        result = slots[d] = getattr(slots[a], BINARY_COMMANDS[name])(slots[b])
+    elif name in VARIABLE_COMMANDS:
+        d, s, x = args
+        result = slots[d] = getattr(slots[s], VARIABLE_COMMANDS[name])(x)
+    elif name == "p":
+        (n,) = args
+        result = slots[n]
+        pcn.write_cubes(os.path.join(outputDir, f"{n}.pcn"), result.cubes, result.numVars)
+        if withBdd:
+            # imported here so that plain cube-list jobs do not load the bdd engine
+            import myBdd
+            bdd = myBdd.BDD(result)
+            record["nodes"] = bdd.manager.countNodes(bdd.root)
+            record["satCount"] = str(bdd.satCount())
+    else:
+        raise ValueError(f"unknown command {name}")
+    record["cubes"] = len(result.cubes)
+    return record
+
+
+def runScript(scriptPath, inputDir=None, outputDir="output", backend="urp", withBdd=False):
+    """runs a command script, returns the job record with the timing of every command"""
+    inputDir = os.path.dirname(scriptPath) if inputDir is None else inputDir
+    job = {"script": scriptPath, "input": inputDir, "output": outputDir,
+           "backend": backend, "commands": list(), "error": None}
+    start = time.perf_counter()
+    try:
+        module = importlib.import_module(backend)
+        os.makedirs(outputDir, exist_ok=True)
+        slots = dict()
+        for number, name, args in parseScript(scriptPath):
+            if name == "q":
+                break
+            job["line"] = number
+            tic = time.perf_counter()
+            record = _execute(slots, name, args, inputDir, outputDir, module, withBdd)
+            record.update(line=number, command=" ".join(map(str, (name,) + args)),
+                          seconds=time.perf_counter() - tic)
+            job["commands"].append(record)
+    except Exception as error:
+        # a failing job is reported, the other jobs of the batch still run
+        job["error"] = f"{type(error).__name__}: {error}".rstrip(": ")
+    else:
+        job.pop("line", None)
+    job["seconds"] = time.perf_counter() - start
+    return job
+
+
+def _jobs(scripts, inputDirs, outputDir):
+    """returns the (script, input directory, output directory) of every job"""
+    jobs = list()
+    for script in scripts:
+        for inputDir in inputDirs or (None,):
+            name = os.path.splitext(os.path.basename(script))[0]
+            if inputDir is not None:
+                name += "-" + os.path.basename(os.path.normpath(inputDir))
+            jobs.append((script, inputDir, os.path.join(outputDir, name)))
+    return jobs
+
+
+def runBatch(scripts, inputDirs=(), outputDir="output", workers=None,
+             backend="urp", withBdd=False):
+    """runs every script on every input directory, returns the job records in order"""
+    jobs = _jobs(scripts, inputDirs, outputDir)
+    if workers == 1 or len(jobs) == 1:
+        return [runScript(s, i, o, backend, withBdd) for s, i, o in jobs]
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(runScript, s, i, o, backend, withBdd) for s, i, o in jobs]
+        return [future.result() for future in futures]
+
+
+def main(argv=None):
+    """command line entry point, returns the process exit status"""
+    parser = argparse.ArgumentParser(description="run command scripts over pcn files")
+    parser.add_argument("scripts", nargs="+", help="command script files")
+    parser.add_argument("-i", "--input", action="append", dest="inputs", default=[],
+                        help="input directory of the N.pcn files, may be repeated "
+                             "(default: the directory of each script)")
+    parser.add_argument("-o", "--output", default="output",
+                        help="output directory, one subdirectory per job")
+    parser.add_argument("-w", "--workers", type=int, default=None,
+                        help="number of worker processes (default: one per cpu)")
+    parser.add_argument("-b", "--backend", default="urp",
+                        choices=("urp", "bitcubes", "npcubes"), help="cube-list backend")
+    parser.add_argument("--bdd", action="store_true",
+                        help="also build the bdd of every printed slot")
+    parser.add_argument("--json", default="-", help="timing output file (default: stdout)")
+    args = parser.parse_args(argv)
+    results = runBatch(args.scripts, args.inputs, args.output, args.workers,
+                       args.backend, args.bdd)
+    if args.json == "-":
+        json.dump(results, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+    else:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    return 1 if any(job["error"] for job in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,201 @@
+"""Module which saves and loads built BDDs in a binary node table format.
+
+The format follows DDDMP: a header, the variable ordering, the internal
+nodes in topological order (children before parents) as (var, lo, hi)
+triples of int32 and the root edges. File index 0 is the terminal and
+internal node i is stored at index i + 1; edges are written as the file
+index shifted left by one with the complement bit in bit 0, as in the
+manager, so a loader rebuilds the unique table in one linear pass over the
+mapped file.
+
+The header also holds the SHA-256 of the canonical source cover, so a
+cache directory can look up a prebuilt BDD by the cover it was built from.
+dumps and loads use the same format in memory, e.g. to ship BDDs between
+processes.
+"""
+import hashlib
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from array import array
+import urp
+from manager import BDDManager
+
+MAGIC = b"BDDB"
+VERSION = 2
+# magic, version, number of variables, number of levels, number of internal
+# nodes, number of roots, SHA-256 of the source cover (zero when unknown)
+HEADER = struct.Struct("<4sIIIII32s")
+NOHASH = bytes(32)
+# extension of the files written to a cache directory
+EXTENSION = ".bdd"
+
+
+def _int32(values):
+    """returns the little endian int32 bytes of values"""
+    data = array("i", values)
+    if sys.byteorder != "little":
+        data.byteswap()
+    return data.tobytes()
+
+
+def coverHash(cubes, numVars, ordering=None):
+    """returns the SHA-256 digest of a cover, equal for covers with the same cubes
+
+    The cubes are hashed in canonical form, so the order of the cubes and of
+    their literals does not matter; an ordering list or heuristic name, when
+    given, is hashed too, as the bdd depends on it.
+    """
+    digest = hashlib.sha256()
+    digest.update(struct.pack("<I", numVars))
+    for cube in urp.canonical(cubes):
+        digest.update(_int32((len(cube),) + cube))
+    if ordering is not None:
+        digest.update(repr(ordering if isinstance(ordering, str) else list(ordering)).encode())
+    return digest.digest()
+
+
+def save(filePath, manager, roots, sourceHash=None):
+    """writes the nodes reachable from roots, the ordering and the roots to filePath"""
+    with open(filePath, "wb") as f:
+        f.write(dumps(manager, roots, sourceHash))
+
+
+def dumps(manager, roots, sourceHash=None):
+    """returns the saved form of the nodes reachable from roots as bytes"""
+    # file edge of every regular manager edge
+    index = {manager.ONE: 0}
+    rows = array("i")
+    nodes = manager.nodes
+    for root in roots:
+        if root & ~1 in index:
+            continue
+        # post order numbering stores the children before their parents
+        for u in manager.postorder(root):
+            if u not in index:
+                index[u] = len(index) << 1
+                lo, hi = nodes.lo[u >> 1], nodes.hi[u >> 1]
+                rows.extend((nodes.var[u >> 1], index[lo & ~1] | lo & 1, index[hi]))
+    if sys.byteorder != "little":
+        rows.byteswap()
+    header = HEADER.pack(MAGIC, VERSION, manager.numVars, len(manager.ordering),
+                         len(index) - 1, len(roots), sourceHash or NOHASH)
+    return b"".join((header, _int32(manager.ordering), rows.tobytes(),
+                     _int32(index[r & ~1] | r & 1 for r in roots)))
+
+
+def readHeader(filePath):
+    """returns the (numVars, ordering, source hash) of a saved bdd file"""
+    with open(filePath, "rb") as f:
+        try:
+            magic, version, numVars, numLevels, _, _, digest = HEADER.unpack(f.read(HEADER.size))
+            if magic != MAGIC or version != VERSION:
+                raise ValueError("not a bdd file")
+            ordering = array("i", f.read(4 * numLevels))
+        except Exception as error:
+            raise AssertionError("Bad bdd file {}".format(filePath)) from error
+    if sys.byteorder != "little":
+        ordering.byteswap()
+    return numVars, list(ordering), None if digest == NOHASH else digest
+
+
+def load(filePath, manager=None):
+    """rebuilds a saved bdd, returns the manager and the list of root indices
+
+    Without a manager a new one with the saved ordering is created; a given
+    manager must have the saved ordering. The file is mapped and every node
+    goes through the unique table once, no cofactoring is done.
+    """
+    with open(filePath, "rb") as f, \
+            mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        view = memoryview(mm)
+        try:
+            return _load(view, filePath, manager)
+        finally:
+            view.release()
+
+
+def loads(data, manager=None):
+    """rebuilds a bdd from the bytes returned by dumps, returns the manager and the roots"""
+    with memoryview(data) as view:
+        return _load(view, "<bytes>", manager)
+
+
+def _load(view, name, manager):
+    """rebuilds the bdd saved in the memoryview view, name is used in errors"""
+    ints = None
+    try:
+        try:
+            magic, version, numVars, numLevels, numNodes, numRoots, _ = \
+                HEADER.unpack_from(view)
+            if magic != MAGIC or version != VERSION:
+                raise ValueError("not a bdd file")
+            end = HEADER.size + 4 * (numLevels + 3 * numNodes + numRoots)
+            if len(view) < end:
+                raise ValueError("truncated bdd file")
+        except (ValueError, struct.error) as error:
+            raise AssertionError("Bad bdd file {}".format(name)) from error
+        if sys.byteorder == "little":
+            ints = view[HEADER.size:end].cast("i")
+        else:
+            ints = array("i", view[HEADER.size:end])
+            ints.byteswap()
+        ordering = list(ints[:numLevels])
+        if manager is not None and ordering != manager.ordering:
+            raise ValueError("saved ordering does not match the manager ordering")
+        try:
+            return _rebuild(ints, numVars, ordering, numNodes, numRoots, manager)
+        except ValueError as error:
+            raise AssertionError("Bad bdd file {}".format(name)) from error
+    finally:
+        if isinstance(ints, memoryview):
+            ints.release()
+
+
+def _rebuild(ints, numVars, ordering, numNodes, numRoots, manager):
+    """rebuilds the node table stored in ints, returns the manager and the roots"""
+    if manager is None:
+        manager = BDDManager(ordering, numVars)
+    levels = manager.levels
+    numLevels = len(ordering)
+    # regular edge of every file index, and its level to check the ordering of the file
+    mapping = [manager.ONE]
+    depth = [numLevels]
+    for i in range(numLevels, numLevels + 3 * numNodes, 3):
+        var, lo, hi = ints[i], ints[i + 1], ints[i + 2]
+        level = levels.get(var)
+        # children are stored before their parents and below them in the ordering,
+        # and the hi edge is never complemented
+        if level is None or not (0 <= lo >> 1 < len(mapping) and 0 <= hi >> 1 < len(mapping)) \
+                or lo == hi or hi & 1 or depth[lo >> 1] <= level or depth[hi >> 1] <= level:
+            raise ValueError("invalid node")
+        mapping.append(manager.getNode(var, mapping[lo >> 1] | lo & 1, mapping[hi >> 1]))
+        depth.append(level)
+    start = numLevels + 3 * numNodes
+    roots = list()
+    for i in range(start, start + numRoots):
+        if not 0 <= ints[i] >> 1 < len(mapping):
+            raise ValueError("invalid root")
+        roots.append(mapping[ints[i] >> 1] | ints[i] & 1)
+    return manager, roots
+
+
+def cachePath(cacheDir, digest):
+    """returns the path of the cached bdd with the given cover digest"""
+    return os.path.join(cacheDir, digest.hex() + EXTENSION)
+
+
+def store(cacheDir, manager, roots, digest):
+    """saves a bdd into the cache directory, atomically replacing any previous file"""
+    os.makedirs(cacheDir, exist_ok=True)
+    # a reader never sees a partially written file
+    fd, tmpPath = tempfile.mkstemp(suffix=EXTENSION, dir=cacheDir)
+    os.close(fd)
+    try:
+        save(tmpPath, manager, roots, digest)
+        os.replace(tmpPath, cachePath(cacheDir, digest))
+    except BaseException:
+        os.unlink(tmpPath)
+        raise
@@ -0,0 +1,163 @@
+"""Generators of parametric Boolean function families for the benchmark suite.
+
+Every generator takes a size parameter and returns a Case: the number of
+variables, the ordering and either a cube list built with buildBDD (so
+that the URP cofactoring is measured) or a function building the roots
+with the manager operations (for circuits whose covers are exponential,
+and for CNFs whose cover comes from a complement).
+"""
+import os
+import random
+import sys
+from collections import namedtuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import boolfunc  # noqa: E402
+import myBdd  # noqa: E402
+
+# cubes is a cube list built with buildBDD, build(manager) returns the root
+# nodes of the circuit families; exactly one of them is set
+Case = namedtuple("Case", ("numVars", "ordering", "cubes", "build"))
+
+
+def readme(n, good=True):
+    """x1.x2 + x3.x4 + ... + x(2n-1).x(2n), linear in the good ordering and
+    exponential when the odd variables all come before the even ones"""
+    cubes = tuple((2 * i + 1, 2 * i + 2) for i in range(n))
+    if good:
+        ordering = list(range(1, 2 * n + 1))
+    else:
+        ordering = list(range(1, 2 * n + 1, 2)) + list(range(2, 2 * n + 1, 2))
+    return Case(2 * n, ordering, cubes, None)
+
+
+def _operands(n):
+    """returns the variables of two n bit operands a and b, interleaved from bit 0"""
+    a = [2 * i + 1 for i in range(n)]
+    b = [2 * i + 2 for i in range(n)]
+    return a, b
+
+
+def _fullAdder(m, x, y, carry):
+    """returns the sum and carry nodes of a full adder"""
+    s = m.apply("xor", m.apply("xor", x, y), carry)
+    c = m.apply("or", m.apply("and", x, y), m.apply("and", carry, m.apply("xor", x, y)))
+    return s, c
+
+
+def adder(n):
+    """the n + 1 output bits of an n bit ripple carry adder"""
+    a, b = _operands(n)
+
+    def build(m):
+        carry, outputs = m.ZERO, list()
+        for x, y in zip(a, b):
+            s, carry = _fullAdder(m, m.variable(x), m.variable(y), carry)
+            outputs.append(s)
+        return outputs + [carry]
+    return Case(2 * n, list(range(1, 2 * n + 1)), None, build)
+
+
+def comparator(n):
+    """a < b for two n bit unsigned operands, most significant bits first"""
+    a, b = _operands(n)
+    ordering = [v for i in reversed(range(n)) for v in (a[i], b[i])]
+
+    def build(m):
+        less = m.ZERO
+        # from the least significant bit: a < b iff a_i < b_i or a_i = b_i and the rest is less
+        for x, y in zip(a, b):
+            vx, vy = m.variable(x), m.variable(y)
+            lt = m.apply("and", m.neg(vx), vy)
+            less = m.apply("or", lt, m.apply("and", m.apply("xnor", vx, vy), less))
+        return [less]
+    return Case(2 * n, ordering, None, build)
+
+
+def multiplier(n):
+    """the middle output bit n - 1 of an n by n bit array multiplier, exponential in any ordering"""
+    a, b = _operands(n)
+
+    def build(m):
+        # partial products are added row by row with ripple carry adders
+        total = [m.ZERO] * (2 * n)
+        for j, y in enumerate(b):
+            carry = m.ZERO
+            for i, x in enumerate(a):
+                product = m.apply("and", m.variable(x), m.variable(y))
+                total[i + j], carry = _fullAdder(m, total[i + j], product, carry)
+            total[j + n] = carry
+        return [total[n - 1]]
+    return Case(2 * n, list(range(1, 2 * n + 1)), None, build)
+
+
+def queens(n):
+    """the n-queens problem: one queen per row and no two queens attacking each other"""
+    def cell(i, j):
+        return i * n + j + 1
+
+    def build(m):
+        result = m.ONE
+        for i in range(n):
+            row = m.ZERO
+            for j in range(n):
+                row = m.apply("or", row, m.variable(cell(i, j)))
+            result = m.apply("and", result, row)
+            for j in range(n):
+                # a queen on (i, j) excludes every cell it attacks
+                free = m.ONE
+                for k in range(n):
+                    for l in range(n):
+                        if (k, l) != (i, j) and (k == i or l == j or abs(k - i) == abs(l - j)):
+                            free = m.apply("and", free, m.neg(m.variable(cell(k, l))))
+                result = m.apply("and", result, m.ite(m.variable(cell(i, j)), free, m.ONE))
+        return [result]
+    return Case(n * n, list(range(1, n * n + 1)), None, build)
+
+
+def parity(n):
+    """x1 ^ x2 ^ ... ^ xn built as a chain of xor operations"""
+    def build(m):
+        result = m.ZERO
+        for v in range(1, n + 1):
+            result = m.apply("xor", result, m.variable(v))
+        return [result]
+    return Case(n, list(range(1, n + 1)), None, build)
+
+
+def _randomCubes(numVars, numCubes, k, seed):
+    """returns numCubes random cubes of k literals over numVars variables"""
+    rng = random.Random(seed)
+    return tuple(tuple(v if rng.random() < 0.5 else -v
+                       for v in sorted(rng.sample(range(1, numVars + 1), k)))
+                 for _ in range(numCubes))
+
+
+def dnf(n, k=3, ratio=2, seed=1):
+    """a random k-DNF with ratio * n cubes over n variables"""
+    return Case(n, list(range(1, n + 1)), _randomCubes(n, ratio * n, k, seed), None)
+
+
+def cnf(n, k=3, ratio=2, seed=1):
+    """a random k-CNF with ratio * n clauses, turned into a cover by urp.complement"""
+    # the product of the clauses is the complement of the or of the negated clauses
+    negated = _randomCubes(n, ratio * n, k, seed)
+
+    def build(m):
+        exp = boolfunc.Expression(cubes=negated, numVars=n).complement()
+        return [myBdd.buildBDD(exp, m)]
+    return Case(n, list(range(1, n + 1)), None, build)
+
+
+# family name, generator and sizes of the quick and full presets
+FAMILIES = (
+    ("readme-good", readme, (8, 16), (16, 64)),
+    ("readme-bad", lambda n: readme(n, good=False), (6, 8), (8, 10)),
+    ("adder", adder, (8, 16), (16, 32)),
+    ("comparator", comparator, (8, 16), (16, 64)),
+    ("multiplier", multiplier, (4, 5), (6, 7)),
+    ("queens", queens, (4, 5), (6, 7)),
+    ("parity", parity, (16, 64), (64, 256)),
+    ("dnf", dnf, (12, 16), (20, 24)),
+    ("cnf", cnf, (10, 12), (14, 16)),
+)
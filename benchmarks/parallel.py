@@ -0,0 +1,93 @@
+"""Speedup of the parallel BDD build against the number of workers.
+
+Builds the cube-list families of families.py serially with buildBDD and
+then with buildParallel for every worker count, checks that every build
+gives the same root and records the best time of each and its speedup over
+the serial build. The speedup is bounded by the cpus of the machine and by
+the serial cofactoring of the split levels in the parent.
+
+Usage: python benchmarks/parallel.py [--workers 1 2 4 8] [--split-depth 3]
+                                     [--family dnf] [--output parallel.json]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import boolfunc  # noqa: E402
+import myBdd  # noqa: E402
+import urp  # noqa: E402
+from manager import BDDManager  # noqa: E402
+from families import dnf, readme  # noqa: E402
+
+# family name and sizes, only the families given as cube lists are built by cofactoring
+FAMILIES = (
+    ("readme-bad", lambda n: readme(n, good=False), (9, 10)),
+    ("dnf", dnf, (20, 24)),
+)
+
+
+def timeBuild(case, workers, splitDepth, repeat):
+    """returns the best build time of a case and the node count of its root"""
+    seconds = float("inf")
+    for _ in range(repeat):
+        urp.clearComplementCache()
+        manager = BDDManager(case.ordering, case.numVars)
+        exp = boolfunc.Expression(cubes=case.cubes, numVars=case.numVars)
+        start = time.perf_counter()
+        if workers is None:
+            root = myBdd.buildBDD(exp, manager)
+        else:
+            root = myBdd.buildParallel(exp, manager, workers, splitDepth)
+        seconds = min(seconds, time.perf_counter() - start)
+    return seconds, manager.countNodes(root)
+
+
+def run(workerCounts, splitDepth, only=None, repeat=3):
+    """returns the serial and parallel build times of every case, keyed by case name"""
+    results = dict()
+    for name, generator, sizes in FAMILIES:
+        if only and name not in only:
+            continue
+        for n in sizes:
+            case = generator(n)
+            serial, nodes = timeBuild(case, None, splitDepth, repeat)
+            record = {"numVars": case.numVars, "nodes": nodes, "serialSeconds": serial,
+                      "splitDepth": splitDepth, "workers": dict()}
+            for workers in workerCounts:
+                seconds, parallelNodes = timeBuild(case, workers, splitDepth, repeat)
+                if parallelNodes != nodes:
+                    raise AssertionError(f"{name}-{n}: {parallelNodes} nodes in parallel, "
+                                         f"{nodes} serially")
+                record["workers"][workers] = {"seconds": seconds, "speedup": serial / seconds}
+            results[f"{name}-{n}"] = record
+    return results
+
+
+def main(argv=None):
+    """command line entry point, returns the process exit status"""
+    parser = argparse.ArgumentParser(description="parallel build speedup of the bdd package")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--split-depth", type=int, default=myBdd.BDD.SPLITDEPTH)
+    parser.add_argument("--family", action="append", help="only run these families")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="number of timed builds, the best time is kept")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    args = parser.parse_args(argv)
+    results = run(args.workers, args.split_depth, args.family, args.repeat)
+    print(f"cpus {os.cpu_count()}")
+    print(f"{'case':>14} {'nodes':>8} {'serial s':>9} " +
+          " ".join(f"{f'{w} workers':>12}" for w in args.workers))
+    for key, r in results.items():
+        print(f"{key:>14} {r['nodes']:>8} {r['serialSeconds']:>9.4f} " +
+              " ".join(f"{r['workers'][w]['speedup']:>11.2f}x" for w in args.workers))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
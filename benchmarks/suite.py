@@ -0,0 +1,153 @@
+"""Benchmark suite over the parametric function families of families.py.
+
+Every case is built in a fresh manager and the suite records the build
+time, the time of a post order and a breadth first traversal of the
+result, the peak memory of the build (tracemalloc, measured in a second
+build so it does not slow the timed one), the node count of the roots and
+the number of calls to every urp function, counted with instrument.profile
+in a third build, and the unique table hit rate. Results are written as JSON
+and can be compared against a stored baseline: node and urp call counts
+must match exactly, times may not grow past the given ratio.
+
+Usage: python benchmarks/suite.py [--preset quick|full] [--output results.json]
+                                  [--baseline benchmarks/baseline.json] [--save-baseline]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import instrument  # noqa: E402
+import myBdd  # noqa: E402
+import urp  # noqa: E402
+from manager import BDDManager  # noqa: E402
+from families import FAMILIES  # noqa: E402
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+
+def build(case):
+    """builds a case in a fresh manager, returns the manager and the roots"""
+    # memoized complements of an earlier case must not make this one faster
+    urp.clearComplementCache()
+    manager = BDDManager(case.ordering, case.numVars)
+    if case.cubes is not None:
+        exp = myBdd.boolfunc.Expression(cubes=case.cubes, numVars=case.numVars)
+        return manager, [myBdd.buildBDD(exp, manager)]
+    return manager, case.build(manager)
+
+
+def runCase(case, repeat=3):
+    """returns the measurements of one case, the times are the best of repeat builds"""
+    seconds = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        manager, roots = build(case)
+        seconds = min(seconds, time.perf_counter() - start)
+    traversal = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for root in roots:
+            for _ in manager.postorder(root):
+                pass
+            for _ in manager.bfs(root):
+                pass
+        traversal = min(traversal, time.perf_counter() - start)
+    nodes = manager.countNodes(*roots)
+    del manager, roots
+    # the counting wrappers would slow the timed build down, count in another one
+    with instrument.profile() as stats:
+        build(case)
+    calls = {name[len("urp."):]: r[0] for name, r in stats.functions.items()
+             if name.startswith("urp.")}
+    tracemalloc.start()
+    try:
+        build(case)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        "numVars": case.numVars,
+        "nodes": nodes,
+        "seconds": seconds,
+        "traversalSeconds": traversal,
+        "peakBytes": peak,
+        "urpCalls": dict(sorted(calls.items())),
+        "uniqueHitRate": stats.hitRate(),
+    }
+
+
+def runSuite(preset="quick", only=None, repeat=3):
+    """returns the results of every case of the preset, keyed by family and size"""
+    results = dict()
+    for name, generator, quick, full in FAMILIES:
+        if only and name not in only:
+            continue
+        for n in (quick if preset == "quick" else full):
+            results[f"{name}-{n}"] = runCase(generator(n), repeat)
+    return results
+
+
+def compare(results, baseline, maxRatio=2.0, minSeconds=0.01):
+    """returns the list of regressions of results against a baseline
+
+    Node and urp call counts must match exactly; build and traversal times
+    are only compared when the baseline time is above minSeconds.
+    """
+    regressions = list()
+    for key, old in baseline.items():
+        new = results.get(key)
+        if new is None:
+            continue
+        if new["nodes"] != old["nodes"]:
+            regressions.append(f"{key}: nodes {old['nodes']} -> {new['nodes']}")
+        if new["urpCalls"] != old["urpCalls"]:
+            regressions.append(f"{key}: urp calls {old['urpCalls']} -> {new['urpCalls']}")
+        for field in ("seconds", "traversalSeconds"):
+            if old[field] >= minSeconds and new[field] > maxRatio * old[field]:
+                regressions.append(f"{key}: {field} {old[field]:.4f} -> {new[field]:.4f}")
+    return regressions
+
+
+def main(argv=None):
+    """command line entry point, returns the process exit status"""
+    parser = argparse.ArgumentParser(description="benchmark suite of the bdd package")
+    parser.add_argument("--preset", choices=("quick", "full"), default="quick")
+    parser.add_argument("--family", action="append", help="only run these families")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--baseline", default=BASELINE, help="baseline JSON file")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="store the results as the new baseline")
+    parser.add_argument("--max-ratio", type=float, default=2.0,
+                        help="largest allowed time ratio against the baseline")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="number of timed builds, the best time is kept")
+    args = parser.parse_args(argv)
+    results = runSuite(args.preset, args.family, args.repeat)
+    print(f"{'case':>18} {'vars':>5} {'nodes':>8} {'build s':>9} {'walk s':>8} "
+          f"{'peak KiB':>9} {'urp calls':>10}")
+    for key, r in results.items():
+        print(f"{key:>18} {r['numVars']:>5} {r['nodes']:>8} {r['seconds']:>9.4f} "
+              f"{r['traversalSeconds']:>8.4f} {r['peakBytes'] / 1024:>9.1f} "
+              f"{sum(r['urpCalls'].values()):>10}")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=2)
+        return 0
+    if not os.path.exists(args.baseline):
+        return 0
+    with open(args.baseline) as f:
+        regressions = compare(results, json.load(f), args.max_ratio)
+    for line in regressions:
+        print("regression:", line)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
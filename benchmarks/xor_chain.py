@@ -0,0 +1,69 @@
+"""Benchmark of urp.cubes_xor on chained XOR functions.
+
+Builds t(1) ^ t(2) ^ ... ^ t(n) one term at a time with cubes_xor for a few
+term families and reports the cover size and runtime of the memoized,
+containment-pruned complement against the previous plain URP complement.
+
+Usage: python benchmarks/xor_chain.py [maxVars]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import urp  # noqa: E402
+
+
+def legacy_complement(cubes):
+    """Returns the complement of a cube list with the plain URP recursion"""
+    if len(cubes) == 0:
+        return ((),)
+    if len(cubes) == 1:
+        return urp.complement_cube(cubes[0])
+    if any(len(c) == 0 for c in cubes):
+        return ()
+    x = urp._most_binate(cubes)
+    pCubes = legacy_complement(urp.positiveCofactor(cubes, x))
+    nCubes = legacy_complement(urp.negativeCofactor(cubes, x))
+    return urp.cubes_or(urp.cubes_var_and(pCubes, x), urp.cubes_var_and(nCubes, -x))
+
+
+def legacy_xor(left, right):
+    """Returns the boolean XOR of two cube lists with the plain complement"""
+    def cubes_and(a, b):
+        return legacy_complement(urp.cubes_or(legacy_complement(a), legacy_complement(b)))
+    return urp.cubes_or(cubes_and(left, legacy_complement(right)),
+                        cubes_and(legacy_complement(left), right))
+
+
+# term t(v) of each chained XOR family
+FAMILIES = {
+    "parity": lambda v: ((v,),),
+    "pairs": lambda v: ((2 * v - 1, 2 * v),),
+    "overlap": lambda v: ((v, -(v + 1)), (v + 2,)),
+}
+
+
+def xor_chain(numTerms, term, xor):
+    """Returns the cover of t(1) ^ ... ^ t(n) and the time taken to build it"""
+    start = time.perf_counter()
+    cubes = term(1)
+    for v in range(2, numTerms + 1):
+        cubes = xor(cubes, term(v))
+    return cubes, time.perf_counter() - start
+
+
+def main(maxTerms=9):
+    print(f"{'family':>8} {'n':>3} {'cubes before':>13} {'time before':>12} "
+          f"{'cubes after':>12} {'time after':>11}")
+    for name, term in FAMILIES.items():
+        for n in range(2, maxTerms + 1):
+            before, tBefore = xor_chain(n, term, legacy_xor)
+            urp.clearComplementCache()
+            after, tAfter = xor_chain(n, term, urp.cubes_xor)
+            print(f"{name:>8} {n:>3} {len(before):>13} {tBefore:>12.4f} "
+                  f"{len(after):>12} {tAfter:>11.4f}")
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,483 @@
+# implementation of the URP algorithms on positional cubes stored as bitmasks
+# every cube is a pair of integers (pos, neg): bit v of pos is set when the
+# literal xv is in the cube and bit v of neg is set when ~xv is in the cube.
+# The public functions take and return signed-int cube lists, so this module
+# can be used as a drop-in backend for urp; the cover_ functions work on the
+# encoded cover that boolfunc.Expression keeps between operations.
+from collections import OrderedDict, defaultdict
+from itertools import chain
+import urp
+
+# maximum number of bitmask covers whose complement is memoized
+COMPLEMENT_CACHE_SIZE = urp.COMPLEMENT_CACHE_SIZE
+# least recently used memo of the complements of canonical bitmask covers
+_complementMemo = OrderedDict()
+_complementCounts = [0, 0]
+
+
+def encode_cube(cube):
+    """returns the (pos, neg) bitmask pair of a signed-int cube
+    """
+    pos = neg = 0
+    for l in cube:
+        if l > 0:
+            pos |= 1 << l
+        else:
+            neg |= 1 << -l
+    return (pos, neg)
+
+
+def decode_cube(mask):
+    """returns the signed-int cube of a (pos, neg) bitmask pair, sorted by variable
+    """
+    pos, neg = mask
+    cube = list()
+    both = pos | neg
+    while both:
+        low = both & -both
+        v = low.bit_length() - 1
+        cube.append(v if pos & low else -v)
+        both ^= low
+    return tuple(cube)
+
+
+def encode(cubes):
+    """returns the bitmask cube list of a signed-int cube list
+    """
+    return tuple(set(map(encode_cube, cubes)))
+
+
+def decode(masks):
+    """returns the signed-int cube list of a bitmask cube list
+    """
+    return tuple(map(decode_cube, masks))
+
+
+def _bits(mask):
+    """yields the single bit masks set in mask
+    """
+    while mask:
+        low = mask & -mask
+        yield low
+        mask ^= low
+
+
+def contains(a, b):
+    """returns true if the bitmask cube a contains the bitmask cube b
+    """
+    # every literal of a must also be a literal of b
+    return (a[0] & ~b[0]) == 0 and (a[1] & ~b[1]) == 0
+
+
+def mask_scc(masks):
+    """returns the bitmask cube list without the cubes contained in another cube
+    """
+    masks = set(masks)
+    # the literals of a cube packed in one integer, neg above pos
+    width = max((p.bit_length() for p, _ in masks), default=0)
+    packed = {p | n << width: (p, n) for p, n in masks}
+    kept = list()
+    # kept cubes are indexed by their smallest literal, a cube can only be
+    # contained in the kept cubes indexed by one of its own literals
+    index = defaultdict(list)
+    # bigger cubes (fewer literals) are kept first so they can absorb the others
+    for m in sorted(packed, key=lambda m: bin(m).count("1")):
+        if not m:
+            # the all don't care cube contains every other cube
+            return ((0, 0),)
+        if not any(not k & ~m for bit, cubes in index.items() if bit & m for k in cubes):
+            kept.append(packed[m])
+            index[m & -m].append(m)
+    return tuple(kept)
+
+
+def mask_cofactor(masks, bit, positive):
+    """returns the cofactor of a bitmask cube list with respect to the variable bit
+    """
+    if positive:
+        return tuple((p & ~bit, n) for p, n in masks if not n & bit)
+    return tuple((p, n & ~bit) for p, n in masks if not p & bit)
+
+
+def _counts(masks):
+    """returns vertical bit-sliced counters of the set bits over all masks
+    """
+    planes = list()
+    for m in masks:
+        carry = m
+        i = 0
+        while carry:
+            if i == len(planes):
+                planes.append(0)
+            plane = planes[i]
+            planes[i] = plane ^ carry
+            carry &= plane
+            i += 1
+    return planes
+
+
+def _count(planes, bit):
+    """returns the counter value stored for bit in vertical counters
+    """
+    return sum(1 << i for i, plane in enumerate(planes) if plane & bit)
+
+
+def mask_most_binate(masks):
+    """returns the bit of the variable chosen for splitting, with the urp tie breaking
+    """
+    posPlanes = _counts(p for p, _ in masks)
+    negPlanes = _counts(n for _, n in masks)
+    posUnion = negUnion = 0
+    for p, n in masks:
+        posUnion |= p
+        negUnion |= n
+    binate = posUnion & negUnion
+    candidates = binate if binate else posUnion | negUnion
+    best, bestKey = 0, None
+    # bits are visited from the smallest variable so ties keep the smallest index
+    for bit in _bits(candidates):
+        pos, neg = _count(posPlanes, bit), _count(negPlanes, bit)
+        key = (pos + neg, -abs(pos - neg)) if binate else (pos + neg,)
+        if bestKey is None or key > bestKey:
+            best, bestKey = bit, key
+    return best
+
+
+def _directComplement(masks):
+    """returns the complement of a bitmask cover simple enough to complement directly, else None
+    """
+    if len(masks) == 0:
+        # Boolean equation "0", return a single don't care cube
+        return ((0, 0),)
+    if any(p == 0 and n == 0 for p, n in masks):
+        # Boolean F = stuff + 1, return empty cube list, or "1"
+        return ()
+    if len(masks) == 1:
+        # One cube list, use demorgan's law
+        p, n = masks[0]
+        return tuple(chain(((0, b) for b in _bits(p)), ((b, 0) for b in _bits(n))))
+    return None
+
+
+def _mergeComplements(masks, bit, pCubes, nCubes):
+    """returns the complement of masks from the complements of its cofactors by bit
+    """
+    posUnion = negUnion = 0
+    for p, n in masks:
+        posUnion |= p
+        negUnion |= n
+    if not negUnion & bit:
+        # F positive unate in x: F' = (Fx)' + x'.(Fx')', prune by containment
+        return mask_scc(chain(pCubes, ((p, n | bit) for p, n in nCubes)))
+    if not posUnion & bit:
+        # F negative unate in x: F' = (Fx')' + x.(Fx)'
+        return mask_scc(chain(nCubes, ((p | bit, n) for p, n in pCubes)))
+    # a cube with x or x' can only be contained in a cube common to both complements
+    common = set(pCubes).intersection(nCubes)
+    return tuple(chain(common, ((p | bit, n) for p, n in pCubes if (p, n) not in common),
+                       ((p, n | bit) for p, n in nCubes if (p, n) not in common)))
+
+
+def mask_complement(masks):
+    """returns the complement of a bitmask cube list using URP, memoized on the cover
+    """
+    # ("complement", masks) pushes the complement of masks on results and
+    # ("merge", masks, bit) combines the complements of its two cofactors
+    results = list()
+    tasks = [("complement", tuple(sorted(set(masks))))]
+    while tasks:
+        task = tasks.pop()
+        if task[0] == "complement":
+            masks = task[1]
+            result = _complementMemo.get(masks)
+            if result is not None:
+                _complementCounts[0] += 1
+                _complementMemo.move_to_end(masks)
+                results.append(result)
+                continue
+            _complementCounts[1] += 1
+            result = _directComplement(masks)
+            if result is not None:
+                _remember(masks, result)
+                results.append(result)
+                continue
+            bit = mask_most_binate(masks)
+            tasks.append(("merge", masks, bit))
+            tasks.append(("complement", tuple(sorted(set(mask_cofactor(masks, bit, False))))))
+            tasks.append(("complement", tuple(sorted(set(mask_cofactor(masks, bit, True))))))
+        else:
+            _, masks, bit = task
+            nCubes = results.pop()
+            pCubes = results.pop()
+            result = _mergeComplements(masks, bit, pCubes, nCubes)
+            _remember(masks, result)
+            results.append(result)
+    return results.pop()
+
+
+def _remember(masks, result):
+    """stores the complement of masks, evicting the least recently used entry
+    """
+    _complementMemo[masks] = result
+    if len(_complementMemo) > COMPLEMENT_CACHE_SIZE:
+        _complementMemo.popitem(last=False)
+
+
+def complementCacheInfo():
+    """Returns the hit and miss counts of the complement memo cache"""
+    return urp.CacheInfo(_complementCounts[0], _complementCounts[1],
+                         COMPLEMENT_CACHE_SIZE, len(_complementMemo))
+
+
+def clearComplementCache():
+    """Empties the complement memo cache"""
+    _complementMemo.clear()
+    _complementCounts[0] = _complementCounts[1] = 0
+
+
+def mask_tautology(masks):
+    """returns true if the bitmask cube list is a tautology using URP
+    """
+    # covers left to check, a split pushes both cofactors instead of recursing
+    stack = [masks]
+    while stack:
+        masks = stack.pop()
+        while True:
+            if any(p == 0 and n == 0 for p, n in masks):
+                masks = None
+                break
+            if len(masks) == 0:
+                return False
+            posUnion = negUnion = 0
+            for p, n in masks:
+                posUnion |= p
+                negUnion |= n
+            binate = posUnion & negUnion
+            if not binate:
+                # a unate cover is a tautology only if it has the universal cube
+                return False
+            # cofactoring against the unate literals drops the cubes that contain them
+            posUnate, negUnate = posUnion & ~binate, negUnion & ~binate
+            if not posUnate and not negUnate:
+                break
+            masks = tuple((p, n) for p, n in masks if not (p & posUnate or n & negUnate))
+        if masks is not None:
+            bit = mask_most_binate(masks)
+            stack.append(mask_cofactor(masks, bit, False))
+            stack.append(mask_cofactor(masks, bit, True))
+    return True
+
+
+def mask_cube_cofactor(masks, cube):
+    """returns the cofactor of a bitmask cube list with respect to the bitmask cube
+    """
+    p0, n0 = cube
+    return tuple((p & ~p0, n & ~n0) for p, n in masks if not (p & n0 or n & p0))
+
+
+def mask_or(left, right):
+    """returns the boolean OR of two bitmask cube lists
+    """
+    return tuple(set(chain(left, right)))
+
+
+def mask_and(left, right):
+    """returns the boolean AND of two bitmask cube lists
+    """
+    return mask_complement(mask_or(mask_complement(left), mask_complement(right)))
+
+
+def mask_xor(left, right):
+    """returns the boolean XOR of two bitmask cube lists
+    """
+    return mask_or(mask_and(left, mask_complement(right)),
+                   mask_and(mask_complement(left), right))
+
+
+def cover_encode(cubes, numVars):
+    """returns the encoded cover of a signed-int cube list
+    """
+    return encode(cubes)
+
+
+def cover_decode(masks):
+    """returns the signed-int cube list of an encoded cover
+    """
+    return decode(masks)
+
+
+def cover_key(masks):
+    """returns a hashable key, equal for covers with the same cubes
+    """
+    return tuple(sorted(set(masks)))
+
+
+def _union(masks):
+    """returns the union of the literals of every cube, as a (pos, neg) pair
+    """
+    posUnion = negUnion = 0
+    for p, n in masks:
+        posUnion |= p
+        negUnion |= n
+    return posUnion, negUnion
+
+
+def cover_variables(masks):
+    """returns the variables appearing in the cover
+    """
+    p, n = _union(masks)
+    return [b.bit_length() - 1 for b in _bits(p | n)]
+
+
+def cover_isPresent(masks, x):
+    """returns true if the variable x appears in the cover
+    """
+    bit = 1 << x
+    return any((p | n) & bit for p, n in masks)
+
+
+def cover_tautology(masks):
+    """returns true if the cover is a tautology
+    """
+    return mask_tautology(masks)
+
+
+def cover_covers(left, right):
+    """returns true if the cover left contains the cover right
+    """
+    return all(mask_tautology(mask_cube_cofactor(left, cube)) for cube in right)
+
+
+def cover_cofactor(masks, x):
+    """returns the cofactor of the cover with respect to the literal x
+    """
+    return mask_cofactor(masks, 1 << abs(x), x > 0)
+
+
+def cover_complement(masks):
+    """returns the complement of the cover
+    """
+    return mask_complement(masks)
+
+
+def cover_or(left, right):
+    """returns the boolean OR of two covers
+    """
+    return mask_or(left, right)
+
+
+def cover_and(left, right):
+    """returns the boolean AND of two covers
+    """
+    return mask_and(left, right)
+
+
+def cover_xor(left, right):
+    """returns the boolean XOR of two covers
+    """
+    return mask_xor(left, right)
+
+
+def cover_boolDiff(masks, x):
+    """returns the boolean difference of the cover with respect to the variable x
+    """
+    bit = 1 << x
+    return mask_xor(mask_cofactor(masks, bit, True), mask_cofactor(masks, bit, False))
+
+
+def cover_consensus(masks, x):
+    """returns the consensus of the cover with respect to the variable x
+    """
+    bit = 1 << x
+    return mask_and(mask_cofactor(masks, bit, True), mask_cofactor(masks, bit, False))
+
+
+def cover_smoothing(masks, x):
+    """returns the smoothing of the cover with respect to the variable x
+    """
+    bit = 1 << x
+    return mask_or(mask_cofactor(masks, bit, True), mask_cofactor(masks, bit, False))
+
+
+def canonical(cubes):
+    """returns a canonical form of a cube list: sorted cubes of literals sorted by variable
+    """
+    return tuple(sorted(decode(encode(cubes))))
+
+
+def scc(cubes):
+    """returns the cube list without the cubes contained in another cube
+    """
+    return decode(mask_scc(encode(cubes)))
+
+
+def isPresent(cubes, x):
+    """Returns true if the variable x appears in any cube of the cube list"""
+    return urp.isPresent(cubes, x)
+
+
+def tautology(cubes):
+    """Returns true if the cube list is a tautology using URP"""
+    return mask_tautology(encode(cubes))
+
+
+def covers(left, right):
+    """Returns true if the cube list left contains the cube list right"""
+    return cover_covers(encode(left), encode(right))
+
+
+def generalCofactor(cubes, x):
+    """Returns the cofactor of cubes with respect to the literal x"""
+    return decode(cover_cofactor(encode(cubes), x))
+
+
+def positiveCofactor(cubes, position):
+    """Returns the positive cofactor of cubes with respect to x"""
+    assert(position > 0)
+    return generalCofactor(cubes, position)
+
+
+def negativeCofactor(cubes, position):
+    """Returns the negative cofactor of cubes with respect to x"""
+    assert(position > 0)
+    return generalCofactor(cubes, -position)
+
+
+def most_binate(cubes):
+    """Returns the variable chosen for splitting a cube list"""
+    return mask_most_binate(encode(cubes)).bit_length() - 1
+
+
+def complement(cubes):
+    """Returns the complement of a cube list using URP"""
+    return decode(mask_complement(encode(cubes)))
+
+
+def cubes_or(left, right):
+    """Returns the boolean OR of two cube lists"""
+    return decode(mask_or(encode(left), encode(right)))
+
+
+def cubes_and(left, right):
+    """Returns the boolean AND of two cube lists"""
+    return decode(mask_and(encode(left), encode(right)))
+
+
+def cubes_xor(left, right):
+    """Returns the boolean XOR of two cube lists"""
+    return decode(mask_xor(encode(left), encode(right)))
+
+
+def boolDiff(cubes, x):
+    """Returns the boolean difference of a cube list with respect to variable X"""
+    return decode(cover_boolDiff(encode(cubes), x))
+
+
+def consensus(cubes, x):
+    """Returns the consensus of a cube list with respect to variable X"""
+    return decode(cover_consensus(encode(cubes), x))
+
+
+def smoothing(cubes, x):
+    """Returns the smoothing of a cube list with respect to variable X"""
+    return decode(cover_smoothing(encode(cubes), x))
@@ -3,51 +3,178 @@ import pcn
 import urp
 
 
+class _TupleCover:
+    """Adapts a backend working on signed-int cube lists to the cover_ functions.
+
+    The cover is the cube list itself without duplicate cubes; backends keeping
+    their own encoding (bitcubes, npcubes) define the cover_ functions directly.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+
+    def cover_encode(self, cubes, numVars):
+        return cubes if isinstance(cubes, tuple) else tuple(cubes)
+
+    def cover_decode(self, cubes):
+        return cubes
+
+    def cover_key(self, cubes):
+        return self.backend.canonical(cubes)
+
+    def cover_variables(self, cubes):
+        return {abs(l) for c in cubes for l in c}
+
+    def cover_isPresent(self, cubes, x):
+        return self.backend.isPresent(cubes, x)
+
+    def cover_tautology(self, cubes):
+        return self.backend.tautology(cubes)
+
+    def cover_covers(self, left, right):
+        return self.backend.covers(left, right)
+
+    def cover_cofactor(self, cubes, x):
+        if x > 0:
+            return tuple(set(self.backend.positiveCofactor(cubes, x)))
+        return tuple(set(self.backend.negativeCofactor(cubes, -x)))
+
+    def cover_complement(self, cubes):
+        return tuple(set(self.backend.complement(cubes)))
+
+    def cover_or(self, left, right):
+        return tuple(set(self.backend.cubes_or(left, right)))
+
+    def cover_and(self, left, right):
+        return tuple(set(self.backend.cubes_and(left, right)))
+
+    def cover_xor(self, left, right):
+        return tuple(set(self.backend.cubes_xor(left, right)))
+
+    def cover_boolDiff(self, cubes, x):
+        return tuple(set(self.backend.boolDiff(cubes, x)))
+
+    def cover_consensus(self, cubes, x):
+        return tuple(set(self.backend.consensus(cubes, x)))
+
+    def cover_smoothing(self, cubes, x):
+        return tuple(set(self.backend.smoothing(cubes, x)))
+
+
+def _coverOps(backend):
+    """Returns the object providing the cover_ functions of a backend."""
+    return backend if hasattr(backend, "cover_encode") else _TupleCover(backend)
+
+
 class Expression:
     """Class which represents a Boolean expression."""
 
-    def __init__(self, filePath=None, cubes=None, numVars=None) -> None:
-        """Constructor for the BooleanFunction class from a file or from an existing cubes list."""
+    def __init__(self, filePath=None, cubes=None, numVars=None, backend=urp) -> None:
+        """Constructor for the BooleanFunction class from a file or from an existing cubes list.
+
+        backend is the module implementing the cube-list operations, urp by default;
+        bitcubes provides the same functions on bitmask positional cubes.
+        cubes may also be a lazy pcn.CubeSource, its batches are deduplicated as they are read.
+        The cover is kept in the backend encoding between operations, cubes is
+        decoded on first use.
+        """
+        self.backend = backend
+        self.ops = _coverOps(backend)
+        self._cubes = None
         if filePath is not None:
             self.expFromFile(filePath)
+        elif isinstance(cubes, pcn.CubeSource):
+            self.expFromSource(cubes)
         elif cubes is not None and numVars is not None:
             self.expFromCubes(cubes, numVars)
         else:
             raise TypeError("expected file path or cubes/numVars")
 
     @staticmethod
-    def getEqnZero(numVars):
+    def getEqnZero(numVars, backend=urp):
         """Returns the equation of the zero function."""
-        return Expression(cubes=(), numVars=numVars)
+        return Expression(cubes=(), numVars=numVars, backend=backend)
 
     @staticmethod
-    def getEqnOne(numVars):
+    def getEqnOne(numVars, backend=urp):
         """Returns the equation of the one function."""
-        return Expression(cubes=((),), numVars=numVars)
+        return Expression(cubes=((),), numVars=numVars, backend=backend)
+
+    @property
+    def cubes(self):
+        """Returns the cover as a tuple of signed-int cubes."""
+        if self._cubes is None:
+            self._cubes = self.ops.cover_decode(self.cover)
+        return self._cubes
+
+    def _derived(self, cover, f=None):
+        """Returns a new expression over the same variables and backend, and those of f."""
+        numVars = self.numVars
+        if isinstance(f, Expression):
+            numVars = max(numVars, f.numVars)
+        exp = Expression.__new__(Expression)
+        exp.backend, exp.ops, exp._cubes = self.backend, self.ops, None
+        exp.cover, exp.numVars = cover, numVars
+        return exp
+
+    def _coverOf(self, f):
+        """Returns the cover of an expression or of a plain cube list in this backend."""
+        if isinstance(f, Expression):
+            if f.backend is self.backend:
+                return f.cover
+            return self.ops.cover_encode(f.cubes, max(self.numVars, f.numVars))
+        return self.ops.cover_encode(tuple(set(f)), self.numVars)
 
     def isPresent(self, x):
-        """Returns true if the cube x is present in the expression."""
-        for c in self.cubes:
-            for l in c:
-                if abs(l) == x:
-                    return True
-        return False
+        """Returns true if the variable x is present in the expression."""
+        return self.ops.cover_isPresent(self.cover, x)
+
+    def getKey(self):
+        """Returns a hashable key, equal for syntactically equal covers."""
+        return self.ops.cover_key(self.cover)
+
+    def topVariable(self, levels):
+        """Returns the position in levels of the earliest variable of the expression."""
+        try:
+            return min(levels[v] for v in self.ops.cover_variables(self.cover))
+        except KeyError as error:
+            raise ValueError("invalid ordering list") from error
 
     def isTrue(self):
-        """Returns true if there is all dont care cube."""
-        return any(len(c) == 0 for c in self.cubes)
+        """Returns true if the expression is a tautology."""
+        return self.ops.cover_tautology(self.cover)
+
+    def covers(self, f):
+        """Returns true if the expression contains the expression or cube list f."""
+        return self.ops.cover_covers(self.cover, self._coverOf(f))
+
+    def isEquivalent(self, f):
+        """Returns true if the expression and the expression or cube list f are equal."""
+        cover = self._coverOf(f)
+        return self.ops.cover_covers(self.cover, cover) and self.ops.cover_covers(cover, self.cover)
 
     def isFalse(self):
         """Returns true if there is a zero cube."""
-        return len(self.cubes) == 0
+        return len(self.cover) == 0
 
     def expFromCubes(self, cubes, numVars):
         """Constructor for the BooleanFunction class from a list of cubes."""
-        self.cubes, self.numVars, = tuple(set(cubes)), numVars
+        self.numVars = numVars
+        self.cover = self.ops.cover_encode(tuple(set(cubes)), numVars)
 
     def expFromFile(self, filePath):
-        """Constructor for the BooleanFunction class from a file."""
-        self.numVars, self.cubes = pcn.parse(filePath)
+        """Constructor for the BooleanFunction class from a text or binary pcn file."""
+        self.numVars, cubes = pcn.parse(filePath)
+        self.cover = self.ops.cover_encode(cubes, self.numVars)
+
+    def expFromSource(self, source):
+        """Constructor for the BooleanFunction class from a lazy cube source."""
+        self.numVars = source.numVars
+        self.cover = self.ops.cover_encode(tuple(set(source.cubes())), self.numVars)
+
+    def writePcn(self, filePath, binary=False):
+        """Writes the cube list to a text or binary pcn file."""
+        pcn.write_cubes(filePath, self.cubes, self.numVars, binary)
 
     def __str__(self) -> str:
         """Returns a string representation of the BooleanFunction."""
@@ -59,50 +186,41 @@ class Expression:
 
     def complement(self):
         """Returns the complement of the BooleanFunction."""
-        complementedCubes = urp.complement(self.cubes)
-        return Expression(cubes=complementedCubes, numVars=self.numVars)
+        return self._derived(self.ops.cover_complement(self.cover))
 
     def andExp(self, f):
         """Returns the conjunction of the BooleanFunction with another one."""
-        andCubes = urp.cubes_and(self.cubes, f)
-        return Expression(cubes=andCubes, numVars=self.numVars)
+        return self._derived(self.ops.cover_and(self.cover, self._coverOf(f)), f)
 
     def orExp(self, f):
         """Returns the union of the BooleanFunction with another one."""
-        orCubes = urp.cubes_or(self.cubes, f)
-        return Expression(cubes=orCubes, numVars=self.numVars)
+        return self._derived(self.ops.cover_or(self.cover, self._coverOf(f)), f)
 
     def xorExp(self, f):
         """Returns the exclusive or of the BooleanFunction with another one."""
-        xorCubes = urp.cubes_xor(self.cubes, f)
-        return Expression(cubes=xorCubes, numVars=self.numVars)
+        return self._derived(self.ops.cover_xor(self.cover, self._coverOf(f)), f)
 
     def positiveCofactor(self, x):
         """Returns the positive cofactor of the BooleanFunction with respect to the variable x."""
         assert(x > 0 and x <= self.numVars)
-        positiveCofactorCubes = urp.positiveCofactor(self.cubes, x)
-        return Expression(cubes=positiveCofactorCubes, numVars=self.numVars)
+        return self._derived(self.ops.cover_cofactor(self.cover, x))
 
     def negativeCofactor(self, x):
         """Returns the negative cofactor of the BooleanFunction with respect to the variable x."""
         assert(x > 0 and x <= self.numVars)
-        negativeCofactorCubes = urp.negativeCofactor(self.cubes, x)
-        return Expression(cubes=negativeCofactorCubes, numVars=self.numVars)
+        return self._derived(self.ops.cover_cofactor(self.cover, -x))
 
     def boolDiffWith(self, x):
         """Returns the boolean difference of the BooleanFunction with respect to the variable x."""
         assert(x > 0 and x <= self.numVars)
-        boolDiffCubes = urp.boolDiff(self.cubes, x)
-        return Expression(cubes=boolDiffCubes, numVars=self.numVars)
+        return self._derived(self.ops.cover_boolDiff(self.cover, x))
 
     def consensusWith(self, x):
         """Returns the consensus of the BooleanFunction with respect to the variable x."""
         assert(x > 0 and x <= self.numVars)
-        consensusCubes = urp.consensus(self.cubes, x)
-        return Expression(cubes=consensusCubes, numVars=self.numVars)
+        return self._derived(self.ops.cover_consensus(self.cover, x))
 
     def smoothingWith(self, x):
         """Returns the smoothing of the BooleanFunction with respect to the variable x."""
         assert(x > 0 and x <= self.numVars)
-        smoothingCubes = urp.smoothing(self.cubes, x)
-        return Expression(cubes=smoothingCubes, numVars=self.numVars)
+        return self._derived(self.ops.cover_smoothing(self.cover, x))
@@ -0,0 +1,218 @@
+"""Module which writes BDDs as DOT, GraphML or JSON text.
+
+The writers stream straight to a text sink in one pass over the nodes,
+without building a graph object per node, so BDDs with tens of thousands
+of nodes can be exported. Nodes are laid out level by level from the
+roots; internal nodes at or below collapseLevel and nodes past the
+maxNodes limit are not written, the edges into them point to a single
+placeholder node instead. Every root gets a pointer node with an edge to
+it, and complemented edges are marked (an odot arrowhead in DOT, a
+complement flag in GraphML, an odd edge in JSON). Graphviz is only run by
+render, when an image is actually wanted.
+"""
+import io
+import json
+import subprocess
+from xml.sax.saxutils import escape
+
+# ids of the placeholder nodes standing for the hidden parts of the graph
+COLLAPSED = "collapsed"
+TRUNCATED = "truncated"
+
+
+def layout(manager, roots, maxNodes=None, collapseLevel=None):
+    """returns the internal nodes to write by level, the hidden nodes and the terminals
+
+    Levels are visited from the top so that a node limit keeps the upper
+    part of the graph; hidden maps every node that is not written but has a
+    written parent (or is a root) to COLLAPSED or TRUNCATED.
+    """
+    nodes = manager.nodes
+    numLevels = len(manager.ordering)
+    if collapseLevel is None:
+        collapseLevel = numLevels
+    buckets = [list() for _ in range(numLevels)]
+    seen = set()
+    terminals = set()
+    # nodes are keyed on their regular edge
+    for root in (r & ~1 for r in roots):
+        if root == manager.ONE:
+            terminals.add(root)
+        elif root not in seen:
+            seen.add(root)
+            buckets[manager.getLevel(root)].append(root)
+    levels = list()
+    hidden = dict()
+    count = 0
+    for level, bucket in enumerate(buckets):
+        written = list()
+        for u in bucket:
+            if level >= collapseLevel:
+                hidden[u] = COLLAPSED
+                continue
+            if maxNodes is not None and count >= maxNodes:
+                hidden[u] = TRUNCATED
+                continue
+            written.append(u)
+            count += 1
+            for child in (nodes.lo[u >> 1] & ~1, nodes.hi[u >> 1]):
+                if child == manager.ONE:
+                    terminals.add(child)
+                elif child not in seen:
+                    seen.add(child)
+                    buckets[manager.getLevel(child)].append(child)
+        levels.append(written)
+        # the bucket is no longer needed once its level is written
+        buckets[level] = None
+    return levels, hidden, sorted(terminals)
+
+
+def _target(u, hidden):
+    """returns the id written for an edge into u"""
+    u &= ~1
+    return hidden.get(u, f"n{u}")
+
+
+def _label(manager, u):
+    """returns the label of the node of the regular edge u"""
+    if u == manager.ONE:
+        return "1"
+    return f"X{manager.nodes.var[u >> 1]}"
+
+
+def writeDot(sink, manager, roots, maxNodes=None, collapseLevel=None):
+    """writes the bdds of roots in the DOT language, one rank per level"""
+    nodes = manager.nodes
+    levels, hidden, terminals = layout(manager, roots, maxNodes, collapseLevel)
+    sink.write("digraph bdd {\n")
+    sink.write("  { rank=source;\n")
+    for i in range(len(roots)):
+        sink.write(f'    r{i} [label="f{i}", shape=plaintext];\n')
+    sink.write("  }\n")
+    for level, written in enumerate(levels):
+        if not written:
+            continue
+        sink.write(f"  {{ rank=same; // level {level}, X{manager.ordering[level]}\n")
+        for u in written:
+            sink.write(f'    n{u} [label="{_label(manager, u)}", style=filled, '
+                       f'fillcolor=green];\n')
+        sink.write("  }\n")
+    placeholders = sorted(set(hidden.values()))
+    for name in placeholders:
+        sink.write(f'  {name} [label="{name}", shape=note];\n')
+    sink.write("  { rank=sink;\n")
+    for u in terminals:
+        sink.write(f'    n{u} [label="{_label(manager, u)}", style=filled, '
+                   f'fillcolor=lightblue, shape=box];\n')
+    sink.write("  }\n")
+    # a complemented edge ends in an odot arrowhead
+    for i, root in enumerate(roots):
+        extra = " [arrowhead=odot]" if root & 1 else ""
+        sink.write(f"  r{i} -> {_target(root, hidden)}{extra};\n")
+    for written in levels:
+        for u in written:
+            lo = nodes.lo[u >> 1]
+            extra = ", arrowhead=odot" if lo & 1 else ""
+            sink.write(f"  n{u} -> {_target(lo, hidden)} [color=red, style=dotted{extra}];\n")
+            sink.write(f"  n{u} -> {_target(nodes.hi[u >> 1], hidden)} [color=blue];\n")
+    sink.write("}\n")
+
+
+def writeGraphml(sink, manager, roots, maxNodes=None, collapseLevel=None):
+    """writes the bdds of roots as GraphML"""
+    nodes = manager.nodes
+    levels, hidden, terminals = layout(manager, roots, maxNodes, collapseLevel)
+    sink.write('<?xml version="1.0" encoding="UTF-8"?>\n'
+               '<graphml xmlns="http://graphml.graphdrawing.org/xmlns">\n'
+               '  <key id="label" for="node" attr.name="label" attr.type="string"/>\n'
+               '  <key id="var" for="node" attr.name="var" attr.type="int"/>\n'
+               '  <key id="level" for="node" attr.name="level" attr.type="int"/>\n'
+               '  <key id="root" for="node" attr.name="root" attr.type="boolean"/>\n'
+               '  <key id="edge" for="edge" attr.name="edge" attr.type="string"/>\n'
+               '  <key id="complement" for="edge" attr.name="complement" attr.type="boolean"/>\n'
+               '  <graph id="bdd" edgedefault="directed">\n')
+    rootSet = {r & ~1 for r in roots}
+
+    def node(nid, label, var, level, root):
+        sink.write(f'    <node id="{nid}"><data key="label">{escape(label)}</data>'
+                   f'<data key="var">{var}</data><data key="level">{level}</data>'
+                   f'<data key="root">{"true" if root else "false"}</data></node>\n')
+
+    def edge(source, child, kind):
+        sink.write(f'    <edge source="{source}" target="{_target(child, hidden)}">'
+                   f'<data key="edge">{kind}</data><data key="complement">'
+                   f'{"true" if child & 1 else "false"}</data></edge>\n')
+    for i in range(len(roots)):
+        node(f"r{i}", f"f{i}", 0, -1, False)
+    for level, written in enumerate(levels):
+        for u in written:
+            node(f"n{u}", _label(manager, u), nodes.var[u >> 1], level, u in rootSet)
+    numLevels = len(manager.ordering)
+    for name in sorted(set(hidden.values())):
+        node(name, name, 0, numLevels, False)
+    for u in terminals:
+        node(f"n{u}", _label(manager, u), nodes.var[u >> 1], numLevels, u in rootSet)
+    for i, root in enumerate(roots):
+        edge(f"r{i}", root, "root")
+    for written in levels:
+        for u in written:
+            edge(f"n{u}", nodes.lo[u >> 1], "lo")
+            edge(f"n{u}", nodes.hi[u >> 1], "hi")
+    sink.write("  </graph>\n</graphml>\n")
+
+
+def writeJson(sink, manager, roots, maxNodes=None, collapseLevel=None):
+    """writes the bdds of roots as a JSON object with one node record per line
+
+    Nodes are identified by their regular edge; roots, lo and hi are edges
+    whose bit 0 marks a complement.
+    """
+    nodes = manager.nodes
+    levels, hidden, terminals = layout(manager, roots, maxNodes, collapseLevel)
+    sink.write(f'{{"ordering": {json.dumps(manager.ordering)}, '
+               f'"roots": {json.dumps(list(roots))},\n "nodes": [')
+    first = True
+    for level, written in enumerate(levels):
+        for u in written:
+            sink.write(("\n  " if first else ",\n  ") + json.dumps(
+                {"id": u, "var": nodes.var[u >> 1], "level": level,
+                 "lo": nodes.lo[u >> 1], "hi": nodes.hi[u >> 1]}))
+            first = False
+    sink.write('],\n "terminals": ' + json.dumps(
+        {str(u): _label(manager, u) for u in terminals}))
+    sink.write(',\n "hidden": ' + json.dumps({str(u): kind for u, kind in hidden.items()}))
+    sink.write("}\n")
+
+
+WRITERS = {"dot": writeDot, "graphml": writeGraphml, "json": writeJson}
+
+
+def write(sink, manager, roots, format="dot", maxNodes=None, collapseLevel=None):
+    """writes the bdds of roots to a text sink or a file path in the given format"""
+    try:
+        writer = WRITERS[format]
+    except KeyError as error:
+        raise ValueError(f"unknown export format {format}") from error
+    if isinstance(sink, str):
+        with open(sink, "w") as f:
+            writer(f, manager, roots, maxNodes, collapseLevel)
+    else:
+        writer(sink, manager, roots, maxNodes, collapseLevel)
+
+
+def render(manager, roots, filePath=None, format="png", maxNodes=None, collapseLevel=None):
+    """renders the bdds of roots with the graphviz dot program
+
+    Returns the image bytes, or writes them to filePath and returns None.
+    """
+    command = ["dot", f"-T{format}"] + ([f"-o{filePath}"] if filePath else [])
+    try:
+        process = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+    except FileNotFoundError as error:
+        raise RuntimeError("graphviz dot is needed to render images") from error
+    with io.TextIOWrapper(process.stdin, encoding="utf-8") as stdin:
+        writeDot(stdin, manager, roots, maxNodes, collapseLevel)
+    image = process.stdout.read()
+    if process.wait() != 0:
+        raise RuntimeError(f"dot exited with status {process.returncode}")
+    return None if filePath else image
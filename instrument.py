@@ -0,0 +1,246 @@
+"""Module which instruments the cube-list backends and the BDD manager.
+
+Instrumentation is off by default and costs nothing then: `profile()`
+replaces the functions of the instrumented modules and classes by counting
+wrappers on entry and puts the originals back on exit.
+
+    with instrument.profile(trace=True) as stats:
+        bdd = myBdd.BDD(boolfunc.Expression("input/1.pcn"))
+    print(stats.report())
+    stats.writeTrace("trace.json")      # chrome://tracing or Perfetto
+    stats.writeFolded("trace.folded")   # flamegraph.pl or speedscope
+
+Each instrumented function gets its call count, cumulative time (counted
+once across recursive activations), self time and largest recursion depth.
+The unique table and computed table lookups are counted as hits and
+misses, the computed table ones per operation, and the per level node
+counts of the managers given to profile are taken on exit.
+"""
+import collections
+import inspect
+import json
+import os
+import threading
+import time
+import myBdd
+import urp
+from manager import BDDManager, ComputedTable, NodeTable
+
+# manager methods timed by profile, the recursive work happens inside them
+MANAGER_METHODS = ("ite", "apply", "neg", "exists", "forall", "andExists", "cofactor",
+                   "restrict", "constrain", "cofactorCubes", "booleanDifference",
+                   "getExpression", "satCount", "reorder", "collect")
+# cache housekeeping functions of the backends, not counted as backend calls
+HOUSEKEEPING = ("complementCacheInfo", "clearComplementCache")
+# trace events kept at most, later calls are still counted but not traced
+MAX_EVENTS = 1 << 20
+
+_active = threading.Lock()
+
+
+class Stats:
+    """counters collected by profile"""
+
+    def __init__(self, trace=False, maxEvents=MAX_EVENTS) -> None:
+        """ constructor for Stats class """
+        self.trace = trace
+        self.maxEvents = maxEvents
+        # name -> [calls, cumulative time, self time, largest recursion depth]
+        self.functions = collections.defaultdict(lambda: [0, 0.0, 0.0, 0])
+        # unique table and computed table lookups, the latter per operation
+        self.unique = {"hits": 0, "misses": 0}
+        self.caches = collections.defaultdict(lambda: {"hits": 0, "misses": 0})
+        # largest nesting of instrumented calls
+        self.maxDepth = 0
+        # per level (var, node count) of every profiled manager, taken on exit
+        self.levels = list()
+        self.events = list()
+        self.dropped = 0
+        # self time in microseconds of every call stack, for flamegraphs
+        self.folded = collections.Counter()
+        self.elapsed = 0.0
+        self._stack = list()
+        self._active = collections.Counter()
+        self._start = time.perf_counter()
+
+    def _enter(self, name):
+        """ records the start of a call """
+        self._active[name] += 1
+        self._stack.append([name, time.perf_counter(), 0.0])
+        if len(self._stack) > self.maxDepth:
+            self.maxDepth = len(self._stack)
+
+    def _exit(self, name):
+        """ records the end of the innermost call """
+        now = time.perf_counter()
+        _, start, children = self._stack.pop()
+        elapsed = now - start
+        record = self.functions[name]
+        record[0] += 1
+        record[2] += elapsed - children
+        depth = self._active[name]
+        if depth > record[3]:
+            record[3] = depth
+        self._active[name] -= 1
+        # recursive activations are inside the outermost one, count it only
+        if depth == 1:
+            record[1] += elapsed
+        if self._stack:
+            self._stack[-1][2] += elapsed
+        if self.trace:
+            path = ";".join([frame[0] for frame in self._stack] + [name])
+            self.folded[path] += int((elapsed - children) * 1e6)
+            if len(self.events) < self.maxEvents:
+                self.events.append({"name": name, "ph": "X", "pid": os.getpid(), "tid": 0,
+                                    "ts": (start - self._start) * 1e6, "dur": elapsed * 1e6})
+            else:
+                self.dropped += 1
+
+    def _wrap(self, name, function):
+        """ returns function counting and timing its calls under name """
+        def instrumented(*args, **kwargs):
+            self._enter(name)
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self._exit(name)
+        instrumented.__name__ = getattr(function, "__name__", name)
+        instrumented.__doc__ = function.__doc__
+        instrumented.__wrapped__ = function
+        # memoized functions keep their cache controls
+        for attr in ("cache_info", "cache_clear"):
+            if hasattr(function, attr):
+                setattr(instrumented, attr, getattr(function, attr))
+        return instrumented
+
+    def hitRate(self, kind=None):
+        """ returns the hit rate of the unique table, or of the computed table operation kind """
+        counts = self.unique if kind is None else self.caches[kind]
+        total = counts["hits"] + counts["misses"]
+        return counts["hits"] / total if total else 0.0
+
+    def asDict(self):
+        """ returns the counters as plain data """
+        return {
+            "elapsed": self.elapsed,
+            "maxDepth": self.maxDepth,
+            "functions": {name: {"calls": r[0], "time": r[1], "selfTime": r[2], "maxDepth": r[3]}
+                          for name, r in self.functions.items()},
+            "unique": dict(self.unique, hitRate=self.hitRate()),
+            "caches": {kind: dict(c, hitRate=self.hitRate(kind)) for kind, c in self.caches.items()},
+            "levels": self.levels,
+        }
+
+    def report(self):
+        """ returns a text table of the functions by decreasing self time """
+        lines = [f"{'function':>28} {'calls':>9} {'time s':>9} {'self s':>9} {'depth':>6}"]
+        for name, r in sorted(self.functions.items(), key=lambda item: -item[1][2]):
+            lines.append(f"{name:>28} {r[0]:>9} {r[1]:>9.4f} {r[2]:>9.4f} {r[3]:>6}")
+        lines.append(f"unique table hit rate {self.hitRate():.3f} "
+                     f"({self.unique['hits']} hits, {self.unique['misses']} misses)")
+        for kind in sorted(self.caches):
+            lines.append(f"{kind} cache hit rate {self.hitRate(kind):.3f}")
+        lines.append(f"largest call depth {self.maxDepth}, elapsed {self.elapsed:.4f} s")
+        return "\n".join(lines)
+
+    def writeTrace(self, filePath):
+        """ writes the trace events in the Chrome trace event format """
+        with open(filePath, "w") as f:
+            json.dump({"traceEvents": self.events, "displayTimeUnit": "ms"}, f)
+
+    def writeFolded(self, filePath):
+        """ writes the self time of every call stack in the folded flamegraph format """
+        with open(filePath, "w") as f:
+            for path, micros in self.folded.items():
+                f.write(f"{path} {micros}\n")
+
+
+def _moduleFunctions(module):
+    """ returns the names of the functions defined in module, memoized ones included """
+    return [name for name, obj in vars(module).items()
+            if callable(obj) and getattr(obj, "__module__", None) == module.__name__
+            and not inspect.isclass(obj)]
+
+
+class profile:
+    """context manager instrumenting the backends and the managers, returns a Stats
+
+    modules are the cube-list backends to instrument (urp by default); the
+    per level node counts of the managers are recorded on exit. Only one
+    profile can be active at a time.
+    """
+
+    def __init__(self, *managers, modules=(urp,), trace=False, maxEvents=MAX_EVENTS) -> None:
+        """ constructor for profile class, nothing is patched before entering """
+        self.managers = managers
+        self.modules = modules
+        self.stats = Stats(trace, maxEvents)
+        self._saved = list()
+
+    def _patch(self, owner, name, replacement):
+        """ replaces owner.name, remembering the original """
+        self._saved.append((owner, name, vars(owner)[name]))
+        setattr(owner, name, replacement)
+
+    def __enter__(self):
+        """ patches the backends, buildBDD and the managers, returns the Stats """
+        if not _active.acquire(blocking=False):
+            raise RuntimeError("a profile is already active")
+        try:
+            self._patchAll()
+        except BaseException:
+            # a half patched run puts the originals back and lets the next profile start
+            self._restore()
+            _active.release()
+            raise
+        self.stats._start = time.perf_counter()
+        return self.stats
+
+    def _patchAll(self):
+        """ replaces every instrumented function by its counting wrapper """
+        stats = self.stats
+        for module in self.modules:
+            for name in _moduleFunctions(module):
+                if name in HOUSEKEEPING:
+                    continue
+                self._patch(module, name, stats._wrap(f"{module.__name__}.{name}",
+                                                      getattr(module, name)))
+        self._patch(myBdd, "buildBDD", stats._wrap("myBdd.buildBDD", myBdd.buildBDD))
+        for name in MANAGER_METHODS:
+            self._patch(BDDManager, name, stats._wrap(f"BDDManager.{name}",
+                                                      vars(BDDManager)[name]))
+        find = stats._wrap("NodeTable.find", NodeTable.find)
+        unique = stats.unique
+
+        def countedFind(table, var, lo, hi):
+            unique["hits" if (var, lo, hi) in table.unique else "misses"] += 1
+            return find(table, var, lo, hi)
+        self._patch(NodeTable, "find", countedFind)
+        get = ComputedTable.get
+        caches = stats.caches
+
+        def countedGet(table, key):
+            result = get(table, key)
+            # operation results are keyed on the operation name, cube lists on cubes
+            kind = key[0] if key and isinstance(key[0], str) else "build"
+            caches[kind]["hits" if result is not None else "misses"] += 1
+            return result
+        self._patch(ComputedTable, "get", countedGet)
+
+    def _restore(self):
+        """ puts back the originals of every patched function """
+        for owner, name, original in reversed(self._saved):
+            setattr(owner, name, original)
+        self._saved.clear()
+
+    def __exit__(self, *exc):
+        """ restores the originals, records the level counts and ends the profile """
+        stats = self.stats
+        stats.elapsed = time.perf_counter() - stats._start
+        self._restore()
+        try:
+            for manager in self.managers:
+                stats.levels.append(manager.levelCounts())
+        finally:
+            _active.release()
+        return False
@@ -0,0 +1,1282 @@
+"""Module which contains the BDDManager class.
+
+The manager owns the unique table shared by every BDD built with it and
+implements the ITE operator, from which all the binary Boolean operations
+are derived. Results of ITE calls are memoized in a bounded computed table.
+
+Nodes are stored in parallel integer arrays (variable, lo child, hi child)
+and addressed by their index in those arrays; index 0 is the single
+terminal node. Functions are edges: the node index shifted left by one with
+the complement bit in bit 0, so edge 0 is the one function, edge 1 the zero
+function and negation flips the bit. The hi edge of a stored node is never
+complemented, which keeps the representation canonical.
+"""
+import collections
+import collections.abc
+import sys
+import time
+import weakref
+from array import array
+import boolfunc
+
+
+class ComputedTable:
+    """Bounded least recently used cache for the results of BDD operations."""
+
+    def __init__(self, maxSize=1 << 16) -> None:
+        """ constructor for ComputedTable class """
+        self.maxSize = maxSize
+        self.table = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """ returns the cached result for key or None if it is absent """
+        try:
+            result = self.table[key]
+        except KeyError:
+            self.misses += 1
+            return None
+        self.table.move_to_end(key)
+        self.hits += 1
+        return result
+
+    def put(self, key, result):
+        """ stores result for key, evicting the least recently used entry """
+        self.table[key] = result
+        self.table.move_to_end(key)
+        if len(self.table) > self.maxSize:
+            self.table.popitem(last=False)
+
+    def clear(self):
+        """ removes every entry from the cache """
+        self.table.clear()
+
+    def stats(self):
+        """ returns the hit and miss counts and the size of the cache """
+        return {"hits": self.hits, "misses": self.misses, "size": len(self.table)}
+
+    def __len__(self) -> int:
+        """ returns the number of cached entries """
+        return len(self.table)
+
+
+class NodeTable:
+    """Array backed node store with a unique table keyed on (var, lo, hi)."""
+    # index of the terminal node, its children are stored as -1
+    TERMINAL = 0
+    # the regular edge into the terminal is one, the complemented edge is zero
+    ONE = 0
+    ZERO = 1
+    # var reported for the zero and one edges
+    ZEROVAR = -1
+    ONEVAR = -2
+    # var of a released slot waiting on the free list
+    FREEVAR = 0
+    # approximate size of a unique table key: the tuple and its two node integers
+    KEYBYTES = sys.getsizeof((0, 0, 0)) + 2 * sys.getsizeof(1 << 20)
+
+    def __init__(self, terminals=1) -> None:
+        """ constructor for NodeTable class, the first slots hold the terminals
+
+        A bdd table has the single one terminal, a zdd table (terminals=2)
+        the zero terminal at index 0 and the one terminal at index 1.
+        """
+        self.terminals = terminals
+        self.var = array("i", (NodeTable.ZEROVAR, NodeTable.ONEVAR)[-terminals:])
+        self.lo = array("i", (-1,) * terminals)
+        self.hi = array("i", (-1,) * terminals)
+        self.unique = dict()
+        self.free = list()
+        # largest number of nodes ever in the table, the terminals included
+        self.peak = terminals
+
+    def find(self, var, lo, hi):
+        """ returns the index of the node (var, lo, hi), creating it if needed
+
+        lo and hi are edges, only lo may be complemented.
+        """
+        key = (var, lo, hi)
+        try:
+            return self.unique[key]
+        except KeyError:
+            # create the node if it is not present in the table
+            if self.free:
+                u = self.free.pop()
+                self.var[u], self.lo[u], self.hi[u] = var, lo, hi
+            else:
+                u = len(self.var)
+                self.var.append(var)
+                self.lo.append(lo)
+                self.hi.append(hi)
+            self.unique[key] = u
+            if len(self.unique) + self.terminals > self.peak:
+                self.peak = len(self.unique) + self.terminals
+            return u
+
+    def relabel(self, u, var, lo, hi):
+        """ replaces the node u in place by (var, lo, hi) """
+        del self.unique[(self.var[u], self.lo[u], self.hi[u])]
+        self.var[u], self.lo[u], self.hi[u] = var, lo, hi
+        self.unique[(var, lo, hi)] = u
+
+    def release(self, u):
+        """ removes the node u from the unique table and puts its slot on the free list """
+        del self.unique[(self.var[u], self.lo[u], self.hi[u])]
+        self.var[u], self.lo[u], self.hi[u] = NodeTable.FREEVAR, -1, -1
+        self.free.append(u)
+
+    def liveCount(self):
+        """ returns the number of nodes in the unique table including the terminals """
+        return len(self.unique) + self.terminals
+
+    def loadFactor(self):
+        """ returns the fraction of the allocated node slots holding a node """
+        return self.liveCount() / len(self.var)
+
+    def memoryUsage(self):
+        """ returns an estimate in bytes of the memory held by the node store """
+        arrays = sum(a.itemsize * len(a) for a in (self.var, self.lo, self.hi))
+        # every unique table entry owns a (var, lo, hi) key tuple
+        keys = len(self.unique) * NodeTable.KEYBYTES
+        return arrays + sys.getsizeof(self.unique) + keys + sys.getsizeof(self.free)
+
+    def __len__(self) -> int:
+        """ returns the number of node slots including the terminals """
+        return len(self.var)
+
+
+class BDDNode:
+    """ Class for a lightweight view of an edge into a node stored in a manager"""
+    __slots__ = ("manager", "index")
+    # Defining the key for zero and one nodes
+    BDDNODEZEROKEY = (NodeTable.ZEROVAR, -1, -1)
+    BDDNODEONEKEY = (NodeTable.ONEVAR, -1, -1)
+
+    def __init__(self, manager, index):
+        """ constructor for BDDNode class """
+        self.manager = manager
+        self.index = index
+
+    @property
+    def var(self):
+        """ returns the variable of the node, -1 for zero and -2 for one """
+        if self.index == NodeTable.ZERO:
+            return NodeTable.ZEROVAR
+        return self.manager.nodes.var[self.index >> 1]
+
+    @property
+    def complement(self):
+        """ returns true if the edge is complemented """
+        return bool(self.index & 1)
+
+    @property
+    def regular(self):
+        """ returns the view of the uncomplemented edge into the same node """
+        return BDDNode(self.manager, self.index & ~1)
+
+    @property
+    def lo(self):
+        """ returns the lo child of the function or None for a terminal """
+        if self.index <= NodeTable.ZERO:
+            return None
+        return BDDNode(self.manager, self.manager.nodes.lo[self.index >> 1] ^ (self.index & 1))
+
+    @property
+    def hi(self):
+        """ returns the hi child of the function or None for a terminal """
+        if self.index <= NodeTable.ZERO:
+            return None
+        return BDDNode(self.manager, self.manager.nodes.hi[self.index >> 1] ^ (self.index & 1))
+
+    @property
+    def exp(self):
+        """ returns the expression of the node, rebuilt from the graph """
+        return self.manager.getExpression(self.index)
+
+    def getKey(self):
+        """ returns the key for the node """
+        if self.index <= NodeTable.ZERO:
+            return (self.var, -1, -1)
+        return (self.var, self.lo.index, self.hi.index)
+
+    def __eq__(self, other) -> bool:
+        """ returns true if both views refer to the same node """
+        if not isinstance(other, BDDNode):
+            return NotImplemented
+        return self.manager is other.manager and self.index == other.index
+
+    def __hash__(self) -> int:
+        """ returns the hash of the node index """
+        return hash(self.index)
+
+    def __str__(self) -> str:
+        """ returns the string representation of the node """
+        key = self.getKey()
+        rep = list()
+        rep.append(f"id:{self.index}")
+        rep.append(f"var:{key[0]}")
+        rep.append(f"lo:{key[1]}")
+        rep.append(f"hi:{key[2]}")
+        return "\n".join(rep)
+
+    def __repr__(self) -> str:
+        """ returns the string representation of the node """
+        return self.__str__()
+
+    def _getUid(self):
+        """returns the UID for a node"""
+        var, lo, hi = self.getKey()
+        uid = f"var->{var}\nid->{self.index}\nlo->{lo}    hi->{hi}"
+        return uid
+
+    def getLabel(self):
+        """ returns the label for the node """
+        var = self.var
+        # label is 0 if val is -1
+        if var == NodeTable.ZEROVAR:
+            label = "0"
+        # label is 1 if val is -2
+        elif var == NodeTable.ONEVAR:
+            label = "1"
+        # label is the variable in expression
+        else:
+            label = f"X{var}"
+        return label
+
+
+def run(call):
+    """ evaluates a recursive operation with an explicit stack instead of python recursion
+
+    An operation returns its result directly or a generator that yields the
+    sub-calls it needs (results or generators again) and receives their results.
+    """
+    if not isinstance(call, collections.abc.Generator):
+        return call
+    stack = [call]
+    value = None
+    while True:
+        try:
+            sub = stack[-1].send(value)
+        except StopIteration as stop:
+            stack.pop()
+            if not stack:
+                return stop.value
+            value = stop.value
+            continue
+        if isinstance(sub, collections.abc.Generator):
+            stack.append(sub)
+            value = None
+        else:
+            value = sub
+
+
+class BDDManager:
+    """class for the manager shared by many BDDs"""
+
+    # names of the binary operations supported by apply
+    OPERATIONS = ("and", "or", "xor", "nand", "nor", "xnor", "implies")
+    # edges into the terminal, every edge above ZERO is an internal node
+    ZERO = NodeTable.ZERO
+    ONE = NodeTable.ONE
+
+    def __init__(self, ordering: list, numVars=None, cacheSize=1 << 16,
+                 autoReorder=False, reorderThreshold=4096,
+                 maxNodes=None, maxMemory=None, gcReorder=False) -> None:
+        """ constructor for BDDManager class """
+        # store the ordering of the variables and the level of each variable
+        self.ordering = list(ordering)
+        self.levels = {var: idx for idx, var in enumerate(self.ordering)}
+        if len(self.levels) != len(self.ordering) or any(v <= 0 for v in self.ordering):
+            raise ValueError("invalid ordering list")
+        self.numVars = max(self.ordering, default=0) if numVars is None else numVars
+        # node store and unique table shared by every bdd of the manager
+        self.nodes = NodeTable()
+        # views of the zero and one edges into the terminal
+        self.BDDNODEZERO = BDDNode(self, self.ZERO)
+        self.BDDNODEONE = BDDNode(self, self.ONE)
+        # computed table for the ite and negation operations
+        self.computed = ComputedTable(cacheSize)
+        # construction cache mapping canonical cube lists to their nodes
+        self.buildCache = ComputedTable(cacheSize)
+        # bdds whose roots are kept alive and valid across reordering
+        # keyed by identity: bdds with the same root are equal but each one holds it
+        self.handles = dict()
+        # dynamic reordering triggers once the live node count passes the threshold
+        self.autoReorder = autoReorder
+        self.reorderThreshold = reorderThreshold
+        self.reorderings = 0
+        # explicit references to root nodes held outside of bdd objects
+        self.rootRefs = collections.Counter()
+        # garbage collection triggers once the table passes the node or byte budget
+        self.maxNodes = maxNodes
+        self.maxMemory = maxMemory
+        self.gcReorder = gcReorder
+        self.collections = 0
+        self.collected = 0
+        self._gcFloor = 0
+        # reference counts and per variable node sets, only set while reordering
+        self._refs = None
+        self._subtables = None
+
+    @property
+    def NODES(self):
+        """ returns the unique table mapping (var, lo, hi) to node indices """
+        return self.nodes.unique
+
+    def view(self, u):
+        """ returns a BDDNode view of the node index u """
+        return BDDNode(self, u)
+
+    def isTerminal(self, u):
+        """ returns true if u is the zero or the one edge """
+        return u <= self.ZERO
+
+    def getLevel(self, u):
+        """ returns the position of the node variable in the ordering """
+        if u <= self.ZERO:
+            return len(self.ordering)
+        return self.levels[self.nodes.var[u >> 1]]
+
+    def getNode(self, var, lo, hi):
+        """ returns the unique edge (var, lo, hi) applying the reduction rules """
+        # Reduction rule 1
+        # is lo is hi then return lo
+        if lo == hi:
+            return lo
+        # the hi edge is kept regular: a complemented hi moves to the returned edge
+        if hi & 1:
+            return self.nodes.find(var, lo ^ 1, hi ^ 1) << 1 | 1
+        # Reduction rule 2
+        # if the node is already present in the unique table then return it
+        return self.nodes.find(var, lo, hi) << 1
+
+    def variable(self, var):
+        """ returns the node of the single variable function x_var """
+        if var not in self.levels:
+            raise ValueError(f"variable {var} is not in the ordering")
+        return self.getNode(var, self.ZERO, self.ONE)
+
+    def _children(self, u):
+        """ returns the (lo, hi) edges of the internal edge u, complemented along with u """
+        c = u & 1
+        return self.nodes.lo[u >> 1] ^ c, self.nodes.hi[u >> 1] ^ c
+
+    def _cofactors(self, u, level):
+        """ returns the (lo, hi) cofactors of u with respect to the variable at level """
+        if self.getLevel(u) == level:
+            return self._children(u)
+        return u, u
+
+    def neg(self, f):
+        """ returns the complement of the edge f, in constant time """
+        return f ^ 1
+
+    def ite(self, f, g, h):
+        """ returns the node that results from applying ITE(f, g, h) """
+        return run(self._ite(f, g, h))
+
+    def _ite(self, f, g, h):
+        """ returns ITE(f, g, h) for the terminal cases or a generator computing it """
+        zero, one = self.ZERO, self.ONE
+        # ITE(1, g, h) = g
+        if f == one:
+            return g
+        # ITE(0, g, h) = h
+        if f == zero:
+            return h
+        # ITE(f', g, h) = ITE(f, h, g)
+        if f & 1:
+            f, g, h = f ^ 1, h, g
+        # ITE(f, f, h) = ITE(f, 1, h) and ITE(f, g, f) = ITE(f, g, 0), likewise for f'
+        if g == f:
+            g = one
+        elif g == f ^ 1:
+            g = zero
+        if h == f:
+            h = zero
+        elif h == f ^ 1:
+            h = one
+        # ITE(f, g, g) = g
+        if g == h:
+            return g
+        # ITE(f, 1, 0) = f
+        if g == one and h == zero:
+            return f
+        # ITE(f, 0, 1) = f'
+        if g == zero and h == one:
+            return f ^ 1
+        # ITE(f, g', h) = ITE(f, g, h')', so one cache entry serves both
+        c = g & 1
+        g, h = g ^ c, h ^ c
+        result = self.computed.get(("ite", f, g, h))
+        if result is not None:
+            return result ^ c
+        return self._iteExpand(f, g, h, c)
+
+    def _iteExpand(self, f, g, h, c):
+        """ generator computing ITE(f, g, h) by Shannon expansion, complemented if c """
+        # ITE(f, g, h) = ITE(x, ITE(fx, gx, hx), ITE(fx', gx', hx'))
+        # where x is the top variable of f, g and h in the ordering
+        level = min(self.getLevel(f), self.getLevel(g), self.getLevel(h))
+        var = self.ordering[level]
+        fLo, fHi = self._cofactors(f, level)
+        gLo, gHi = self._cofactors(g, level)
+        hLo, hHi = self._cofactors(h, level)
+        nodeLo = yield self._ite(fLo, gLo, hLo)
+        nodeHi = yield self._ite(fHi, gHi, hHi)
+        result = self.getNode(var, nodeLo, nodeHi)
+        self.computed.put(("ite", f, g, h), result)
+        return result ^ c
+
+    def apply(self, op, f, g):
+        """ returns the node of the binary operation op applied to f and g """
+        zero, one = self.ZERO, self.ONE
+        if op == "and":
+            return self.ite(f, g, zero)
+        if op == "or":
+            return self.ite(f, one, g)
+        if op == "xor":
+            return self.ite(f, self.neg(g), g)
+        if op == "nand":
+            return self.neg(self.ite(f, g, zero))
+        if op == "nor":
+            return self.neg(self.ite(f, one, g))
+        if op == "xnor":
+            return self.ite(f, g, self.neg(g))
+        if op == "implies":
+            return self.ite(f, g, one)
+        raise ValueError(f"unknown operation {op}")
+
+    def andOp(self, f, g):
+        """ returns the conjunction of f and g """
+        return self.apply("and", f, g)
+
+    def orOp(self, f, g):
+        """ returns the disjunction of f and g """
+        return self.apply("or", f, g)
+
+    def xorOp(self, f, g):
+        """ returns the exclusive or of f and g """
+        return self.apply("xor", f, g)
+
+    def nandOp(self, f, g):
+        """ returns the negated conjunction of f and g """
+        return self.apply("nand", f, g)
+
+    def impliesOp(self, f, g):
+        """ returns the implication f -> g """
+        return self.apply("implies", f, g)
+
+    def cube(self, cube):
+        """ returns the node of the conjunction of the literals of cube """
+        literals = set(cube)
+        for literal in literals:
+            if abs(literal) not in self.levels:
+                raise ValueError(f"variable {abs(literal)} is not in the ordering")
+            if -literal in literals:
+                return self.ZERO
+        node = self.ONE
+        # built from the bottom of the ordering up
+        for literal in sorted(literals, key=lambda l: self.levels[abs(l)], reverse=True):
+            if literal > 0:
+                node = self.getNode(literal, self.ZERO, node)
+            else:
+                node = self.getNode(-literal, node, self.ZERO)
+        return node
+
+    def cover(self, cubes):
+        """ returns the node of the disjunction of cubes """
+        nodes = [self.cube(c) for c in cubes]
+        if not nodes:
+            return self.ZERO
+        # pairwise rounds keep the intermediate results small
+        while len(nodes) > 1:
+            nodes = [self.apply("or", nodes[i], nodes[i + 1]) if i + 1 < len(nodes) else nodes[i]
+                     for i in range(0, len(nodes), 2)]
+        return nodes[0]
+
+    def addCubes(self, f, cubes):
+        """ returns f with cubes added to its cover, the or of f and the cubes """
+        return self.apply("or", f, self.cover(cubes))
+
+    def removeCubes(self, f, removed, retained):
+        """ returns f with the removed cubes taken out of its cover
+
+        retained are the cubes of the cover that are kept. Outside the removed
+        cubes D, f is unchanged; inside a removed cube r it is the or of the
+        retained cubes that intersect r, cofactored by r, so only those are
+        rebuilt and without the variables of r: ITE(D, sum of r.R|r, f).
+        """
+        removed = [set(r) for r in removed]
+        inside = self.ZERO
+        for r in removed:
+            # a cube intersects r unless it holds the opposite of a literal of r
+            opposites = {-l for l in r}
+            restricted = [tuple(l for l in c if l not in r)
+                          for c in retained if opposites.isdisjoint(c)]
+            part = self.apply("and", self.cube(r), self.cover(restricted))
+            inside = self.apply("or", inside, part)
+        return self.ite(self.cover(removed), inside, f)
+
+    def varsCube(self, variables):
+        """ returns the node of the conjunction of the variables, used as a variable set """
+        for var in variables:
+            if var not in self.levels:
+                raise ValueError(f"variable {var} is not in the ordering")
+        cube = self.ONE
+        # built from the bottom of the ordering up
+        for var in sorted(set(variables), key=self.levels.get, reverse=True):
+            cube = self.getNode(var, self.ZERO, cube)
+        return cube
+
+    def _skipCube(self, cube, level):
+        """ returns the part of the variable set cube at or below level """
+        nodes = self.nodes
+        # the edges of a positive cube are regular
+        while cube > self.ZERO and self.getLevel(cube) < level:
+            cube = nodes.hi[cube >> 1]
+        return cube
+
+    def exists(self, f, variables):
+        """ returns the existential quantification of f over the variables """
+        return run(self._exists(f, self.varsCube(variables)))
+
+    def forall(self, f, variables):
+        """ returns the universal quantification of f over the variables """
+        # for all x: f = not (exists x: not f)
+        return self.neg(self.exists(self.neg(f), variables))
+
+    def _exists(self, f, cube):
+        """ returns exists cube: f for the terminal cases or a generator computing it """
+        if f <= self.ZERO:
+            return f
+        cube = self._skipCube(cube, self.getLevel(f))
+        if cube == self.ONE:
+            return f
+        result = self.computed.get(("exists", f, cube))
+        if result is not None:
+            return result
+        return self._existsExpand(f, cube)
+
+    def _existsExpand(self, f, cube):
+        """ generator computing exists cube: f by Shannon expansion """
+        nodes = self.nodes
+        var = nodes.var[f >> 1]
+        lo, hi = self._children(f)
+        if nodes.var[cube >> 1] == var:
+            # exists x: f = fx' + fx
+            rest = nodes.hi[cube >> 1]
+            nodeLo = yield self._exists(lo, rest)
+            if nodeLo == self.ONE:
+                result = self.ONE
+            else:
+                nodeHi = yield self._exists(hi, rest)
+                result = yield self._ite(nodeLo, self.ONE, nodeHi)
+        else:
+            nodeLo = yield self._exists(lo, cube)
+            nodeHi = yield self._exists(hi, cube)
+            result = self.getNode(var, nodeLo, nodeHi)
+        self.computed.put(("exists", f, cube), result)
+        return result
+
+    def andExists(self, f, g, variables):
+        """ returns exists variables: f.g without building the conjunction f.g """
+        return run(self._andExists(f, g, self.varsCube(variables)))
+
+    def _andExists(self, f, g, cube):
+        """ returns the relational product for the terminal cases or a generator computing it """
+        zero, one = self.ZERO, self.ONE
+        if f == zero or g == zero or f == g ^ 1:
+            return zero
+        if f == one or f == g:
+            return self._exists(g, cube)
+        if g == one:
+            return self._exists(f, cube)
+        # the conjunction commutes, one cache entry serves both operand orders
+        if f > g:
+            f, g = g, f
+        level = min(self.getLevel(f), self.getLevel(g))
+        cube = self._skipCube(cube, level)
+        if cube == one:
+            return self._ite(f, g, zero)
+        result = self.computed.get(("andExists", f, g, cube))
+        if result is not None:
+            return result
+        return self._andExistsExpand(f, g, cube, level)
+
+    def _andExistsExpand(self, f, g, cube, level):
+        """ generator computing the relational product by Shannon expansion """
+        nodes = self.nodes
+        var = self.ordering[level]
+        fLo, fHi = self._cofactors(f, level)
+        gLo, gHi = self._cofactors(g, level)
+        if nodes.var[cube >> 1] == var:
+            # the variable is quantified: the result is the or of both branches
+            rest = nodes.hi[cube >> 1]
+            nodeLo = yield self._andExists(fLo, gLo, rest)
+            if nodeLo == self.ONE:
+                result = self.ONE
+            else:
+                nodeHi = yield self._andExists(fHi, gHi, rest)
+                result = yield self._ite(nodeLo, self.ONE, nodeHi)
+        else:
+            nodeLo = yield self._andExists(fLo, gLo, cube)
+            nodeHi = yield self._andExists(fHi, gHi, cube)
+            result = self.getNode(var, nodeLo, nodeHi)
+        self.computed.put(("andExists", f, g, cube), result)
+        return result
+
+    def cofactor(self, f, var, value):
+        """ returns the cofactor of f with respect to the variable var set to value """
+        if var not in self.levels:
+            raise ValueError(f"variable {var} is not in the ordering")
+        return run(self._cofactor(f, self.levels[var], bool(value)))
+
+    def _cofactor(self, f, level, value):
+        """ returns the cofactor of f for the terminal cases or a generator computing it """
+        fLevel = self.getLevel(f)
+        if fLevel > level:
+            return f
+        if fLevel == level:
+            return self._children(f)[value]
+        # the cofactor of f' is the complement of the cofactor of f
+        c = f & 1
+        result = self.computed.get(("cofactor", f ^ c, level, value))
+        if result is not None:
+            return result ^ c
+        return self._cofactorExpand(f ^ c, level, value, c)
+
+    def _cofactorExpand(self, f, level, value, c):
+        """ generator computing the cofactor of f below its top variable, complemented if c """
+        nodes = self.nodes
+        nodeLo = yield self._cofactor(nodes.lo[f >> 1], level, value)
+        nodeHi = yield self._cofactor(nodes.hi[f >> 1], level, value)
+        result = self.getNode(nodes.var[f >> 1], nodeLo, nodeHi)
+        self.computed.put(("cofactor", f, level, value), result)
+        return result ^ c
+
+    def booleanDifference(self, f, var):
+        """ returns the boolean difference of f with respect to var: fx xor fx' """
+        return self.apply("xor", self.cofactor(f, var, True), self.cofactor(f, var, False))
+
+    def _cubeLiterals(self, c):
+        """ returns the (level, value) literals of c if c is a cube, else None """
+        literals = list()
+        while c > self.ZERO:
+            lo, hi = self._children(c)
+            if lo == self.ZERO:
+                literals.append((self.getLevel(c), True))
+                c = hi
+            elif hi == self.ZERO:
+                literals.append((self.getLevel(c), False))
+                c = lo
+            else:
+                return None
+        return literals if c == self.ONE else None
+
+    def restrict(self, f, c):
+        """ returns f simplified on the care set c, equal to f wherever c holds
+
+        Variables of c that f does not depend on are quantified out of c. As
+        in CUDD, f itself is returned when the restricted graph would be
+        larger. An empty care set gives zero.
+        """
+        if self._cubeLiterals(c) is not None:
+            return run(self._cubeCofactor(f, c))
+        result = run(self._restrict(f, c))
+        if c != self.ZERO and self.countNodes(result) > self.countNodes(f):
+            return f
+        return result
+
+    def constrain(self, f, c):
+        """ returns the generalized cofactor of f with respect to c
+
+        The result agrees with f wherever c holds and maps every other point
+        to the nearest point of c, so constrain(f, c).c = f.c and the
+        operation distributes over and, or and negation. An empty c gives zero.
+        """
+        if self._cubeLiterals(c) is not None:
+            return run(self._cubeCofactor(f, c))
+        return run(self._constrain(f, c))
+
+    def _careCases(self, f, c):
+        """ returns the result shared by restrict and constrain in the terminal cases, else None """
+        if c == self.ZERO:
+            return self.ZERO
+        if c == self.ONE or f <= self.ZERO:
+            return f
+        if f == c:
+            return self.ONE
+        if f == c ^ 1:
+            return self.ZERO
+        return None
+
+    def _restrict(self, f, c):
+        """ returns restrict(f, c) for the terminal cases or a generator computing it """
+        result = self._careCases(f, c)
+        if result is not None:
+            return result
+        # restrict(f', c) = restrict(f, c)'
+        fc = f & 1
+        result = self.computed.get(("restrict", f ^ fc, c))
+        if result is not None:
+            return result ^ fc
+        return self._restrictExpand(f ^ fc, c, fc)
+
+    def _restrictExpand(self, f, c, fc):
+        """ generator computing restrict(f, c) by Shannon expansion, complemented if fc """
+        level = self.getLevel(f)
+        cLevel = self.getLevel(c)
+        cLo, cHi = self._cofactors(c, min(level, cLevel))
+        if cLevel < level:
+            # f does not depend on the top variable of c, drop it from the care set
+            care = yield self._ite(cLo, self.ONE, cHi)
+            result = yield self._restrict(f, care)
+        else:
+            lo, hi = self._children(f)
+            if cLo == self.ZERO:
+                result = yield self._restrict(hi, cHi)
+            elif cHi == self.ZERO:
+                result = yield self._restrict(lo, cLo)
+            else:
+                nodeLo = yield self._restrict(lo, cLo)
+                nodeHi = yield self._restrict(hi, cHi)
+                result = self.getNode(self.ordering[level], nodeLo, nodeHi)
+        self.computed.put(("restrict", f, c), result)
+        return result ^ fc
+
+    def _constrain(self, f, c):
+        """ returns constrain(f, c) for the terminal cases or a generator computing it """
+        result = self._careCases(f, c)
+        if result is not None:
+            return result
+        # constrain(f', c) = constrain(f, c)'
+        fc = f & 1
+        result = self.computed.get(("constrain", f ^ fc, c))
+        if result is not None:
+            return result ^ fc
+        return self._constrainExpand(f ^ fc, c, fc)
+
+    def _constrainExpand(self, f, c, fc):
+        """ generator computing constrain(f, c) by Shannon expansion, complemented if fc """
+        level = min(self.getLevel(f), self.getLevel(c))
+        lo, hi = self._cofactors(f, level)
+        cLo, cHi = self._cofactors(c, level)
+        if cLo == self.ZERO:
+            result = yield self._constrain(hi, cHi)
+        elif cHi == self.ZERO:
+            result = yield self._constrain(lo, cLo)
+        else:
+            nodeLo = yield self._constrain(lo, cLo)
+            nodeHi = yield self._constrain(hi, cHi)
+            result = self.getNode(self.ordering[level], nodeLo, nodeHi)
+        self.computed.put(("constrain", f, c), result)
+        return result ^ fc
+
+    def _cubeCofactor(self, f, cube):
+        """ returns the cofactor of f by the cube edge cube or a generator computing it """
+        if f <= self.ZERO:
+            return f
+        level = self.getLevel(f)
+        # literals above the top variable of f do not change it
+        while cube > self.ZERO and self.getLevel(cube) < level:
+            lo, hi = self._children(cube)
+            cube = hi if lo == self.ZERO else lo
+        if cube == self.ONE:
+            return f
+        fc = f & 1
+        result = self.computed.get(("cubeCofactor", f ^ fc, cube))
+        if result is not None:
+            return result ^ fc
+        return self._cubeCofactorExpand(f ^ fc, cube, fc)
+
+    def _cubeCofactorExpand(self, f, cube, fc):
+        """ generator computing the cofactor of f by a cube, complemented if fc """
+        lo, hi = self._children(f)
+        if self.getLevel(cube) == self.getLevel(f):
+            cLo, cHi = self._children(cube)
+            if cLo == self.ZERO:
+                result = yield self._cubeCofactor(hi, cHi)
+            else:
+                result = yield self._cubeCofactor(lo, cLo)
+        else:
+            nodeLo = yield self._cubeCofactor(lo, cube)
+            nodeHi = yield self._cubeCofactor(hi, cube)
+            result = self.getNode(self.nodes.var[f >> 1], nodeLo, nodeHi)
+        self.computed.put(("cubeCofactor", f, cube), result)
+        return result ^ fc
+
+    def cofactorCubes(self, f, cubes):
+        """ returns the cofactors of f by each cube of literals, in the order of cubes
+
+        The cubes are sorted by their literals in the ordering and walked as a
+        trie, so the cofactor by a shared prefix of literals is computed once.
+        """
+        keyed = list()
+        for cube in cubes:
+            literals = set(cube)
+            for literal in literals:
+                if abs(literal) not in self.levels:
+                    raise ValueError(f"variable {abs(literal)} is not in the ordering")
+                if -literal in literals:
+                    raise ValueError(f"cube {tuple(cube)} holds both literals of {abs(literal)}")
+            keyed.append(tuple(sorted((self.levels[abs(l)], l > 0) for l in literals)))
+        results = [None] * len(keyed)
+        # prefix holds the literals applied so far and the cofactor after each one
+        prefix, partial = list(), [f]
+        for i in sorted(range(len(keyed)), key=keyed.__getitem__):
+            literals = keyed[i]
+            shared = 0
+            while (shared < len(prefix) and shared < len(literals)
+                   and prefix[shared] == literals[shared]):
+                shared += 1
+            del prefix[shared:], partial[shared + 1:]
+            for level, value in literals[shared:]:
+                partial.append(run(self._cofactor(partial[-1], level, value)))
+                prefix.append((level, value))
+            results[i] = partial[-1]
+        return results
+
+    def getExpression(self, u):
+        """ returns the expression of the node u, one disjoint cube per path to one """
+        return boolfunc.Expression(cubes=tuple(self.paths(u)), numVars=self.numVars)
+
+    def paths(self, u):
+        """ yields the cube of every path from u to the one terminal, lazily
+
+        The cubes are pairwise disjoint, so they form a disjoint sum of products.
+        """
+        nodes = self.nodes
+        # the stack holds the edges still to expand with the literals leading to them
+        stack = [(u, ())]
+        while stack:
+            v, cube = stack.pop()
+            if v == self.ONE:
+                yield cube
+            elif v != self.ZERO:
+                var = nodes.var[v >> 1]
+                lo, hi = self._children(v)
+                stack.append((hi, cube + (var,)))
+                stack.append((lo, cube + (-var,)))
+
+    def pathCount(self, u):
+        """ returns the number of paths from u to the one function in O(nodes) """
+        # (paths to one, paths to zero) of every regular edge, swapped by a complement
+        count = {self.ONE: (1, 0)}
+        for v in self.postorder(u):
+            if v > self.ZERO:
+                lo, hi = self._children(v)
+                loCount = count[lo & ~1][::-1] if lo & 1 else count[lo]
+                hiCount = count[hi]
+                count[v] = (loCount[0] + hiCount[0], loCount[1] + hiCount[1])
+        return count[u & ~1][u & 1]
+
+    def satCount(self, u):
+        """ returns the number of minterms of u over the variables 1..numVars in O(nodes)
+
+        Variables missing from the ordering are don't cares. Python integers
+        keep the count exact for any number of variables.
+        """
+        numLevels = len(self.ordering)
+        # count[v] is the number of minterms of the regular edge v over its level
+        # and the levels below
+        count = {self.ONE: 1}
+
+        def edgeCount(e):
+            # the complement of e has the other minterms of its levels
+            if e & 1:
+                return (1 << (numLevels - self.getLevel(e))) - count[e ^ 1]
+            return count[e]
+        for v in self.postorder(u):
+            if v > self.ZERO:
+                level = self.getLevel(v)
+                lo, hi = self._children(v)
+                count[v] = (edgeCount(lo) << (self.getLevel(lo) - level - 1)) + \
+                    (edgeCount(hi) << (self.getLevel(hi) - level - 1))
+        return (edgeCount(u) << self.getLevel(u)) << max(0, self.numVars - numLevels)
+
+    def density(self, u):
+        """ returns the fraction of the minterms over 1..numVars that satisfy u """
+        return self.satCount(u) / (1 << max(self.numVars, len(self.ordering)))
+
+    def pickOne(self, u):
+        """ returns one satisfying cube of u as a {var: value} dict, None if u is zero """
+        if u == self.ZERO:
+            return None
+        nodes = self.nodes
+        assignment = dict()
+        # every internal edge of a reduced bdd reaches one through a child other than zero
+        while u > self.ZERO:
+            var = nodes.var[u >> 1]
+            lo, hi = self._children(u)
+            if hi != self.ZERO:
+                assignment[var], u = True, hi
+            else:
+                assignment[var], u = False, lo
+        return assignment
+
+    def assignments(self, u, variables=None):
+        """ yields every satisfying assignment of u over variables as a {var: value} dict
+
+        variables defaults to the ordering; the don't cares of each path cube
+        are expanded, so the assignments are produced lazily without repeats.
+        """
+        variables = self.ordering if variables is None else list(variables)
+        for cube in self.paths(u):
+            fixed = {abs(l): l > 0 for l in cube}
+            free = [v for v in variables if v not in fixed]
+            for bits in range(1 << len(free)):
+                assignment = dict(fixed)
+                for i, v in enumerate(free):
+                    assignment[v] = bool(bits >> i & 1)
+                yield assignment
+
+    def preorder(self, root):
+        """ yields every node reachable from root once in DFS pre-order, lo before hi
+
+        Nodes are yielded as their regular edges, the terminal as ONE.
+        """
+        nodes = self.nodes
+        visited = set()
+        stack = [root & ~1]
+        while stack:
+            u = stack.pop()
+            if u in visited:
+                continue
+            visited.add(u)
+            yield u
+            if u > self.ZERO:
+                stack.append(nodes.hi[u >> 1])
+                stack.append(nodes.lo[u >> 1] & ~1)
+
+    def postorder(self, root):
+        """ yields every node reachable from root once in DFS post-order, lo before hi
+
+        Nodes are yielded as their regular edges, the terminal as ONE.
+        """
+        nodes = self.nodes
+        visited = set()
+        stack = [(root & ~1, False)]
+        while stack:
+            u, expanded = stack.pop()
+            if expanded:
+                yield u
+                continue
+            if u in visited:
+                continue
+            visited.add(u)
+            if u <= self.ZERO:
+                yield u
+                continue
+            # the node is yielded again once both children are done
+            stack.append((u, True))
+            for child in (nodes.hi[u >> 1], nodes.lo[u >> 1] & ~1):
+                if child not in visited:
+                    stack.append((child, False))
+
+    def bfs(self, root):
+        """ yields every node reachable from root once in BFS order, as regular edges """
+        nodes = self.nodes
+        root &= ~1
+        visited = {root}
+        queue = collections.deque((root,))
+        while queue:
+            u = queue.popleft()
+            yield u
+            if u > self.ZERO:
+                for child in (nodes.lo[u >> 1] & ~1, nodes.hi[u >> 1]):
+                    if child not in visited:
+                        visited.add(child)
+                        queue.append(child)
+
+    def levelorder(self, root):
+        """ yields every node reachable from root once, level by level from the top """
+        byLevel = collections.defaultdict(list)
+        for u in self.bfs(root):
+            byLevel[self.getLevel(u)].append(u)
+        for level in sorted(byLevel):
+            yield from byLevel[level]
+
+    def countNodes(self, *roots):
+        """ returns the number of nodes reachable from roots including the terminal """
+        nodes = self.nodes
+        reached = {u >> 1 for u in roots}
+        stack = [u for u in reached if u != NodeTable.TERMINAL]
+        while stack:
+            u = stack.pop()
+            for child in (nodes.lo[u] >> 1, nodes.hi[u] >> 1):
+                if child not in reached:
+                    reached.add(child)
+                    if child != NodeTable.TERMINAL:
+                        stack.append(child)
+        return len(reached)
+
+    def levelCounts(self):
+        """ returns the (var, node count) of every level of the node table, top level first """
+        counts = collections.Counter(var for var, _, _ in self.nodes.unique)
+        return [(var, counts[var]) for var in self.ordering]
+
+    def size(self):
+        """ returns the number of live nodes in the node store including terminals """
+        return self.nodes.liveCount()
+
+    def clearCache(self):
+        """ empties the computed table and the construction cache """
+        self.computed.clear()
+        self.buildCache.clear()
+
+    def register(self, bdd):
+        """ keeps the root of bdd alive and valid across reordering """
+        key = id(bdd)
+        handles = self.handles
+        # the entry is dropped when bdd dies, unless the id was reused by then
+        self.handles[key] = weakref.ref(
+            bdd, lambda ref: handles.pop(key) if handles.get(key) is ref else None)
+
+    def ref(self, u):
+        """ keeps the node u and its descendants alive until a matching deref """
+        self.rootRefs[u] += 1
+        return u
+
+    def deref(self, u):
+        """ drops a reference taken with ref, the node is freed by the next collection """
+        if self.rootRefs[u] <= 0:
+            raise ValueError(f"node {u} is not referenced")
+        self.rootRefs[u] -= 1
+        if self.rootRefs[u] == 0:
+            del self.rootRefs[u]
+
+    def _overBudget(self):
+        """ returns true if the node table is past its node or memory budget """
+        return (self.maxNodes is not None and self.nodes.liveCount() > self.maxNodes) or \
+            (self.maxMemory is not None and self.nodes.memoryUsage() > self.maxMemory)
+
+    def checkpoint(self):
+        """ collects garbage and reorders if a budget is exceeded, called between operations
+
+        Only the registered bdds and the roots held with ref survive a
+        collection, so node indices kept elsewhere must be referenced.
+        """
+        if self._overBudget() and self.nodes.liveCount() > self._gcFloor:
+            self.collect()
+            if self.gcReorder and self._overBudget():
+                self.reorder()
+            # when the live nodes alone pass the budget, wait for the table to
+            # double before marking it again
+            self._gcFloor = 2 * self.nodes.liveCount() if self._overBudget() else 0
+        if self.autoReorder and self.nodes.liveCount() > self.reorderThreshold:
+            self.reorder()
+            # the next reordering happens once the table doubles again
+            self.reorderThreshold = max(self.reorderThreshold, 2 * self.nodes.liveCount())
+
+    def _rootCounts(self, roots=()):
+        """ returns the external reference count of every root """
+        counts = collections.Counter(bdd.root for bdd in
+                                     (ref() for ref in list(self.handles.values()))
+                                     if bdd is not None)
+        counts.update(self.rootRefs)
+        counts.update(roots)
+        return counts
+
+    def _mark(self, counts, refs=None):
+        """ returns the indices of the internal nodes reachable from the root edges in counts
+
+        When refs is given, the number of parents and roots of every node is
+        added to it.
+        """
+        nodes = self.nodes
+        terminal = NodeTable.TERMINAL
+        reached = set()
+        stack = [u >> 1 for u in counts if u > self.ZERO]
+        reached.update(stack)
+        while stack:
+            u = stack.pop()
+            for child in (nodes.lo[u] >> 1, nodes.hi[u] >> 1):
+                if refs is not None:
+                    refs[child] += 1
+                if child != terminal and child not in reached:
+                    reached.add(child)
+                    stack.append(child)
+        if refs is not None:
+            for u, count in counts.items():
+                refs[u >> 1] += count
+        return reached
+
+    def _sweep(self, reached):
+        """ releases every node not in reached, returns how many were released """
+        nodes = self.nodes
+        dead = [u for u in nodes.unique.values() if u not in reached]
+        if dead:
+            # the caches may hold the released nodes
+            self.clearCache()
+            for u in dead:
+                nodes.release(u)
+        return len(dead)
+
+    def collect(self, roots=()):
+        """ frees the nodes no registered bdd, referenced node or roots reach
+
+        Returns the number of nodes freed; their slots are reused by new nodes.
+        """
+        freed = self._sweep(self._mark(self._rootCounts(roots)))
+        self.collections += 1
+        self.collected += freed
+        return freed
+
+    def stats(self):
+        """ returns the unique table counters; live and dead nodes need a marking pass """
+        nodes = self.nodes
+        live = len(self._mark(self._rootCounts())) + 1
+        return {
+            "nodes": nodes.liveCount(),
+            "live": live,
+            "dead": nodes.liveCount() - live,
+            "peak": nodes.peak,
+            "slots": len(nodes),
+            "free": len(nodes.free),
+            "loadFactor": nodes.loadFactor(),
+            "memory": nodes.memoryUsage(),
+            "collections": self.collections,
+            "collected": self.collected,
+            "reorderings": self.reorderings,
+        }
+
+    def _startReordering(self, roots=()):
+        """ computes reference counts and subtables, releasing unreachable nodes """
+        nodes = self.nodes
+        refs = [0] * len(nodes)
+        reached = self._mark(self._rootCounts(roots), refs)
+        # nodes that no root reaches are garbage
+        self.clearCache()
+        self._sweep(reached)
+        subtables = {var: set() for var in self.ordering}
+        for u in reached:
+            subtables[nodes.var[u]].add(u)
+        self._refs, self._subtables = refs, subtables
+
+    def _stopReordering(self):
+        """ drops the reordering state """
+        self._refs = self._subtables = None
+        self.clearCache()
+
+    def _ref(self, u):
+        """ increments the reference count of u """
+        self._refs[u] += 1
+
+    def _deref(self, u):
+        """ decrements the reference count of node u, releasing it and its dead descendants """
+        refs, nodes = self._refs, self.nodes
+        stack = [u]
+        while stack:
+            v = stack.pop()
+            refs[v] -= 1
+            if refs[v] == 0 and v != NodeTable.TERMINAL:
+                self._subtables[nodes.var[v]].discard(v)
+                stack.append(nodes.lo[v] >> 1)
+                stack.append(nodes.hi[v] >> 1)
+                nodes.release(v)
+
+    def _siftNode(self, var, lo, hi):
+        """ returns the edge of a referenced node (var, lo, hi) created while reordering """
+        if lo == hi:
+            self._ref(lo >> 1)
+            return lo
+        # the hi edge is kept regular as in getNode
+        c = hi & 1
+        lo, hi = lo ^ c, hi ^ c
+        nodes = self.nodes
+        u = nodes.unique.get((var, lo, hi))
+        if u is None:
+            u = nodes.find(var, lo, hi)
+            if u >= len(self._refs):
+                self._refs.extend([0] * (u + 1 - len(self._refs)))
+            self._refs[u] = 0
+            self._ref(lo >> 1)
+            self._ref(hi >> 1)
+            self._subtables[var].add(u)
+        self._ref(u)
+        return u << 1 | c
+
+    def _swap(self, level):
+        """ swaps the variables at level and level + 1 in place """
+        nodes = self.nodes
+        x, y = self.ordering[level], self.ordering[level + 1]
+        subX, subY = self._subtables[x], self._subtables[y]
+        for u in list(subX):
+            f0, f1 = nodes.lo[u], nodes.hi[u]
+            lo0, hi0 = self._children(f0) if nodes.var[f0 >> 1] == y else (f0, f0)
+            lo1, hi1 = self._children(f1) if nodes.var[f1 >> 1] == y else (f1, f1)
+            if lo0 == hi0 and lo1 == hi1:
+                # u does not depend on y, it simply moves one level down
+                continue
+            # u keeps its index and function: u = y ? (x ? f11 : f01) : (x ? f10 : f00)
+            # f1 is regular, so newHi is regular as the canonical form requires
+            newLo = self._siftNode(x, lo0, lo1)
+            newHi = self._siftNode(x, hi0, hi1)
+            subX.discard(u)
+            nodes.relabel(u, y, newLo, newHi)
+            subY.add(u)
+            self._deref(f0 >> 1)
+            self._deref(f1 >> 1)
+        self.ordering[level], self.ordering[level + 1] = y, x
+        self.levels[x], self.levels[y] = level + 1, level
+
+    def _liveSize(self):
+        """ returns the number of nodes reachable from the roots while reordering """
+        return sum(map(len, self._subtables.values()))
+
+    def swapLevels(self, level, roots=()):
+        """ swaps the variables at level and level + 1, keeping every registered bdd valid """
+        if not 0 <= level < len(self.ordering) - 1:
+            raise ValueError(f"invalid level {level}")
+        self._startReordering(roots)
+        try:
+            self._swap(level)
+        finally:
+            self._stopReordering()
+
+    def _siftVariable(self, var, maxGrowth, deadline):
+        """ moves var to the level where the bdd is smallest, returns that size """
+        size = best = self._liveSize()
+        bestLevel = level = self.levels[var]
+        last = len(self.ordering) - 1
+        # move towards the closer end first so the walk is shorter
+        directions = (1, -1) if last - level <= level else (-1, 1)
+        for step in directions:
+            while 0 <= level + step <= last:
+                self._swap(min(level, level + step))
+                level += step
+                size = self._liveSize()
+                if size < best:
+                    best, bestLevel = size, level
+                if size > maxGrowth * best or time.monotonic() > deadline:
+                    break
+        # go back to the best position found
+        while level != bestLevel:
+            step = 1 if bestLevel > level else -1
+            self._swap(min(level, level + step))
+            level += step
+        return best
+
+    def reorder(self, roots=(), maxGrowth=1.2, maxTime=None):
+        """ reorders the variables with Rudell's sifting, returns the new live node count
+
+        Every variable is moved through all the levels, largest subtable first,
+        and left where the bdds are smallest. A direction is abandoned when the
+        node count grows past maxGrowth times the best size, and sifting stops
+        after maxTime seconds. Nodes reachable from the registered bdds and from
+        roots keep their indices, every other node is released.
+        """
+        deadline = float("inf") if maxTime is None else time.monotonic() + maxTime
+        self._startReordering(roots)
+        try:
+            order = sorted(self.ordering, key=lambda v: len(self._subtables[v]), reverse=True)
+            for var in order:
+                if time.monotonic() > deadline:
+                    break
+                self._siftVariable(var, maxGrowth, deadline)
+        finally:
+            self._stopReordering()
+        self.reorderings += 1
+        return self.size()
@@ -1,142 +1,291 @@
-from cProfile import label
-import collections
-from distutils.command.build import build
-from functools import cache
-from math import exp
-import random
-import weakref
+import concurrent.futures
+import importlib
+import os
 import boolfunc
-import pydot
-from IPython.display import Image, display
-import urp
 import pcn
-
-
-class BDDNode:
-    """ Class for a bdd node"""
-    # Defining the key for zero and one nodes
-    BDDNODEZEROKEY = (-1, id(None), id(None))
-    BDDNODEONEKEY = (-2, id(None), id(None))
-
-    def __init__(self, exp, var):
-        """ constructor for BDDNode class """
-        self.exp = exp
-        self.var = var
-        self.lo = None
-        self.hi = None
-
-    @staticmethod
-    def getNodeZero(numVars):
-        """ returns the zero node """
-        # the var for zero node is made -1
-        exp = boolfunc.Expression.getEqnZero(numVars)
-        return BDDNode(exp, -1)
-
-    @staticmethod
-    def getNodeOne(numVars):
-        """ returns the one node """
-        # the var for one node is made -2
-        exp = boolfunc.Expression.getEqnOne(numVars)
-        return BDDNode(exp, -2)
-
-    def getKey(self):
-        """ returns the key for the node """
-        return (self.var, id(self.lo), id(self.hi))
-
-    def __str__(self) -> str:
-        """ returns the string representation of the node """
-        rep = list()
-        rep.append(f"id:{id(self)}")
-        rep.append(f"var:{self.var}")
-        rep.append(f"exp:{self.exp}")
-        rep.append(f"lo:{id(self.lo)}")
-        rep.append(f"hi:{id(self.lo)}")
-        return "\n".join(rep)
-
-    def __repr__(self) -> str:
-        """ returns the string representation of the node """
-        return self.__str__()
-
-    def _getUid(self):
-        """returns the UID for a node"""
-        uid = f"var->{self.var}\nid->{id(self)}\nlo->{id(self.lo)}    hi->{id(self.hi)}"
-        return uid
-
-    def getLabel(self):
-        """ returns the label for the node """
-
-        # label is 0 if val is -1
-        if self.var == -1:
-            label = "0"
-        # label is 1 if val is -2
-        elif self.var == -2:
-            label = "1"
-        # label is the variable in expression
-        else:
-            label = f"X{self.var}"
-        return label
+from manager import BDDManager, BDDNode
+import varorder
+import bddio
+import export
 
 
 class BDD:
     """class for BDD"""
-
-    def __init__(self, exp: boolfunc.Expression, ordering: list) -> None:
-        """ constructor for BDD class """
+    # ordering heuristic used when no ordering list is given
+    DEFAULTHEURISTIC = "minato"
+    # number of top variables split on by a parallel build
+    SPLITDEPTH = 3
+
+    def __init__(self, exp: boolfunc.Expression, ordering=None, manager: BDDManager = None,
+                 workers=1, splitDepth=SPLITDEPTH) -> None:
+        """ constructor for BDD class
+
+        With workers other than 1 the cofactors on the first splitDepth
+        variables are built in that many processes, None meaning one per cpu.
+        """
         # store the number of variables
         self.exp = exp
+        self.workers = workers
+        self.splitDepth = splitDepth
+        # the manager owns the unique table, a new one is created if none is shared
+        if manager is None:
+            # without an explicit ordering list one is derived from the cubes
+            if ordering is None:
+                ordering = BDD.DEFAULTHEURISTIC
+            if isinstance(ordering, str):
+                ordering = varorder.heuristic(ordering, exp.cubes, exp.numVars)
+            manager = BDDManager(ordering, exp.numVars)
+        elif ordering is not None and list(ordering) != manager.ordering:
+            raise ValueError("ordering does not match the manager ordering")
+        self.manager = manager
         # store the ordering of the variables
-        self.ordering = ordering
+        self.ordering = manager.ordering
         # node/bdd cache
-        self.NODES = weakref.WeakValueDictionary()
+        self.NODES = manager.NODES
         # get the node for zero and one
-        self.BDDNODEZERO = BDDNode.getNodeZero(exp.numVars)
-        self.NODES[self.BDDNODEZERO.getKey()] = self.BDDNODEZERO
-        self.BDDNODEONE = BDDNode.getNodeOne(exp.numVars)
-        self.NODES[self.BDDNODEONE.getKey()] = self.BDDNODEONE
-        # build the bdd
-        self.node = self.buildBDD()
+        self.BDDNODEZERO = manager.BDDNODEZERO
+        self.BDDNODEONE = manager.BDDNODEONE
+        # build the bdd, the root is the index of its node in the manager
+        self.root = self.buildBDD()
+        manager.register(self)
+        manager.checkpoint()
+
+    @staticmethod
+    def fromNode(root: int, manager: BDDManager):
+        """ returns the bdd rooted at an existing node index of the manager """
+        bdd = BDD.__new__(BDD)
+        bdd.exp = None
+        bdd.workers, bdd.splitDepth = 1, BDD.SPLITDEPTH
+        bdd.manager = manager
+        bdd.ordering = manager.ordering
+        bdd.NODES = manager.NODES
+        bdd.BDDNODEZERO = manager.BDDNODEZERO
+        bdd.BDDNODEONE = manager.BDDNODEONE
+        bdd.root = root
+        manager.register(bdd)
+        manager.checkpoint()
+        return bdd
+
+    @staticmethod
+    def load(filePath, manager: BDDManager = None):
+        """ returns the bdd saved in filePath, rebuilt without cofactoring """
+        manager, roots = bddio.load(filePath, manager)
+        return BDD.fromNode(roots[0], manager)
+
+    @staticmethod
+    def cached(exp: boolfunc.Expression, cacheDir, ordering=None, manager: BDDManager = None):
+        """ returns the bdd of exp from cacheDir, building and storing it on a miss
+
+        The cache key is the hash of the canonical cover and of the ordering
+        (the manager ordering, the ordering list or the heuristic name).
+        """
+        if manager is not None:
+            ordering = manager.ordering
+        elif ordering is None:
+            ordering = BDD.DEFAULTHEURISTIC
+        digest = bddio.coverHash(exp.cubes, exp.numVars, ordering)
+        try:
+            bdd = BDD.load(bddio.cachePath(cacheDir, digest), manager)
+        except FileNotFoundError:
+            bdd = BDD(exp, ordering if manager is None else None, manager)
+            bddio.store(cacheDir, bdd.manager, [bdd.root], digest)
+        bdd.exp = exp
+        return bdd
+
+    def save(self, filePath):
+        """ saves the node table of the bdd with the hash of its source cover """
+        digest = None if self.exp is None else \
+            bddio.coverHash(self.exp.cubes, self.exp.numVars, self.ordering)
+        bddio.save(filePath, self.manager, [self.root], digest)
+
+    @property
+    def node(self):
+        """ returns a view of the root node """
+        return self.manager.view(self.root)
+
+    def _operand(self, other):
+        """ returns the root of other after checking it shares the manager """
+        if not isinstance(other, BDD):
+            raise TypeError("expected a BDD operand")
+        if other.manager is not self.manager:
+            raise ValueError("bdds must share the same manager")
+        return other.root
+
+    def ite(self, g, h):
+        """ returns the bdd of ITE(self, g, h) """
+        root = self.manager.ite(self.root, self._operand(g), self._operand(h))
+        return BDD.fromNode(root, self.manager)
+
+    def apply(self, op, other):
+        """ returns the bdd of the binary operation op applied to self and other """
+        root = self.manager.apply(op, self.root, self._operand(other))
+        return BDD.fromNode(root, self.manager)
+
+    def __and__(self, other):
+        """ returns the conjunction of two bdds """
+        return self.apply("and", other)
+
+    def __or__(self, other):
+        """ returns the disjunction of two bdds """
+        return self.apply("or", other)
+
+    def __xor__(self, other):
+        """ returns the exclusive or of two bdds """
+        return self.apply("xor", other)
+
+    def __invert__(self):
+        """ returns the complement of the bdd """
+        return BDD.fromNode(self.manager.neg(self.root), self.manager)
+
+    def exists(self, variables):
+        """ returns the bdd of the existential quantification over the variables """
+        return BDD.fromNode(self.manager.exists(self.root, variables), self.manager)
+
+    def forall(self, variables):
+        """ returns the bdd of the universal quantification over the variables """
+        return BDD.fromNode(self.manager.forall(self.root, variables), self.manager)
+
+    def andExists(self, other, variables):
+        """ returns the bdd of exists variables: self.other, the relational product """
+        root = self.manager.andExists(self.root, self._operand(other), variables)
+        return BDD.fromNode(root, self.manager)
+
+    def cofactor(self, var, value):
+        """ returns the bdd of the cofactor with respect to var set to value """
+        return BDD.fromNode(self.manager.cofactor(self.root, var, value), self.manager)
+
+    def restrict(self, care):
+        """ returns the bdd simplified on the care set, equal to self wherever care holds """
+        return BDD.fromNode(self.manager.restrict(self.root, self._operand(care)), self.manager)
+
+    def constrain(self, care):
+        """ returns the bdd of the generalized cofactor with respect to care """
+        return BDD.fromNode(self.manager.constrain(self.root, self._operand(care)), self.manager)
+
+    def cofactors(self, cubes):
+        """ returns the bdds of the cofactors by each cube of literals, sharing their prefixes """
+        roots = self.manager.cofactorCubes(self.root, cubes)
+        # the checkpoint of each wrap must not collect the roots not wrapped yet
+        for root in roots:
+            self.manager.ref(root)
+        try:
+            return [BDD.fromNode(root, self.manager) for root in roots]
+        finally:
+            for root in roots:
+                self.manager.deref(root)
+
+    def booleanDifference(self, var):
+        """ returns the bdd of the boolean difference with respect to var """
+        return BDD.fromNode(self.manager.booleanDifference(self.root, var), self.manager)
+
+    def addCubes(self, cubes):
+        """ returns the bdd of the cover with cubes added, or-ing their bdd into the root """
+        cubes = tuple(cubes)
+        bdd = BDD.fromNode(self.manager.addCubes(self.root, cubes), self.manager)
+        if self.exp is not None:
+            bdd.exp = boolfunc.Expression(cubes=self.exp.cubes + cubes,
+                                          numVars=self.exp.numVars, backend=self.exp.backend)
+        return bdd
+
+    def removeCubes(self, cubes):
+        """ returns the bdd of the cover with cubes removed
+
+        Only the cubes of the cover that intersect the removed ones are
+        rebuilt, so the bdd needs the cover it was built from.
+        """
+        if self.exp is None:
+            raise ValueError("the cover of the bdd is unknown")
+        targets = {frozenset(c) for c in cubes}
+        removed, retained = list(), list()
+        for cube in self.exp.cubes:
+            (removed if frozenset(cube) in targets else retained).append(cube)
+        if not removed:
+            return self
+        bdd = BDD.fromNode(self.manager.removeCubes(self.root, removed, retained), self.manager)
+        bdd.exp = boolfunc.Expression(cubes=retained, numVars=self.exp.numVars,
+                                      backend=self.exp.backend)
+        return bdd
+
+    def __eq__(self, other) -> bool:
+        """ returns true if both bdds represent the same function """
+        if not isinstance(other, BDD):
+            return NotImplemented
+        return self.manager is other.manager and self.root == other.root
+
+    def __hash__(self) -> int:
+        """ returns the hash of the bdd root """
+        return hash((id(self.manager), self.root))
 
     def displayGraph(self):
         """ displays the graph """
+        # the notebook display is only needed here, the core stays headless
+        from IPython.display import display
         img = self.getPng()
         display(img)
 
-    def getPng(self):
+    def getPng(self, maxNodes=None, collapseLevel=None):
         """ returns the png image of the graph """
-        self.graph = pydot.Dot(graph_type="digraph")
-        # visited set for dfs to keep track of visited nodes
-        visited = set()
-        # call dfs to get the nodes in post order
-        BDD.dfs(self.graph, self.node, visited)
-        return Image(self.graph.create_png())
+        from IPython.display import Image
+        return Image(data=self.render(maxNodes=maxNodes, collapseLevel=collapseLevel))
+
+    def export(self, sink, format="dot", maxNodes=None, collapseLevel=None):
+        """ writes the graph as dot, graphml or json to a text sink or a file path """
+        export.write(sink, self.manager, [self.root], format, maxNodes, collapseLevel)
+
+    def render(self, filePath=None, format="png", maxNodes=None, collapseLevel=None):
+        """ renders the graph with graphviz, returns the image bytes if no file path is given """
+        return export.render(self.manager, [self.root], filePath, format, maxNodes, collapseLevel)
 
     def getExpression(self):
         """ returns the expression of the bdd """
         vis = set()
         cubes = getExpression(self.node, vis)
-        return boolfunc.Expression(cubes=cubes, numVars=self.exp.numVars)
+        return boolfunc.Expression(cubes=cubes, numVars=self.manager.numVars)
+
+    def iterCubes(self):
+        """ yields the disjoint cubes of the bdd lazily, one per path to one """
+        return self.manager.paths(self.root)
+
+    def writePcn(self, sink):
+        """ streams the disjoint cube list of the bdd in pcn format to a text sink """
+        sink.write(f"{self.manager.numVars}\n{self.manager.pathCount(self.root)}\n")
+        for cube in self.iterCubes():
+            sink.write(pcn.cube_to_str(cube))
+            sink.write("\n")
+
+    def satCount(self):
+        """ returns the number of satisfying minterms of the bdd """
+        return self.manager.satCount(self.root)
+
+    def density(self):
+        """ returns the fraction of minterms satisfying the bdd """
+        return self.manager.density(self.root)
+
+    def pickOne(self):
+        """ returns one satisfying cube as a {var: value} dict, None if unsatisfiable """
+        return self.manager.pickOne(self.root)
+
+    def assignments(self, variables=None):
+        """ yields every satisfying assignment of the bdd as a {var: value} dict """
+        return self.manager.assignments(self.root, variables)
 
     @staticmethod
     def dfs(graph, node, visited):
         """Iterate through nodes in DFS post-order."""
-        if node.lo is not None:
-            BDD.dfs(graph, node.lo, visited)
-        if node.hi is not None:
-            BDD.dfs(graph, node.hi, visited)
-        if node not in visited:
-            visited.add(node)
-            if node.var == -1:
-                graph.add_node(pydot.Node(node._getUid(),
-                                          style="filled", fillcolor="orange", shape='box'))
-            elif node.var == -2:
+        import pydot
+        for node in _dfsPost(node, visited):
+            # the nodes are regular edges, the single terminal is the one node
+            if node.var == -2:
                 graph.add_node(pydot.Node(node._getUid(),
                                           style="filled", fillcolor="lightblue", shape='box'))
             else:
                 graph.add_node(pydot.Node(node._getUid(),
                                           style="filled", fillcolor="green"))
             if node.lo is not None:
+                # a complemented edge ends in an odot arrowhead
                 eLo = pydot.Edge(
-                    node._getUid(), node.lo._getUid(), color='red', style='dotted')
+                    node._getUid(), node.lo.regular._getUid(), color='red', style='dotted',
+                    arrowhead='odot' if node.lo.complement else 'normal')
                 graph.add_edge(eLo)
             if node.hi is not None:
                 eHi = pydot.Edge(
@@ -145,7 +294,17 @@ class BDD:
 
     def buildBDD(self):
         """ builds the bdd """
-        return buildBDD(self.exp, self.ordering, self.NODES)
+        if self.workers != 1:
+            return buildParallel(self.exp, self.manager, self.workers, self.splitDepth)
+        return buildBDD(self.exp, self.manager)
+
+    def reorder(self, maxGrowth=1.2, maxTime=None):
+        """ sifts the variables of the manager, returns the new node count """
+        return self.manager.reorder(maxGrowth=maxGrowth, maxTime=maxTime)
+
+    def buildCacheStats(self):
+        """ returns the hit and miss counts of the construction cache """
+        return self.manager.buildCache.stats()
 
     def dfsPreorder(self):
         """ returns the dfs preorder traversal of the bdd """
@@ -162,103 +321,154 @@ class BDD:
         visited = set()
         return _bfs(self.node, visited)
 
+    def levelOrder(self):
+        """ returns the nodes of the bdd level by level, from the root to the terminals """
+        visited = set()
+        return _levelOrder(self.node, visited)
+
 
-def buildBDD(exp, ordering, cache):
+def buildBDD(exp, manager):
     """ builds the bdd """
-    # if expression is false return the zero node
-    if exp.isFalse():
-        return cache[BDDNode.BDDNODEZEROKEY]
-    # if expression is true return the one node
-    if exp.isTrue():
-        return cache[BDDNode.BDDNODEONEKEY]
-    # get the variable with the highest priority
-    for idx, var in enumerate(ordering):
-        if exp.isPresent(var):
-            # build the node for the variable
-            return bddNode(exp, ordering, cache, idx)
-    # if no variable is present throw an error
-    raise ValueError("invalid ordering list")
-
-
-def bddNode(exp, ordering, cache, idx):
-    """ returns the bdd node """
-    # get the variable
-    var = ordering[idx]
-    # build the lo node
-    nodeLo = buildBDD(exp.negativeCofactor(var), ordering, cache)
-    # build the hi node
-    nodeHi = buildBDD(exp.positiveCofactor(var), ordering, cache)
-    # Reduction rule 1
-    # is lo is hi then return lo
-    if nodeLo is nodeHi:
-        exp = nodeLo.exp
-        node = nodeLo
-    else:
-        # Reduction rule 2
-        # if the node is already present in the cache then return the node
-        key = (var, id(nodeLo), id(nodeHi))
-        try:
-            node = cache[key]
-        except KeyError:
-            # create the node if no reduction is possible
-            node = BDDNode(exp, var)
-            node.lo = nodeLo
-            node.hi = nodeHi
-            # store it in the cache
-            cache[key] = node
-    return node
+    # the Shannon expansion runs on an explicit stack of tasks instead of recursion:
+    # ("build", exp) pushes the node of exp on results, ("hi", exp, var) schedules
+    # the positive cofactor and ("node", var, key) combines the two children
+    results = list()
+    tasks = [("build", exp)]
+    while tasks:
+        task = tasks.pop()
+        if task[0] == "build":
+            exp = task[1]
+            # if expression is false return the zero node
+            if exp.isFalse():
+                results.append(manager.ZERO)
+                continue
+            # identical subfunctions reached through different paths are built once,
+            # the cache is looked up before the costlier tautology check
+            key = exp.getKey()
+            node = manager.buildCache.get(key)
+            if node is not None:
+                results.append(node)
+                continue
+            # if expression is true return the one node
+            if exp.isTrue():
+                manager.buildCache.put(key, manager.ONE)
+                results.append(manager.ONE)
+                continue
+            # get the variable with the highest priority
+            var = manager.ordering[exp.topVariable(manager.levels)]
+            tasks.append(("node", var, key))
+            tasks.append(("hi", exp, var))
+            # build the lo node first
+            tasks.append(("build", exp.negativeCofactor(var)))
+        elif task[0] == "hi":
+            # build the hi node
+            tasks.append(("build", task[1].positiveCofactor(task[2])))
+        else:
+            _, var, key = task
+            nodeHi = results.pop()
+            nodeLo = results.pop()
+            # the manager applies both reduction rules
+            node = manager.getNode(var, nodeLo, nodeHi)
+            manager.buildCache.put(key, node)
+            results.append(node)
+    return results.pop()
+
+
+def _buildCofactors(covers, numVars, ordering, backend):
+    """ builds the bdds of covers in a worker process, returns them in the bddio form
+
+    The covers share one manager, so the sub-covers they have in common are built once.
+    """
+    backend = importlib.import_module(backend)
+    manager = BDDManager(ordering, numVars)
+    roots = [buildBDD(boolfunc.Expression(cubes=cubes, numVars=numVars, backend=backend), manager)
+             for cubes in covers]
+    return bddio.dumps(manager, roots)
+
+
+def buildParallel(exp, manager, workers=None, splitDepth=BDD.SPLITDEPTH):
+    """ builds the bdd with its cofactors on the top splitDepth variables built in parallel
+
+    The cover is cofactored on the first splitDepth variables of the
+    ordering, keeping the distinct cofactors of every level only and not
+    splitting a cofactor on a variable it does not depend on. The distinct
+    non zero cofactors are cut into one contiguous batch per worker of a
+    process pool, every batch is built in a single manager and shipped back
+    as a compact node table, and the node tables are merged into the unique
+    table of manager before the top levels are joined with the reduction rules.
+    """
+    split = manager.ordering[:max(0, splitDepth)]
+    top = exp.getKey()
+    # the distinct cofactors of the current level and, per split variable,
+    # the keys of the two cofactors of every cover of the level above
+    level = {top: exp}
+    edges = list()
+    for var in split:
+        children, links = dict(), dict()
+        for key, cover in level.items():
+            if cover.isFalse() or not cover.isPresent(var):
+                # a cover without var is its own cofactor on var
+                children.setdefault(key, cover)
+                links[key] = (key, key)
+                continue
+            lo, hi = cover.negativeCofactor(var), cover.positiveCofactor(var)
+            links[key] = (lo.getKey(), hi.getKey())
+            children.setdefault(links[key][0], lo)
+            children.setdefault(links[key][1], hi)
+        edges.append((var, links))
+        level = children
+    nodes = {key: manager.ZERO for key, cover in level.items() if cover.isFalse()}
+    jobs = [(key, cover) for key, cover in level.items() if not cover.isFalse()]
+    if jobs:
+        count = min(workers or os.cpu_count() or 1, len(jobs))
+        # neighbouring cofactors share the most sub-covers, keep them in one batch
+        batches = [jobs[i * len(jobs) // count:(i + 1) * len(jobs) // count] for i in range(count)]
+        with concurrent.futures.ProcessPoolExecutor(max_workers=count) as pool:
+            futures = [(batch, pool.submit(_buildCofactors, [cover.cubes for _, cover in batch],
+                                           exp.numVars, manager.ordering, exp.backend.__name__))
+                       for batch in batches]
+            for batch, future in futures:
+                roots = bddio.loads(future.result(), manager)[1]
+                nodes.update(zip((key for key, _ in batch), roots))
+    # the cofactors do not depend on the split variables, join them bottom up
+    for var, links in reversed(edges):
+        nodes = {key: manager.getNode(var, nodes[lo], nodes[hi]) for key, (lo, hi) in links.items()}
+    return nodes[top]
 
 
 def getExpression(node: BDDNode, vis: set):
-    if node.getKey() == BDDNode.BDDNODEZEROKEY:
-        return ()
-    if node.getKey() == BDDNode.BDDNODEONEKEY:
-        return ((),)
-    vis.add(node)
-    cubes = list()
-    if node.lo and node.lo not in vis:
-        loList = getExpression(node.lo, vis)
-        for cube in loList:
-            cubes.insert(0, (-node.var, *cube))
-    if node.hi and node.hi not in vis:
-        hiList = getExpression(node.hi, vis)
-        for cube in hiList:
-            cubes.insert(0, (node.var, *cube))
-    return tuple(set(cubes))
+    """ returns the disjoint cube list of the paths from node to the one terminal """
+    manager = node.manager
+    # vis collects the walked nodes, shared subgraphs still yield one cube per path
+    for u in manager.postorder(node.index):
+        vis.add(manager.view(u))
+    return tuple(manager.paths(node.index))
+
+
+def _visit(manager, order, visited):
+    """Yields views of the node indices of order that are not in visited yet."""
+    for u in order:
+        node = manager.view(u)
+        if node not in visited:
+            visited.add(node)
+            yield node
 
 
 def _dfsPre(node, visited):
     """Iterate through nodes in DFS pre-order."""
-    if node not in visited:
-        visited.add(node)
-        yield node
-    if node.lo is not None:
-        yield from _dfsPre(node.lo, visited)
-    if node.hi is not None:
-        yield from _dfsPre(node.hi, visited)
+    return _visit(node.manager, node.manager.preorder(node.index), visited)
 
 
 def _dfsPost(node, visited):
     """Iterate through nodes in DFS post-order."""
-    if node.lo is not None:
-        yield from _dfsPost(node.lo, visited)
-    if node.hi is not None:
-        yield from _dfsPost(node.hi, visited)
-    if node not in visited:
-        visited.add(node)
-        yield node
+    return _visit(node.manager, node.manager.postorder(node.index), visited)
 
 
 def _bfs(node, visited):
     """Iterate through nodes in BFS order."""
-    queue = collections.deque()
-    queue.appendleft(node)
-    while queue:
-        node = queue.pop()
-        if node not in visited:
-            if node.lo is not None:
-                queue.appendleft(node.lo)
-            if node.hi is not None:
-                queue.appendleft(node.hi)
-            visited.add(node)
-            yield node
+    return _visit(node.manager, node.manager.bfs(node.index), visited)
+
+
+def _levelOrder(node, visited):
+    """Iterate through nodes level by level."""
+    return _visit(node.manager, node.manager.levelorder(node.index), visited)
@@ -0,0 +1,510 @@
+# implementation of the URP algorithms on a NumPy cube matrix
+# a cover is a matrix with one row per cube and one column per variable
+# (column v for variable xv, column 0 is unused); an entry is 1 when xv is
+# in the cube, 0 when ~xv is in the cube and DC when xv is a don't care.
+# The public functions take and return signed-int cube lists, so this module
+# can be used as a drop-in backend for urp; the cover_ functions work on the
+# cube matrix that boolfunc.Expression keeps between operations. Without NumPy
+# every public function falls back to the pure-Python urp implementation.
+from itertools import chain
+import urp
+import bitcubes
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+HAVE_NUMPY = np is not None
+# entry value of a don't care variable
+DC = 2
+# bytes of the temporaries of one block of the containment check
+SCC_BUDGET = 1 << 25
+
+
+def to_matrix(cubes, numVars=None):
+    """returns the cube matrix of a signed-int cube list
+    """
+    lengths = np.fromiter(map(len, cubes), dtype=np.intp, count=len(cubes))
+    literals = np.fromiter(chain.from_iterable(cubes), dtype=np.int64, count=int(lengths.sum()))
+    if numVars is None:
+        numVars = int(np.abs(literals).max(initial=0))
+    matrix = np.full((len(cubes), numVars + 1), DC, dtype=np.int8)
+    rows = np.repeat(np.arange(len(cubes)), lengths)
+    matrix[rows, np.abs(literals)] = literals > 0
+    return matrix
+
+
+def from_matrix(matrix):
+    """returns the signed-int cube list of a cube matrix, cubes sorted by variable
+    """
+    care = matrix != DC
+    rows, cols = np.nonzero(care)
+    literals = np.where(matrix[rows, cols] == 1, cols, -cols)
+    counts = care.sum(axis=1)
+    cubes = np.split(literals, np.cumsum(counts)[:-1]) if len(counts) else ()
+    return tuple(tuple(c.tolist()) for c in cubes)
+
+
+def matrix_unique(matrix):
+    """returns the cube matrix without duplicate cubes
+    """
+    if matrix.shape[0] < 2:
+        return matrix
+    # sorting brings equal rows together, cheaper than np.unique on rows
+    matrix = matrix[np.lexsort(matrix.T[::-1])]
+    first = np.ones(matrix.shape[0], dtype=bool)
+    first[1:] = (matrix[1:] != matrix[:-1]).any(axis=1)
+    return matrix[first]
+
+
+def pack_rows(bits):
+    """returns the rows of a boolean matrix packed into uint64 words
+    """
+    rows, width = bits.shape
+    words = -(-width // 64)
+    padded = np.zeros((rows, words * 64), dtype=bool)
+    padded[:, :width] = bits
+    return np.packbits(padded, axis=1).view(np.uint64)
+
+
+def matrix_scc(matrix):
+    """returns the cube matrix without the cubes contained in another cube
+    """
+    matrix = matrix_unique(matrix)
+    count = matrix.shape[0]
+    if count < 2:
+        return matrix
+    # rows are unique, so a cube can only be contained in one with fewer literals
+    lengths = (matrix != DC).sum(axis=1)
+    order = np.argsort(lengths, kind="stable")
+    lengths = lengths[order]
+    pos = pack_rows(matrix[order] == 1)
+    neg = pack_rows(matrix[order] == 0)
+    words = pos.shape[1]
+    keep = np.ones(count, dtype=bool)
+    start = 0
+    while start < count:
+        # containment is transitive, the kept shorter cubes are enough candidates
+        candidates = np.nonzero(keep[:np.searchsorted(lengths, lengths[start])])[0]
+        if not len(candidates):
+            start = np.searchsorted(lengths, lengths[start], side="right")
+            continue
+        size = max(1, SCC_BUDGET // (9 * len(candidates)))
+        stop = min(start + size, np.searchsorted(lengths, lengths[start], side="right"))
+        # contained[j, i] is true when the literals of candidate i are all in cube j
+        contained = np.ones((stop - start, len(candidates)), dtype=bool)
+        for w in range(words):
+            for plane in (pos, neg):
+                contained &= (plane[candidates, w][None, :] & ~plane[start:stop, w][:, None]) == 0
+        keep[start:stop] = ~contained.any(axis=1)
+        start = stop
+    result = np.zeros(count, dtype=bool)
+    result[order] = keep
+    return matrix[result]
+
+
+def matrix_cofactor(matrix, v, positive):
+    """returns the cofactor of a cube matrix with respect to the variable v
+    """
+    result = matrix[matrix[:, v] != (0 if positive else 1)]
+    result[:, v] = DC
+    return result
+
+
+def column_counts(matrix):
+    """returns the per variable counts of positive and negative literals
+    """
+    return (matrix == 1).sum(axis=0), (matrix == 0).sum(axis=0)
+
+
+def present_variables(matrix):
+    """returns the boolean mask of the variables appearing in some cube
+    """
+    return (matrix != DC).any(axis=0)
+
+
+def matrix_most_binate(matrix):
+    """returns the variable chosen for splitting, with the urp tie breaking
+    """
+    pos, neg = column_counts(matrix)
+    total = pos + neg
+    binate = (pos > 0) & (neg > 0)
+    candidates = binate if binate.any() else total > 0
+    # lexsort uses the last key first: most cubes, then most balanced, then smallest index
+    index = np.arange(matrix.shape[1])
+    order = np.lexsort((index, np.abs(pos - neg) if binate.any() else index, -total))
+    return int(order[candidates[order]][0])
+
+
+def matrix_complement(matrix):
+    """returns the complement of a cube matrix using URP
+    """
+    # ("complement", matrix) pushes the complement of matrix on results and
+    # ("merge", v) combines the complements of the two cofactors
+    results = list()
+    tasks = [("complement", matrix)]
+    while tasks:
+        task = tasks.pop()
+        if task[0] == "merge":
+            v = task[1]
+            nCubes = results.pop()
+            pCubes = results.pop()
+            pCubes[:, v] = 1
+            nCubes[:, v] = 0
+            results.append(matrix_unique(np.concatenate((pCubes, nCubes))))
+            continue
+        matrix = task[1]
+        rows, width = matrix.shape
+        care = matrix != DC
+        if rows == 0:
+            # Boolean equation "0", return a single don't care cube
+            results.append(np.full((1, width), DC, dtype=np.int8))
+        elif not care.any(axis=1).all():
+            # Boolean F = stuff + 1, return empty cube list, or "1"
+            results.append(np.empty((0, width), dtype=np.int8))
+        elif rows == 1:
+            # One cube list, use demorgan's law
+            columns = np.nonzero(care[0])[0]
+            result = np.full((len(columns), width), DC, dtype=np.int8)
+            result[np.arange(len(columns)), columns] = 1 - matrix[0, columns]
+            results.append(result)
+        else:
+            v = matrix_most_binate(matrix)
+            tasks.append(("merge", v))
+            tasks.append(("complement", matrix_cofactor(matrix, v, False)))
+            tasks.append(("complement", matrix_cofactor(matrix, v, True)))
+    return results.pop()
+
+
+def matrix_tautology(matrix):
+    """returns true if the cube matrix is a tautology using URP
+    """
+    # covers left to check, a split pushes both cofactors instead of recursing
+    stack = [matrix]
+    while stack:
+        matrix = stack.pop()
+        while True:
+            care = matrix != DC
+            if matrix.shape[0] and not care.any(axis=1).all():
+                matrix = None
+                break
+            if matrix.shape[0] == 0:
+                return False
+            pos, neg = column_counts(matrix)
+            binate = (pos > 0) & (neg > 0)
+            if not binate.any():
+                # a unate cover is a tautology only if it has the universal cube
+                return False
+            # cofactoring against the unate literals drops the cubes that contain them
+            unate = care & ~binate[None, :]
+            if not unate.any():
+                break
+            matrix = matrix[~unate.any(axis=1)]
+        if matrix is not None:
+            v = matrix_most_binate(matrix)
+            stack.append(matrix_cofactor(matrix, v, False))
+            stack.append(matrix_cofactor(matrix, v, True))
+    return True
+
+
+def matrix_cube_cofactor(matrix, cube):
+    """returns the cofactor of a cube matrix with respect to a cube matrix row
+    """
+    care = cube != DC
+    result = matrix[np.all((matrix[:, care] == DC) | (matrix[:, care] == cube[care]), axis=1)]
+    result[:, care] = DC
+    return result
+
+
+def _width(*covers):
+    """returns the number of matrix columns needed for all the covers
+    """
+    return max((abs(l) for cubes in covers for c in cubes for l in c), default=0) + 1
+
+
+def _matrices(*covers):
+    """returns the cube matrices of covers with a common number of columns
+    """
+    numVars = _width(*covers) - 1
+    return tuple(to_matrix(cubes, numVars) for cubes in covers)
+
+
+def _pad(matrix, width):
+    """returns the cube matrix with don't care columns added up to width columns
+    """
+    if matrix.shape[1] >= width:
+        return matrix
+    padded = np.full((matrix.shape[0], width), DC, dtype=np.int8)
+    padded[:, :matrix.shape[1]] = matrix
+    return padded
+
+
+def _common(left, right):
+    """returns two cube matrices padded to a common number of columns
+    """
+    width = max(left.shape[1], right.shape[1])
+    return _pad(left, width), _pad(right, width)
+
+
+def _or(left, right):
+    """returns the boolean OR of two cube matrices
+    """
+    return matrix_unique(np.concatenate((left, right)))
+
+
+def _and(left, right):
+    """returns the boolean AND of two cube matrices
+    """
+    return matrix_complement(_or(matrix_complement(left), matrix_complement(right)))
+
+
+def _xor(left, right):
+    """returns the boolean XOR of two cube matrices
+    """
+    return _or(_and(left, matrix_complement(right)), _and(matrix_complement(left), right))
+
+
+def cover_encode(cubes, numVars):
+    """returns the encoded cover of a signed-int cube list
+    """
+    if not HAVE_NUMPY:
+        return tuple(set(cubes))
+    return _pad(matrix_unique(to_matrix(cubes)), numVars + 1)
+
+
+def cover_decode(matrix):
+    """returns the signed-int cube list of an encoded cover
+    """
+    if not HAVE_NUMPY:
+        return matrix
+    return from_matrix(matrix)
+
+
+def cover_key(matrix):
+    """returns a hashable key, equal for covers with the same cubes
+    """
+    if not HAVE_NUMPY:
+        return urp.canonical(matrix)
+    return matrix.shape[1], matrix_unique(matrix).tobytes()
+
+
+def cover_variables(matrix):
+    """returns the variables appearing in the cover
+    """
+    if not HAVE_NUMPY:
+        return {abs(l) for c in matrix for l in c}
+    return np.nonzero(present_variables(matrix))[0].tolist()
+
+
+def cover_isPresent(matrix, x):
+    """returns true if the variable x appears in the cover
+    """
+    if not HAVE_NUMPY:
+        return urp.isPresent(matrix, x)
+    return x < matrix.shape[1] and bool((matrix[:, x] != DC).any())
+
+
+def cover_tautology(matrix):
+    """returns true if the cover is a tautology
+    """
+    if not HAVE_NUMPY:
+        return urp.tautology(matrix)
+    return matrix_tautology(matrix)
+
+
+def cover_covers(left, right):
+    """returns true if the cover left contains the cover right
+    """
+    if not HAVE_NUMPY:
+        return urp.covers(left, right)
+    left, right = _common(left, right)
+    return all(matrix_tautology(matrix_cube_cofactor(left, cube)) for cube in right)
+
+
+def cover_cofactor(matrix, x):
+    """returns the cofactor of the cover with respect to the literal x
+    """
+    if not HAVE_NUMPY:
+        return tuple(set(urp.generalCofactor(matrix, x)))
+    if abs(x) >= matrix.shape[1]:
+        return matrix
+    return matrix_cofactor(matrix, abs(x), x > 0)
+
+
+def cover_complement(matrix):
+    """returns the complement of the cover
+    """
+    if not HAVE_NUMPY:
+        return tuple(set(urp.complement(matrix)))
+    return matrix_complement(matrix_unique(matrix))
+
+
+def cover_or(left, right):
+    """returns the boolean OR of two covers
+    """
+    if not HAVE_NUMPY:
+        return tuple(set(urp.cubes_or(left, right)))
+    return _or(*_common(left, right))
+
+
+def cover_and(left, right):
+    """returns the boolean AND of two covers
+    """
+    if not HAVE_NUMPY:
+        return tuple(set(urp.cubes_and(left, right)))
+    return _and(*_common(left, right))
+
+
+def cover_xor(left, right):
+    """returns the boolean XOR of two covers
+    """
+    if not HAVE_NUMPY:
+        return tuple(set(urp.cubes_xor(left, right)))
+    return _xor(*_common(left, right))
+
+
+def _coverCofactors(matrix, x):
+    """returns the positive and negative cofactor matrices of a cover with respect to x"""
+    matrix = _pad(matrix, x + 1)
+    return matrix_cofactor(matrix, x, True), matrix_cofactor(matrix, x, False)
+
+
+def cover_boolDiff(matrix, x):
+    """returns the boolean difference of the cover with respect to the variable x
+    """
+    if not HAVE_NUMPY:
+        return tuple(set(urp.boolDiff(matrix, x)))
+    return _xor(*_coverCofactors(matrix, x))
+
+
+def cover_consensus(matrix, x):
+    """returns the consensus of the cover with respect to the variable x
+    """
+    if not HAVE_NUMPY:
+        return tuple(set(urp.consensus(matrix, x)))
+    return _and(*_coverCofactors(matrix, x))
+
+
+def cover_smoothing(matrix, x):
+    """returns the smoothing of the cover with respect to the variable x
+    """
+    if not HAVE_NUMPY:
+        return tuple(set(urp.smoothing(matrix, x)))
+    return _or(*_coverCofactors(matrix, x))
+
+
+def canonical(cubes):
+    """returns a canonical form of a cube list: sorted cubes of literals sorted by variable
+    """
+    return urp.canonical(cubes)
+
+
+def scc(cubes):
+    """returns the cube list without the cubes contained in another cube
+    """
+    if not HAVE_NUMPY:
+        return bitcubes.scc(cubes)
+    return from_matrix(matrix_scc(to_matrix(cubes)))
+
+
+def isPresent(cubes, x):
+    """Returns true if the variable x appears in any cube of the cube list"""
+    # a scan of the literals, building the matrix costs more than the answer
+    return urp.isPresent(cubes, x)
+
+
+def tautology(cubes):
+    """Returns true if the cube list is a tautology using URP"""
+    if not HAVE_NUMPY:
+        return urp.tautology(cubes)
+    return matrix_tautology(to_matrix(cubes))
+
+
+def covers(left, right):
+    """Returns true if the cube list left contains the cube list right"""
+    if not HAVE_NUMPY:
+        return urp.covers(left, right)
+    left, right = _matrices(left, right)
+    return all(matrix_tautology(matrix_cube_cofactor(left, cube)) for cube in right)
+
+
+def generalCofactor(cubes, x):
+    """Returns the cofactor of cubes with respect to the literal x"""
+    if not HAVE_NUMPY:
+        return urp.generalCofactor(cubes, x)
+    matrix = _matrices(cubes, ((abs(x),),))[0]
+    return from_matrix(matrix_cofactor(matrix, abs(x), x > 0))
+
+
+def positiveCofactor(cubes, position):
+    """Returns the positive cofactor of cubes with respect to x"""
+    assert(position > 0)
+    return generalCofactor(cubes, position)
+
+
+def negativeCofactor(cubes, position):
+    """Returns the negative cofactor of cubes with respect to x"""
+    assert(position > 0)
+    return generalCofactor(cubes, -position)
+
+
+def most_binate(cubes):
+    """Returns the variable chosen for splitting a cube list"""
+    if not HAVE_NUMPY:
+        return urp._most_binate(urp.canonical(cubes))
+    return matrix_most_binate(matrix_unique(to_matrix(cubes)))
+
+
+def complement(cubes):
+    """Returns the complement of a cube list using URP"""
+    if not HAVE_NUMPY:
+        return urp.complement(cubes)
+    return from_matrix(matrix_complement(matrix_unique(to_matrix(cubes))))
+
+
+def cubes_or(left, right):
+    """Returns the boolean OR of two cube lists"""
+    if not HAVE_NUMPY:
+        return urp.cubes_or(left, right)
+    return from_matrix(_or(*_matrices(left, right)))
+
+
+def cubes_and(left, right):
+    """Returns the boolean AND of two cube lists"""
+    if not HAVE_NUMPY:
+        return urp.cubes_and(left, right)
+    return from_matrix(_and(*_matrices(left, right)))
+
+
+def cubes_xor(left, right):
+    """Returns the boolean XOR of two cube lists"""
+    if not HAVE_NUMPY:
+        return urp.cubes_xor(left, right)
+    return from_matrix(_xor(*_matrices(left, right)))
+
+
+def _cofactors(cubes, x):
+    """returns the positive and negative cofactor matrices of cubes with respect to x"""
+    return _coverCofactors(to_matrix(cubes), x)
+
+
+def boolDiff(cubes, x):
+    """Returns the boolean difference of a cube list with respect to variable X"""
+    if not HAVE_NUMPY:
+        return urp.boolDiff(cubes, x)
+    return from_matrix(_xor(*_cofactors(cubes, x)))
+
+
+def consensus(cubes, x):
+    """Returns the consensus of a cube list with respect to variable X"""
+    if not HAVE_NUMPY:
+        return urp.consensus(cubes, x)
+    return from_matrix(_and(*_cofactors(cubes, x)))
+
+
+def smoothing(cubes, x):
+    """Returns the smoothing of a cube list with respect to variable X"""
+    if not HAVE_NUMPY:
+        return urp.smoothing(cubes, x)
+    return from_matrix(_or(*_cofactors(cubes, x)))
@@ -3,6 +3,22 @@
 from itertools import islice
 # chain used to concatenate the length of the cube and the cube itself
 from itertools import chain
+import mmap
+import os
+import struct
+import tempfile
+import bitcubes
+
+# number of cubes yielded at once by the streaming readers and writers
+BATCH_SIZE = 1 << 16
+# binary cube format: a header followed by one fixed-width row per cube, a row
+# is the positive then the negative literal bitmask of the cube (bit v for xv,
+# as in bitcubes), each stored as `words` little endian 64 bit words
+BINARY_MAGIC = b"PCNB"
+# magic, number of variables, number of cubes, words per bitmask
+BINARY_HEADER = struct.Struct("<4sIQQ")
+# width of the text cube count, reserved so a streamed count can be patched in
+COUNT_WIDTH = 20
 
 # read_pcn reads a file and returns a pcn data structure
 
@@ -35,23 +51,137 @@ def parse(filePath):
     Returns:
         `tuple(int,list())`: number of variables and the cube list 
     """
+    source = CubeSource(filePath)
+    return (source.numVars, source.read())
+
+
+def words_for(numVars):
+    """returns the number of 64 bit words of a bitmask over the variables 1..numVars"""
+    return numVars // 64 + 1
+
+
+def is_binary(filePath):
+    """returns true if the file starts with the binary cube format magic"""
     with open(filePath, "rb") as f:
-        try:
-            # read lines from file
-            lines = iter(f)
-            numVars = int(next(lines))
-            cubeCount = int(next(lines))
-            cubes = [None]*cubeCount
-            # create the cube list from the file
-            for i in range(cubeCount):
-                line = next(lines)
-                cubes[i] = tuple(islice(map(int, line.split()), 1, None))
-            return (numVars, tuple(cubes))
+        return f.read(len(BINARY_MAGIC)) == BINARY_MAGIC
 
+
+class CubeSource:
+    """lazy cube list of a text or binary pcn file, read through a memory map
+
+    Iterating over a source yields tuples of at most batchSize cubes; the
+    file is mapped again on every iteration, so a source can be read twice.
+    """
+
+    def __init__(self, filePath, batchSize=BATCH_SIZE):
+        """reads the header of a text or binary pcn file
+
+        Raises:
+            AssertionError: bad pcn file
+        """
+        self.filePath, self.batchSize = filePath, batchSize
+        self.binary = is_binary(filePath)
+        try:
+            with open(filePath, "rb") as f:
+                if self.binary:
+                    _, self.numVars, self.cubeCount, self.words = \
+                        BINARY_HEADER.unpack(f.read(BINARY_HEADER.size))
+                else:
+                    self.numVars = int(f.readline())
+                    self.cubeCount = int(f.readline())
         except Exception as error:
             # throws an exception if the file is not a valid pcn file
             raise AssertionError("Bad pcn file {}".format(filePath)) from error
 
+    def __len__(self):
+        """returns the number of cubes recorded in the file header"""
+        return self.cubeCount
+
+    def __iter__(self):
+        """yields the cubes of the file in tuples of at most batchSize cubes
+
+        Raises:
+            AssertionError: bad pcn file
+        """
+        if self.cubeCount == 0:
+            return
+        with open(self.filePath, "rb") as f, \
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            try:
+                if self.binary:
+                    yield from self._binaryBatches(mm)
+                else:
+                    yield from self._textBatches(mm)
+            except Exception as error:
+                raise AssertionError("Bad pcn file {}".format(self.filePath)) from error
+
+    def _textBatches(self, mm):
+        """yields the cube batches of a mapped text pcn file"""
+        lines = iter(mm.readline, b"")
+        # skip the number of variables and the number of cubes
+        next(lines), next(lines)
+        for start in range(0, self.cubeCount, self.batchSize):
+            count = min(self.batchSize, self.cubeCount - start)
+            batch = tuple(tuple(islice(map(int, line.split()), 1, None))
+                          for line in islice(lines, count))
+            if len(batch) != count:
+                raise ValueError("missing cubes")
+            yield batch
+
+    def _binaryBatches(self, mm):
+        """yields the cube batches of a mapped binary pcn file"""
+        view = memoryview(mm)
+        width = 8 * self.words
+        offset = BINARY_HEADER.size
+        if len(view) < offset + 2 * width * self.cubeCount:
+            view.release()
+            raise ValueError("missing cubes")
+        try:
+            for start in range(0, self.cubeCount, self.batchSize):
+                count = min(self.batchSize, self.cubeCount - start)
+                batch = [None] * count
+                for i in range(count):
+                    pos = int.from_bytes(view[offset:offset + width], "little")
+                    neg = int.from_bytes(view[offset + width:offset + 2 * width], "little")
+                    batch[i] = bitcubes.decode_cube((pos, neg))
+                    offset += 2 * width
+                yield tuple(batch)
+        finally:
+            view.release()
+
+    def cubes(self):
+        """yields the cubes of the file one at a time"""
+        return chain.from_iterable(self)
+
+    def read(self):
+        """returns the whole cube list of the file"""
+        cubes = [None] * self.cubeCount
+        i = 0
+        for batch in self:
+            cubes[i:i + len(batch)] = batch
+            i += len(batch)
+        return tuple(cubes)
+
+
+def map_cubes(filePath):
+    """maps the rows of a binary pcn file without copying them
+
+    Returns:
+        `tuple(int,int,memoryview)`: number of variables, words per bitmask and
+        a read-only view of the rows; np.frombuffer(view, "<u8") reshaped to
+        (-1, 2 * words) gives the positive and negative masks of every cube
+    """
+    with open(filePath, "rb") as f:
+        magic, numVars, cubeCount, words = BINARY_HEADER.unpack(f.read(BINARY_HEADER.size))
+        if magic != BINARY_MAGIC:
+            raise AssertionError("Bad binary pcn file {}".format(filePath))
+        if cubeCount == 0:
+            return (numVars, words, memoryview(b""))
+        # the view keeps the map alive after the file is closed
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    end = BINARY_HEADER.size + 16 * words * cubeCount
+    return (numVars, words, memoryview(mm)[BINARY_HEADER.size:end])
+
 
 def findNumVars(cubes):
     """returns the number of variables in a cube-list
@@ -84,17 +214,102 @@ def pcn_to_str(cubes, numVars):
     numCubes = str(len(cubes))
     repr.append(numCubes)
     for cube in cubes:
-        repr.append(' '.join(map(str, chain((len(cube),), cube))))
+        repr.append(cube_to_str(cube))
     return "\n".join(repr)
 
 
-def write_pcn(filePath, cubes):
+def cube_to_str(cube):
+    """converts a cube to its pcn line: the literal count followed by the literals
+
+    Args:
+        cube (`tuple`): cube of signed variable indices
+
+    Returns:
+        `str`: pcn line of the cube without the trailing newline
+    """
+    return ' '.join(map(str, chain((len(cube),), cube)))
+
+
+def write_pcn(filePath, cubes, numVars=None):
     """write the pcn cube-list data structure 
 
     Args:
         filePath (`str`): out dir path
         cubes (`pcn cube-list`): pcn cube-list data structure 
+        numVars (`int`): number of variables, found from the cubes by default
     """
+    if numVars is None:
+        numVars = findNumVars(cubes)
     # write the pcn data structure to a file
     with open(filePath, "w") as f:
-        f.write(pcn_to_str(cubes))
+        f.write(pcn_to_str(cubes, numVars))
+
+
+def write_cubes(filePath, cubes, numVars, binary=False):
+    """streams cubes from any iterable to a text or binary pcn file
+
+    The cubes are written as they come, in batches, without deduplication.
+    When the iterable has a length the exact count is written up front,
+    otherwise the count is patched into a padded header field once the
+    iterable is exhausted. The cubes go to a temporary file that replaces
+    filePath only once they are all written, so a failed write leaves any
+    previous file in place.
+
+    Args:
+        filePath (`str`): out file path
+        cubes (`iterable`): cubes of signed variable indices, e.g. a generator
+        numVars (`int`): number of variables
+        binary (`bool`): write the binary cube format instead of text
+
+    Raises:
+        ValueError: the iterable yielded a different number of cubes than its length
+
+    Returns:
+        `int`: the number of cubes written
+    """
+    fd, tmpPath = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(filePath)))
+    try:
+        with os.fdopen(fd, "wb") as f:
+            count = _write_cubes(f, cubes, numVars, binary)
+        os.replace(tmpPath, filePath)
+    except BaseException:
+        os.unlink(tmpPath)
+        raise
+    return count
+
+
+def _write_cubes(f, cubes, numVars, binary):
+    """writes cubes to a binary file object, returns the number of cubes written"""
+    try:
+        known = len(cubes)
+    except TypeError:
+        known = None
+    cubes = iter(cubes)
+    count = 0
+    if binary:
+        words = words_for(numVars)
+        width = 8 * words
+        f.write(BINARY_HEADER.pack(BINARY_MAGIC, numVars, 0, words))
+        countOffset = len(BINARY_MAGIC) + 4
+    else:
+        f.write(f"{numVars}\n".encode())
+        countOffset = f.tell()
+        f.write(b" " * COUNT_WIDTH + b"\n" if known is None else f"{known}\n".encode())
+    while True:
+        batch = tuple(islice(cubes, BATCH_SIZE))
+        if not batch:
+            break
+        count += len(batch)
+        if binary:
+            f.write(b"".join(p.to_bytes(width, "little") + n.to_bytes(width, "little")
+                             for p, n in map(bitcubes.encode_cube, batch)))
+        else:
+            f.write("".join(cube_to_str(c) + "\n" for c in batch).encode())
+    if not binary and known is not None and count != known:
+        raise ValueError(f"cube iterable yielded {count} cubes, its length is {known}")
+    f.seek(countOffset)
+    if binary:
+        f.write(struct.pack("<Q", count))
+    elif known is None:
+        f.write(str(count).ljust(COUNT_WIDTH).encode())
+    return count
@@ -0,0 +1,5 @@
+"""pytest configuration, the modules of the package live at the repository root"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
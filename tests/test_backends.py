@@ -0,0 +1,68 @@
+"""The cube-list backends against truth tables and against each other."""
+import random
+import pytest
+import bitcubes
+import boolfunc
+import myBdd
+import npcubes
+import urp
+from truth import assertFunction, assignments, coverValue, randomCover, randomOrdering
+
+BACKENDS = (urp, bitcubes, npcubes)
+
+
+@pytest.mark.parametrize("seed", range(40))
+def testBackendsAgree(seed):
+    rng = random.Random(seed)
+    n = rng.randint(1, 8)
+    F = randomCover(n, rng.randint(0, 10), rng)
+    for backend in BACKENDS:
+        complement = backend.complement(F)
+        minimal = backend.scc(F)
+        assert backend.tautology(F) == all(coverValue(F, a) for a in assignments(n))
+        for a in assignments(n):
+            assert coverValue(complement, a) != coverValue(F, a)
+            assert coverValue(minimal, a) == coverValue(F, a)
+        assert not any(set(c) < set(d) for c in minimal for d in minimal)
+
+
+@pytest.mark.parametrize("seed", range(30))
+def testExpressionsKeepTheBackendCover(seed):
+    rng = random.Random(seed)
+    n = rng.randint(1, 7)
+    F = randomCover(n, rng.randint(0, 8), rng)
+    G = randomCover(n, rng.randint(0, 8), rng)
+    x = rng.randint(1, n)
+    expected = {
+        "and": lambda a: coverValue(F, a) and coverValue(G, a),
+        "xor": lambda a: coverValue(F, a) != coverValue(G, a),
+        "complement": lambda a: not coverValue(F, a),
+        "cofactor": lambda a: coverValue(F, {**a, x: False}),
+        "smoothing": lambda a: coverValue(F, {**a, x: False}) or coverValue(F, {**a, x: True}),
+    }
+    for backend in BACKENDS:
+        f = boolfunc.Expression(cubes=F, numVars=n, backend=backend)
+        g = boolfunc.Expression(cubes=G, numVars=n, backend=rng.choice(BACKENDS))
+        results = {
+            "and": f.andExp(g), "xor": f.xorExp(G), "complement": f.complement(),
+            "cofactor": f.negativeCofactor(x), "smoothing": f.smoothingWith(x),
+        }
+        for name, result in results.items():
+            assert result.backend is backend
+            for a in assignments(n):
+                assert coverValue(result.cubes, a) == expected[name](a), name
+        assert f.isPresent(x) == any(abs(l) == x for c in F for l in c)
+        assert f.isTrue() == all(coverValue(F, a) for a in assignments(n))
+        assert f.isEquivalent(f.orExp(f.andExp(g)))
+        assert f.getKey() == boolfunc.Expression(cubes=F[::-1], numVars=n, backend=backend).getKey()
+
+
+@pytest.mark.parametrize("seed", range(20))
+def testBuildThroughEveryBackend(seed):
+    rng = random.Random(seed)
+    n = rng.randint(1, 7)
+    F = randomCover(n, rng.randint(0, 8), rng)
+    ordering = randomOrdering(n, rng)
+    for backend in BACKENDS:
+        bdd = myBdd.BDD(boolfunc.Expression(cubes=F, numVars=n, backend=backend), ordering=ordering)
+        assertFunction(bdd.manager, bdd.root, lambda a: coverValue(F, a), n)
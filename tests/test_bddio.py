@@ -0,0 +1,48 @@
+"""Round trips through the binary bdd format and the build cache."""
+import random
+import pytest
+import bddio
+import boolfunc
+import myBdd
+from manager import BDDManager
+from truth import assertFunction, coverValue, randomCover
+
+
+@pytest.mark.parametrize("seed", range(20))
+def testSaveAndLoad(seed, tmp_path):
+    rng = random.Random(seed)
+    n = rng.randint(1, 7)
+    manager = BDDManager(list(range(1, n + 1)))
+    F = randomCover(n, rng.randint(0, 8), rng)
+    f = myBdd.BDD(boolfunc.Expression(cubes=F, numVars=n), manager=manager)
+    roots = [f.root, f.root ^ 1, manager.ZERO, manager.ONE]
+    path = str(tmp_path / "f.bdd")
+    bddio.save(path, manager, roots)
+    loaded, loadedRoots = bddio.load(path)
+    assert loaded.ordering == manager.ordering
+    assertFunction(loaded, loadedRoots[0], lambda a: coverValue(F, a), n)
+    assertFunction(loaded, loadedRoots[1], lambda a: not coverValue(F, a), n)
+    assert loadedRoots[2:] == [loaded.ZERO, loaded.ONE]
+    assert loaded.countNodes(*loadedRoots) == manager.countNodes(*roots)
+    # loading into the saving manager finds the same nodes
+    assert bddio.load(path, manager)[1] == roots
+    assert bddio.loads(bddio.dumps(manager, roots), manager)[1] == roots
+
+
+def testLoadRejectsBadFiles(tmp_path):
+    path = tmp_path / "bad.bdd"
+    path.write_bytes(b"BDDB" + bytes(10))
+    with pytest.raises(AssertionError):
+        bddio.load(str(path))
+    manager = BDDManager([1, 2])
+    bddio.save(str(path), manager, [manager.variable(1)])
+    with pytest.raises(ValueError):
+        bddio.load(str(path), BDDManager([2, 1]))
+
+
+def testCachedBuild(tmp_path):
+    exp = boolfunc.Expression(cubes=((1, -2), (2, 3)), numVars=3)
+    first = myBdd.BDD.cached(exp, str(tmp_path))
+    second = myBdd.BDD.cached(boolfunc.Expression(cubes=exp.cubes, numVars=3), str(tmp_path))
+    assert second.getExpression().isEquivalent(first.getExpression())
+    assert len(list(tmp_path.iterdir())) == 1
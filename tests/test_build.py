@@ -0,0 +1,59 @@
+"""Construction from cube lists, serially, in parallel and incrementally."""
+import random
+import pytest
+import bitcubes
+import boolfunc
+import myBdd
+import npcubes
+import urp
+from manager import BDDManager
+from truth import assertFunction, coverValue, randomCover, randomOrdering
+
+
+@pytest.mark.parametrize("seed", range(30))
+def testBuildMatchesCover(seed):
+    rng = random.Random(seed)
+    n = rng.randint(1, 7)
+    F = randomCover(n, rng.randint(0, 8), rng)
+    exp = boolfunc.Expression(cubes=F, numVars=n)
+    bdd = myBdd.BDD(exp, ordering=randomOrdering(n, rng))
+    assertFunction(bdd.manager, bdd.root, lambda a: coverValue(F, a), n)
+
+
+@pytest.mark.parametrize("seed", range(6))
+def testParallelBuildMatchesSerial(seed):
+    rng = random.Random(seed)
+    n = rng.randint(3, 8)
+    F = randomCover(n, rng.randint(2, 10), rng)
+    manager = BDDManager(randomOrdering(n, rng), n)
+    exp = boolfunc.Expression(cubes=F, numVars=n, backend=rng.choice((urp, bitcubes, npcubes)))
+    serial = myBdd.BDD(exp, manager=manager)
+    parallel = myBdd.BDD(exp, manager=manager, workers=2, splitDepth=rng.randint(0, n + 1))
+    assert parallel == serial
+
+
+def testParallelBuildOfConstants():
+    manager = BDDManager([1, 2, 3])
+    for cubes in ((), ((),), ((1,), (-1,))):
+        exp = boolfunc.Expression(cubes=cubes, numVars=3)
+        assert myBdd.BDD(exp, manager=manager, workers=2) == myBdd.BDD(exp, manager=manager)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def testAddAndRemoveCubes(seed):
+    rng = random.Random(seed)
+    n = rng.randint(2, 7)
+    F = list(set(randomCover(n, rng.randint(1, 8), rng)))
+    manager = BDDManager(randomOrdering(n, rng), n)
+    bdd = myBdd.BDD(boolfunc.Expression(cubes=tuple(F), numVars=n), manager=manager)
+    added = list(randomCover(n, 2, rng))
+    grown = bdd.addCubes(added)
+    assertFunction(manager, bdd.root, lambda a: coverValue(F, a), n)
+    assertFunction(manager, grown.root, lambda a: coverValue(F + added, a), n)
+    removed = rng.sample(F, rng.randint(0, len(F)))
+    shrunk = bdd.removeCubes(removed)
+    kept = [c for c in F if c not in removed]
+    assertFunction(manager, shrunk.root, lambda a: coverValue(kept, a), n)
+    assert shrunk == myBdd.BDD(boolfunc.Expression(cubes=tuple(kept), numVars=n), manager=manager)
+    with pytest.raises(ValueError):
+        myBdd.BDD.fromNode(bdd.root, manager).removeCubes(F)
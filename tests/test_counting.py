@@ -0,0 +1,25 @@
+"""Model and path counting, enumeration and picking on complement edges."""
+import random
+import pytest
+import boolfunc
+import myBdd
+from manager import BDDManager
+from truth import assignments, edgeValue, randomCover, randomOrdering
+
+
+@pytest.mark.parametrize("seed", range(20))
+def testCounting(seed):
+    rng = random.Random(seed)
+    n = rng.randint(1, 6)
+    manager = BDDManager(randomOrdering(n, rng), n)
+    F = randomCover(n, rng.randint(0, 6), rng)
+    f = myBdd.BDD(boolfunc.Expression(cubes=F, numVars=n), manager=manager)
+    for u in (f.root, f.root ^ 1):
+        assert sum(1 for _ in manager.paths(u)) == manager.pathCount(u)
+        models = sum(edgeValue(manager, u, a) for a in assignments(n))
+        assert manager.satCount(u) == models
+        pick = manager.pickOne(u)
+        if models == 0:
+            assert pick is None
+        else:
+            assert edgeValue(manager, u, {v: pick.get(v, False) for v in range(1, n + 1)})
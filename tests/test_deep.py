@@ -0,0 +1,35 @@
+"""Covers and bdds deeper than the recursion limit."""
+import pytest
+import bitcubes
+import boolfunc
+import myBdd
+import npcubes
+import urp
+from manager import BDDManager
+
+
+@pytest.mark.parametrize("backend", (urp, bitcubes, npcubes))
+def testDeepCoversNeedNoRecursion(backend):
+    n = 1200
+    # x1 -> x2 -> ... -> xn with xn' and x1 false is unsatisfiable, the cover is a tautology
+    chain = tuple((i, -(i + 1)) for i in range(1, n)) + ((n,), (-1,))
+    assert backend.tautology(chain)
+    single = tuple((i,) for i in range(1, n))
+    assert backend.complement(single) == (tuple(-i for i in range(1, n)),)
+
+
+def testDeepCoverBuilds():
+    n = 1200
+    chain = tuple((i, -(i + 1)) for i in range(1, n)) + ((n,), (-1,))
+    bdd = myBdd.BDD(boolfunc.Expression(cubes=chain, numVars=n), ordering=list(range(1, n + 1)))
+    assert bdd.root == bdd.manager.ONE
+
+
+def testDeepBddExpression():
+    n = 1500
+    manager = BDDManager(list(range(1, n + 1)))
+    conjunction = manager.cube(tuple(range(1, n + 1)))
+    bdd = myBdd.BDD.fromNode(conjunction, manager)
+    vis = set()
+    assert myBdd.getExpression(bdd.node, vis) == (tuple(range(1, n + 1)),)
+    assert len(vis) == manager.countNodes(conjunction)
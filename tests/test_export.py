@@ -0,0 +1,29 @@
+"""The streaming graph exporters."""
+import io
+import json
+import xml.dom.minidom
+import pytest
+import export
+from manager import BDDManager
+
+
+def testExportFormats():
+    manager = BDDManager([1, 2, 3])
+    f = manager.apply("and", manager.variable(1), manager.neg(manager.variable(2)))
+    roots = [f, manager.neg(f), manager.ZERO]
+    sink = io.StringIO()
+    export.writeJson(sink, manager, roots)
+    data = json.loads(sink.getvalue())
+    assert data["roots"] == roots
+    assert len(data["nodes"]) + len(data["terminals"]) == manager.countNodes(*roots)
+    sink = io.StringIO()
+    export.writeGraphml(sink, manager, roots)
+    xml.dom.minidom.parseString(sink.getvalue())
+    sink = io.StringIO()
+    export.writeDot(sink, manager, roots)
+    assert "arrowhead=odot" in sink.getvalue()
+    sink = io.StringIO()
+    export.write(sink, manager, roots, "json", maxNodes=1)
+    assert set(json.loads(sink.getvalue())["hidden"].values()) == {export.TRUNCATED}
+    with pytest.raises(ValueError):
+        export.write(io.StringIO(), manager, roots, "svg")
@@ -0,0 +1,33 @@
+"""The profile context manager patches and restores the instrumented functions."""
+import pytest
+import boolfunc
+import instrument
+import myBdd
+import urp
+from manager import BDDManager
+
+
+def testProfileCountsBackendCalls():
+    manager = BDDManager([1, 2, 3])
+    complement = urp.complement
+    with instrument.profile(manager) as stats:
+        urp.clearComplementCache()
+        myBdd.BDD(boolfunc.Expression(cubes=((1, -2), (3,)), numVars=3), manager=manager)
+    assert urp.complement is complement
+    assert stats.functions["myBdd.buildBDD"][0] == 1
+    assert stats.functions["urp.tautology"][0] > 0
+    assert "urp.clearComplementCache" not in stats.functions
+    assert len(stats.levels) == 1
+
+
+def testFailedPatchReleasesTheProfile(monkeypatch):
+    monkeypatch.setattr(instrument, "MANAGER_METHODS", ("ite", "noSuchMethod"))
+    ite = BDDManager.ite
+    with pytest.raises(KeyError):
+        with instrument.profile():
+            pass
+    assert BDDManager.ite is ite
+    monkeypatch.undo()
+    with instrument.profile() as stats:
+        BDDManager([1]).ite(0, 0, 1)
+    assert stats.functions["BDDManager.ite"][0] == 1
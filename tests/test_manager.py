@@ -0,0 +1,75 @@
+"""Truth table checks of the manager operations on complement edges."""
+import random
+import pytest
+import boolfunc
+import myBdd
+from manager import BDDManager
+from truth import assertFunction, coverValue, randomCover, randomOrdering
+
+OPERATIONS = {
+    "and": lambda x, y: x and y,
+    "or": lambda x, y: x or y,
+    "xor": lambda x, y: x != y,
+    "nand": lambda x, y: not (x and y),
+    "nor": lambda x, y: not (x or y),
+    "xnor": lambda x, y: x == y,
+    "implies": lambda x, y: (not x) or y,
+}
+
+
+def randomPair(seed):
+    """returns a manager, two random covers and their bdds"""
+    rng = random.Random(seed)
+    n = rng.randint(1, 6)
+    manager = BDDManager(randomOrdering(n, rng), n)
+    F = randomCover(n, rng.randint(0, 6), rng)
+    G = randomCover(n, rng.randint(0, 6), rng)
+    f = myBdd.BDD(boolfunc.Expression(cubes=F, numVars=n), manager=manager)
+    g = myBdd.BDD(boolfunc.Expression(cubes=G, numVars=n), manager=manager)
+    return rng, manager, n, (F, f), (G, g)
+
+
+def assertCanonical(manager):
+    """checks that stored hi edges are regular and children lie below their parent"""
+    nodes = manager.nodes
+    for i in range(1, len(nodes)):
+        if nodes.var[i] <= 0:
+            continue
+        assert nodes.hi[i] & 1 == 0
+        assert nodes.lo[i] != nodes.hi[i]
+        for child in (nodes.lo[i], nodes.hi[i]):
+            assert manager.getLevel(child) > manager.getLevel(i << 1)
+
+
+@pytest.mark.parametrize("seed", range(40))
+def testApplyMatchesTruthTable(seed):
+    _, manager, n, (F, f), (G, g) = randomPair(seed)
+    assertFunction(manager, f.root, lambda a: coverValue(F, a), n)
+    assertFunction(manager, (~f).root, lambda a: not coverValue(F, a), n)
+    for op, function in OPERATIONS.items():
+        assertFunction(manager, f.apply(op, g).root,
+                       lambda a: function(coverValue(F, a), coverValue(G, a)), n)
+    h = f.ite(g, ~f)
+    assertFunction(manager, h.root,
+                   lambda a: coverValue(G, a) if coverValue(F, a) else not coverValue(F, a), n)
+    assertCanonical(manager)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def testNegationAndCanonicity(seed):
+    _, manager, n, (F, f), _ = randomPair(seed)
+    assert (~f).root == f.root ^ 1 and ~~f == f
+    rebuilt = myBdd.BDD(boolfunc.Expression(cubes=tuple(manager.paths(f.root)), numVars=n),
+                        manager=manager)
+    assert rebuilt == f
+    assert (f ^ f).root == manager.ZERO and (f | ~f).root == manager.ONE
+
+
+def testParityNeedsOneNodePerVariable():
+    for k in (8, 16):
+        manager = BDDManager(list(range(1, k + 1)))
+        parity = manager.ZERO
+        for v in range(1, k + 1):
+            parity = manager.apply("xor", parity, manager.variable(v))
+        assert manager.countNodes(parity) == k + 1
+        assert manager.satCount(parity) == 1 << (k - 1)
@@ -0,0 +1,45 @@
+"""Garbage collection must keep every live bdd intact."""
+import gc
+import random
+import pytest
+import boolfunc
+import myBdd
+from manager import BDDManager
+from truth import assertFunction, coverValue, randomCover
+
+
+def build(cubes, numVars, manager):
+    """returns the bdd of a cube list in manager"""
+    return myBdd.BDD(boolfunc.Expression(cubes=cubes, numVars=numVars), manager=manager)
+
+
+def testCollectionUnderNodeBudget():
+    rng = random.Random(5)
+    n = 10
+    manager = BDDManager(list(range(1, n + 1)), maxNodes=200)
+    kept = list()
+    for t in range(100):
+        F = randomCover(n, rng.randint(1, 6), rng)
+        bdd = build(F, n, manager)
+        if t % 10 == 0:
+            kept.append((F, bdd))
+        union = bdd | kept[-1][1]
+        if t % 15 == 0:
+            kept.append((F + kept[-1][0], union))
+        del bdd, union
+        gc.collect()
+    assert manager.stats()["collections"] > 0
+    for F, bdd in kept:
+        assertFunction(manager, bdd.root, lambda a: coverValue(F, a), n)
+
+
+def testReferencedRootsSurviveCollection():
+    manager = BDDManager([1, 2, 3])
+    root = manager.ref(manager.apply("and", manager.variable(1), manager.variable(2)))
+    manager.collect()
+    assertFunction(manager, root, lambda a: a[1] and a[2], 3)
+    manager.deref(root)
+    manager.collect()
+    assert manager.size() == 1
+    with pytest.raises(ValueError):
+        manager.deref(root)
@@ -0,0 +1,32 @@
+"""The streaming pcn writer and readers."""
+import pytest
+import pcn
+
+
+def testPcnCubeCount(tmp_path):
+    cubes = ((1, -2), (3,))
+    path = tmp_path / "f.pcn"
+    assert pcn.write_cubes(str(path), cubes, 3) == 2
+    assert path.read_text() == "3\n2\n2 1 -2\n1 3\n"
+    pcn.write_cubes(str(path), iter(cubes), 3)
+    assert set(pcn.CubeSource(str(path)).read()) == set(cubes)
+    pcn.write_cubes(str(path), cubes, 3, binary=True)
+    assert len(pcn.CubeSource(str(path))) == 2
+    assert set(pcn.CubeSource(str(path)).read()) == set(cubes)
+
+
+class Shorter(tuple):
+    """a cube tuple whose length is wrong"""
+
+    def __len__(self):
+        return super().__len__() + 1
+
+
+def testFailedWriteKeepsTheFile(tmp_path):
+    path = tmp_path / "f.pcn"
+    pcn.write_cubes(str(path), ((1,),), 1)
+    before = path.read_bytes()
+    with pytest.raises(ValueError):
+        pcn.write_cubes(str(path), Shorter(((1,), (-1,))), 1)
+    assert path.read_bytes() == before
+    assert [p.name for p in tmp_path.iterdir()] == ["f.pcn"]
@@ -0,0 +1,36 @@
+"""Quantification and the relational product against truth tables."""
+import itertools
+import random
+import pytest
+import boolfunc
+import myBdd
+from manager import BDDManager
+from truth import assertFunction, coverValue, randomCover, randomOrdering
+
+
+@pytest.mark.parametrize("seed", range(30))
+def testQuantification(seed):
+    rng = random.Random(seed)
+    n = rng.randint(1, 6)
+    manager = BDDManager(randomOrdering(n, rng), n)
+    F = randomCover(n, rng.randint(0, 6), rng)
+    G = randomCover(n, rng.randint(0, 6), rng)
+    f = myBdd.BDD(boolfunc.Expression(cubes=F, numVars=n), manager=manager)
+    g = myBdd.BDD(boolfunc.Expression(cubes=G, numVars=n), manager=manager)
+    variables = rng.sample(range(1, n + 1), rng.randint(0, n))
+
+    def quantified(function, combine):
+        def value(a):
+            return combine(function({**a, **dict(zip(variables, bits))})
+                           for bits in itertools.product((False, True), repeat=len(variables)))
+        return value
+    fValue = lambda a: coverValue(F, a)  # noqa: E731
+    assertFunction(manager, f.exists(variables).root, quantified(fValue, any), n)
+    assertFunction(manager, f.forall(variables).root, quantified(fValue, all), n)
+    assertFunction(manager, f.andExists(g, variables).root,
+                   quantified(lambda a: fValue(a) and coverValue(G, a), any), n)
+    x = rng.randint(1, n)
+    for value in (False, True):
+        assertFunction(manager, f.cofactor(x, value).root, lambda a: fValue({**a, x: value}), n)
+    assertFunction(manager, f.booleanDifference(x).root,
+                   lambda a: fValue({**a, x: True}) != fValue({**a, x: False}), n)
@@ -0,0 +1,55 @@
+"""Level swapping and sifting must keep every live bdd intact."""
+import gc
+import random
+import pytest
+import boolfunc
+import myBdd
+from manager import BDDManager
+from truth import assertFunction, coverValue, randomCover, randomOrdering
+from test_manager import assertCanonical
+
+
+def build(cubes, numVars, manager):
+    """returns the bdd of a cube list in manager"""
+    return myBdd.BDD(boolfunc.Expression(cubes=cubes, numVars=numVars), manager=manager)
+
+
+@pytest.mark.parametrize("seed", range(30))
+def testSwapAndSiftKeepFunctions(seed):
+    rng = random.Random(seed)
+    n = rng.randint(2, 7)
+    manager = BDDManager(randomOrdering(n, rng))
+    covers = [randomCover(n, rng.randint(0, 6), rng) for _ in range(3)]
+    bdds = [build(F, n, manager) for F in covers]
+    xor = bdds[0] ^ bdds[1]
+    for _ in range(3):
+        manager.swapLevels(rng.randrange(n - 1))
+        for bdd, F in zip(bdds, covers):
+            assertFunction(manager, bdd.root, lambda a: coverValue(F, a), n)
+    manager.reorder()
+    for bdd, F in zip(bdds, covers):
+        assertFunction(manager, bdd.root, lambda a: coverValue(F, a), n)
+        assert build(F, n, manager) == bdd
+    assert bdds[0] ^ bdds[1] == xor
+    assertCanonical(manager)
+
+
+def testEqualHandlesAreTrackedSeparately():
+    cubes = ((1, 2), (-3, 4), (2, -4))
+    manager = BDDManager([1, 2, 3, 4])
+    a, b = build(cubes, 4, manager), build(cubes, 4, manager)
+    count = b.satCount()
+    del a
+    gc.collect()
+    manager.collect()
+    manager.reorder()
+    assert b.satCount() == count
+    x = build(cubes, 4, manager)
+    y = x | x
+    del x
+    gc.collect()
+    manager.collect()
+    assertFunction(manager, y.root, lambda a: coverValue(cubes, a), 4)
+    del b, y
+    gc.collect()
+    assert not manager.handles
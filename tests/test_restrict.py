@@ -0,0 +1,67 @@
+"""Generalized cofactors and batched cube cofactors against truth tables."""
+import random
+import pytest
+import boolfunc
+import myBdd
+from manager import BDDManager
+from truth import assertFunction, assignments, coverValue, edgeValue, randomCover, randomOrdering
+
+
+def randomPair(seed):
+    """returns a manager, two random covers and their bdds"""
+    rng = random.Random(seed)
+    n = rng.randint(1, 6)
+    manager = BDDManager(randomOrdering(n, rng), n)
+    F = randomCover(n, rng.randint(0, 6), rng)
+    G = randomCover(n, rng.randint(0, 6), rng)
+    f = myBdd.BDD(boolfunc.Expression(cubes=F, numVars=n), manager=manager)
+    g = myBdd.BDD(boolfunc.Expression(cubes=G, numVars=n), manager=manager)
+    return rng, manager, n, (F, f), (G, g)
+
+
+@pytest.mark.parametrize("seed", range(60))
+def testRestrictAndConstrain(seed):
+    rng, manager, n, (F, f), (G, g) = randomPair(seed)
+    care = g.root
+    if rng.random() < 0.3:
+        literals = rng.sample(range(1, n + 1), rng.randint(1, n))
+        care = manager.cube(tuple(v if rng.random() < 0.5 else -v for v in literals))
+    restricted = manager.restrict(f.root, care)
+    constrained = manager.constrain(f.root, care)
+    for a in assignments(n):
+        if edgeValue(manager, care, a):
+            assert edgeValue(manager, restricted, a) == coverValue(F, a)
+            assert edgeValue(manager, constrained, a) == coverValue(F, a)
+    assert manager.countNodes(restricted) <= manager.countNodes(f.root)
+    if care != manager.ZERO:
+        assert manager.apply("and", constrained, care) == manager.apply("and", f.root, care)
+        assert manager.constrain(f.root ^ 1, care) == constrained ^ 1
+
+
+@pytest.mark.parametrize("seed", range(20))
+def testCofactorCubes(seed):
+    rng, manager, n, (F, f), _ = randomPair(seed)
+    cubes = [tuple(v if rng.random() < 0.5 else -v
+                   for v in rng.sample(range(1, n + 1), rng.randint(0, n))) for _ in range(8)]
+    for cube, cofactor in zip(cubes, f.cofactors(cubes)):
+        fixed = {abs(l): l > 0 for l in cube}
+        assertFunction(manager, cofactor.root, lambda a: coverValue(F, {**a, **fixed}), n)
+    with pytest.raises(ValueError):
+        manager.cofactorCubes(f.root, [(1, -1)])
+
+
+@pytest.mark.parametrize("seed", range(5))
+def testBatchedCofactorsUnderNodeBudget(seed):
+    rng = random.Random(seed)
+    n = 10
+    F = tuple(tuple(v if rng.random() < 0.5 else -v for v in rng.sample(range(1, n + 1), 3))
+              for _ in range(12))
+    bdd = myBdd.BDD(boolfunc.Expression(cubes=F, numVars=n), manager=BDDManager(list(range(1, n + 1))))
+    manager = bdd.manager
+    manager.collect()
+    manager.maxNodes = manager.size() + 1
+    cubes = [(10,), (9,), (-9, -10), (8,), (-8,)]
+    for cube, cofactor in zip(cubes, bdd.cofactors(cubes)):
+        fixed = {abs(l): l > 0 for l in cube}
+        assertFunction(manager, cofactor.root, lambda a: coverValue(F, {**a, **fixed}), n)
+    assert not manager.rootRefs
@@ -0,0 +1,57 @@
+"""Set operations on zdds against python sets of cubes."""
+import random
+import pytest
+import boolfunc
+import myBdd
+import urp
+from manager import BDDManager
+from zdd import ZDD, ZDDManager
+from truth import assertFunction, assignments, coverValue, randomCover, randomOrdering
+
+
+def cubeSet(cubes):
+    """returns a cube list as a set of literal sets"""
+    return {frozenset(c) for c in cubes}
+
+
+@pytest.mark.parametrize("seed", range(40))
+def testSetOperations(seed):
+    rng = random.Random(seed)
+    n = rng.randint(1, 6)
+    ordering = randomOrdering(n, rng)
+    manager = ZDDManager(ordering, n)
+    F = randomCover(n, rng.randint(0, 8), rng)
+    G = randomCover(n, rng.randint(0, 8), rng)
+    if rng.random() < 0.1:
+        F += ((),)
+    f, g = manager.fromCubes(F), manager.fromCubes(G)
+    assert cubeSet(manager.paths(f)) == cubeSet(F)
+    assert manager.count(f) == len(cubeSet(F))
+    assert cubeSet(manager.paths(manager.union(f, g))) == cubeSet(F) | cubeSet(G)
+    assert cubeSet(manager.paths(manager.intersection(f, g))) == cubeSet(F) & cubeSet(G)
+    assert cubeSet(manager.paths(manager.difference(f, g))) == cubeSet(F) - cubeSet(G)
+    minimal = {c for c in cubeSet(F) if not any(d < c for d in cubeSet(F))}
+    assert cubeSet(manager.paths(manager.minimize(f))) == minimal
+    for x in range(1, n + 1):
+        assert cubeSet(manager.paths(manager.cofactor(f, x, True))) == \
+            cubeSet(urp.positiveCofactor(F, x))
+        assert cubeSet(manager.paths(manager.cofactor(f, x, False))) == \
+            cubeSet(urp.negativeCofactor(F, x))
+    bddManager = BDDManager(ordering, n)
+    u = manager.toBdd(f, bddManager)
+    assertFunction(bddManager, u, lambda a: coverValue(F, a), n)
+    paths = list(manager.paths(manager.fromBdd(bddManager, u)))
+    for a in assignments(n):
+        assert coverValue(paths, a) == coverValue(F, a)
+
+
+def testWrapperAndPcnRoundTrip(tmp_path):
+    exp = boolfunc.Expression(cubes=((1, -2), (2, 3), (1, -2, 4)), numVars=4)
+    z = ZDD(exp)
+    assert len(z) == 3 and len(z.minimize()) == 2
+    z.writePcn(str(tmp_path / "z.pcn"))
+    z.writePcn(str(tmp_path / "z.bin"), binary=True)
+    assert ZDD.fromPcn(str(tmp_path / "z.pcn"), manager=z.manager) == z
+    assert ZDD.fromPcn(str(tmp_path / "z.bin"), manager=z.manager) == z
+    bdd = myBdd.BDD(exp, ordering=[1, 2, 3, 4])
+    assert ZDD.fromBDD(bdd, z.manager).toBDD(bdd.manager) == bdd
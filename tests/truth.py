@@ -0,0 +1,43 @@
+"""Brute force truth tables the tests compare the diagrams against."""
+import itertools
+
+
+def assignments(numVars):
+    """yields every assignment of the variables 1..numVars as a dict"""
+    for bits in itertools.product((False, True), repeat=numVars):
+        yield dict(zip(range(1, numVars + 1), bits))
+
+
+def coverValue(cubes, assignment):
+    """returns the value of a cube list under an assignment"""
+    return any(all(assignment[abs(l)] == (l > 0) for l in cube) for cube in cubes)
+
+
+def edgeValue(manager, u, assignment):
+    """returns the value of the function of the edge u under an assignment"""
+    while u > manager.ZERO:
+        lo, hi = manager._children(u)
+        u = hi if assignment[manager.nodes.var[u >> 1]] else lo
+    return u == manager.ONE
+
+
+def randomCover(numVars, numCubes, rng):
+    """returns a random cube list over the variables 1..numVars"""
+    cubes = list()
+    for _ in range(numCubes):
+        variables = rng.sample(range(1, numVars + 1), rng.randint(1, numVars))
+        cubes.append(tuple(v if rng.random() < 0.5 else -v for v in variables))
+    return tuple(cubes)
+
+
+def randomOrdering(numVars, rng):
+    """returns a random ordering of the variables 1..numVars"""
+    ordering = list(range(1, numVars + 1))
+    rng.shuffle(ordering)
+    return ordering
+
+
+def assertFunction(manager, u, function, numVars):
+    """checks the edge u against a python predicate on every assignment"""
+    for assignment in assignments(numVars):
+        assert edgeValue(manager, u, assignment) == function(assignment), assignment
@@ -1,6 +1,6 @@
 # implementation of the URP algorithms to perform boolean operations
 import operator
-from collections import defaultdict
+from collections import OrderedDict, defaultdict, namedtuple
 from itertools import chain
 
 
@@ -29,6 +29,12 @@ def complement_cube(cube: tuple[list]) -> tuple[list]:
     return tuple((-v,) for v in cube)
 
 
+def canonical(cubes):
+    """returns a canonical form of a cube list: sorted cubes of literals sorted by variable
+    """
+    return tuple(sorted(set(tuple(sorted(set(cube), key=abs)) for cube in cubes)))
+
+
 def _all_max(values, key=None):
     maxTotal = max(values, key=key)
     return (v for v in values if key(v) == key(maxTotal))
@@ -39,16 +45,21 @@ def _all_min(values, key=None):
     return (v for v in values if key(v) == key(minTotal))
 
 
-def _most_binate(cubes):
-    """Returns the variable that appears in the most cubes
+def literal_counts(cubes):
+    """Returns {var: [negative, positive, total]} occurrence counts of a cube list
     """
-    # Find the variable that occurs in the most cubes
     counts = defaultdict(lambda: [0, 0, 0])
-    # counts = {var: [positive, negative, total]}
     for cube in cubes:
         for v in cube:
             counts[abs(v)][v > 0] += 1
             counts[abs(v)][2] += 1
+    return counts
+
+
+def _most_binate(cubes):
+    """Returns the variable that appears in the most cubes
+    """
+    counts = literal_counts(cubes)
     # Find the variable that occurs in the most cubes
     binate = tuple((v, c) for v, c in counts.items() if c[0] > 0 and c[1] > 0)
     if len(binate) > 0:
@@ -64,6 +75,15 @@ def _most_binate(cubes):
     return choice
 
 
+def isPresent(cubes, x):
+    """Returns true if the variable x appears in any cube of the cube list"""
+    for c in cubes:
+        for l in c:
+            if abs(l) == x:
+                return True
+    return False
+
+
 def generalCofactor(cubes: tuple[list], x: int):
     """Returns the positive cofactor of cubes with respect to x"""
     return tuple(sorted(tuple(c for c in cube if c != x)
@@ -123,28 +143,185 @@ def smoothing(cubes, x):
     return cubes_or(pCf, nCf)
 
 
+# maximum number of canonical covers whose complement is memoized
+COMPLEMENT_CACHE_SIZE = 1 << 14
+
+CacheInfo = namedtuple("CacheInfo", ("hits", "misses", "maxsize", "currsize"))
+# least recently used memo of the complements of canonical covers
+_complementMemo = OrderedDict()
+_complementCounts = [0, 0]
+
+
+def scc(cubes):
+    """Returns the cube list without the cubes contained in another cube"""
+    kept = list()
+    # kept cubes are indexed by their smallest literal, a cube can only be
+    # contained in the kept cubes indexed by one of its own literals
+    index = defaultdict(list)
+    # bigger cubes (fewer literals) are kept first so they can absorb the others
+    for cube in sorted(set(map(frozenset, cubes)), key=len):
+        if len(cube) == 0:
+            # the all don't care cube contains every other cube
+            return ((),)
+        if not any(k <= cube for l in cube for k in index.get(l, ())):
+            kept.append(cube)
+            index[min(cube)].append(cube)
+    return tuple(tuple(sorted(cube, key=abs)) for cube in kept)
+
+
 def complement(cubes):
     """Returns the complement of a cube list using URP"""
-    # check if F is simple enough to complement it directly and quit
+    return _complement(canonical(cubes))
+
+
+def _directComplement(cubes):
+    """Returns the complement of a cover simple enough to complement directly, else None"""
     if len(cubes) == 0:
         # Boolean equation "0"
         # Return a single don't care cube
-        result = ((),)
-    elif len(cubes) == 1:
+        return ((),)
+    if len(cubes) == 1:
         # One cube list, use demorgan's law
-        result = complement_cube(cubes[0])
-    elif any(len(c) == 0 for c in cubes):
+        return complement_cube(cubes[0])
+    if any(len(c) == 0 for c in cubes):
         # Boolean F = stuff + 1
         # Return empty cube list, or "1"
-        result = ()
-    else:
-        # Find the variable that occurs in the most cubes
-        x = _most_binate(cubes)
-        # Find the positive and negative cofactors
-        pCubes = complement(positiveCofactor(cubes, x))
-        nCubes = complement(negativeCofactor(cubes, x))
-        p = cubes_var_and(pCubes, x)
-        n = cubes_var_and(nCubes, -x)
-        result = cubes_or(p, n)
-
-    return result
+        return ()
+    return None
+
+
+def _mergeComplements(cubes, x, pCubes, nCubes):
+    """Returns the complement of cubes from the complements of its cofactors by x"""
+    positive, negative = _polarities(cubes)
+    if x not in negative:
+        # F positive unate in x: F = x.Fx + Fx' with Fx' <= Fx, so
+        # F' = (Fx)' + x'.(Fx')' and the positive part needs no literal;
+        # only those cubes can contain the others, prune by containment
+        return scc(chain(pCubes, cubes_var_and(nCubes, -x)))
+    if x not in positive:
+        # F negative unate in x: symmetric case, F' = (Fx')' + x.(Fx)'
+        return scc(chain(nCubes, cubes_var_and(pCubes, x)))
+    # both cofactor complements are free of contained cubes and a cube
+    # with x or x' can only be contained in a cube common to both of them
+    common = set(pCubes).intersection(nCubes)
+    p = cubes_var_and((c for c in pCubes if c not in common), x)
+    n = cubes_var_and((c for c in nCubes if c not in common), -x)
+    return tuple(chain(common, p, n))
+
+
+def _complement(cubes):
+    """Returns the complement of a canonical cube list, memoized on the cover"""
+    # the Shannon expansion runs on an explicit stack of tasks instead of recursion:
+    # ("complement", cubes) pushes the complement of cubes on results and
+    # ("merge", cubes, x) combines the complements of its two cofactors
+    results = list()
+    tasks = [("complement", cubes)]
+    while tasks:
+        task = tasks.pop()
+        if task[0] == "complement":
+            cubes = task[1]
+            result = _complementMemo.get(cubes)
+            if result is not None:
+                _complementCounts[0] += 1
+                _complementMemo.move_to_end(cubes)
+                results.append(result)
+                continue
+            _complementCounts[1] += 1
+            result = _directComplement(cubes)
+            if result is not None:
+                _remember(cubes, result)
+                results.append(result)
+                continue
+            # Find the variable that occurs in the most cubes
+            x = _most_binate(cubes)
+            tasks.append(("merge", cubes, x))
+            # cofactors of a canonical cover keep their literals sorted, only
+            # the duplicates left by removing x have to go
+            tasks.append(("complement", tuple(sorted(set(negativeCofactor(cubes, x))))))
+            tasks.append(("complement", tuple(sorted(set(positiveCofactor(cubes, x))))))
+        else:
+            _, cubes, x = task
+            nCubes = results.pop()
+            pCubes = results.pop()
+            result = _mergeComplements(cubes, x, pCubes, nCubes)
+            _remember(cubes, result)
+            results.append(result)
+    return results.pop()
+
+
+def _remember(cubes, result):
+    """Stores the complement of cubes, evicting the least recently used entry"""
+    _complementMemo[cubes] = result
+    if len(_complementMemo) > COMPLEMENT_CACHE_SIZE:
+        _complementMemo.popitem(last=False)
+
+
+def complementCacheInfo():
+    """Returns the hit and miss counts of the complement memo cache"""
+    return CacheInfo(_complementCounts[0], _complementCounts[1],
+                     COMPLEMENT_CACHE_SIZE, len(_complementMemo))
+
+
+def clearComplementCache():
+    """Empties the complement memo cache"""
+    _complementMemo.clear()
+    _complementCounts[0] = _complementCounts[1] = 0
+
+
+def _polarities(cubes):
+    """Returns the sets of variables appearing in positive and in negative form"""
+    positive, negative = set(), set()
+    for cube in cubes:
+        for v in cube:
+            if v > 0:
+                positive.add(v)
+            else:
+                negative.add(-v)
+    return positive, negative
+
+
+def tautology(cubes):
+    """Returns true if the cube list is a tautology using URP"""
+    # covers left to check, a split pushes both cofactors instead of recursing
+    stack = [cubes]
+    while stack:
+        cubes = stack.pop()
+        while True:
+            # a cover with the all don't care cube is a tautology
+            if any(len(c) == 0 for c in cubes):
+                cubes = None
+                break
+            # the empty cover is the zero function
+            if len(cubes) == 0:
+                return False
+            positive, negative = _polarities(cubes)
+            # literals whose column has a single polarity
+            unate = (positive - negative) | {-v for v in negative - positive}
+            if not unate:
+                break
+            if len(unate) == len(positive) + len(negative):
+                # a unate cover is a tautology only if it has the universal cube
+                return False
+            # F is a tautology iff its cofactor against every unate literal is,
+            # that cofactor only keeps the cubes without the unate literals
+            cubes = tuple(c for c in cubes if unate.isdisjoint(c))
+        if cubes is not None:
+            # split on the most binate variable, both cofactors must be tautologies
+            x = _most_binate(cubes)
+            stack.append(negativeCofactor(cubes, x))
+            stack.append(positiveCofactor(cubes, x))
+    return True
+
+
+def cubeCofactor(cubes, cube):
+    """Returns the cofactor of a cube list with respect to every literal of cube"""
+    cube = set(cube)
+    negated = {-v for v in cube}
+    return tuple(tuple(v for v in c if v not in cube)
+                 for c in cubes if negated.isdisjoint(c))
+
+
+def covers(left, right):
+    """Returns true if the cube list left contains the cube list right"""
+    # right is contained in left iff left cofactored by every cube of right is a tautology
+    return all(tautology(cubeCofactor(left, cube)) for cube in right)
@@ -0,0 +1,156 @@
+"""Module which derives variable orderings for a BDD from a cube list.
+
+Every heuristic takes a cube list and the number of variables and returns a
+complete ordering of the variables 1..numVars; variables that do not appear
+in the cubes are placed last. `best` builds the top candidates in a process
+pool and keeps the ordering giving the smallest BDD within a time budget.
+"""
+import multiprocessing
+import time
+from collections import defaultdict
+import urp
+
+
+def _complete(order, numVars):
+    """returns order followed by the missing variables of 1..numVars"""
+    seen = set(order)
+    return list(order) + [v for v in range(1, numVars + 1) if v not in seen]
+
+
+def frequency(cubes, numVars):
+    """returns the variables by decreasing number of occurrences, ties by index"""
+    counts = urp.literal_counts(cubes)
+    order = sorted(counts, key=lambda v: (-counts[v][2], v))
+    return _complete(order, numVars)
+
+
+def binate(cubes, numVars):
+    """returns the binate variables first, each group as urp picks splitting variables
+
+    Variables in both polarities come first, by decreasing occurrences and
+    then by increasing imbalance between the polarities, like _most_binate.
+    """
+    counts = urp.literal_counts(cubes)
+
+    def key(v):
+        neg, pos, total = counts[v]
+        return (not (neg and pos), -total, abs(pos - neg), v)
+    return _complete(sorted(counts, key=key), numVars)
+
+
+def force(cubes, numVars, iterations=20):
+    """returns the FORCE ordering: variables of a cube are pulled towards each other
+
+    Each cube is a hyperedge; on every iteration a cube's center of gravity is
+    the mean position of its variables and a variable moves to the mean center
+    of the cubes it belongs to. Stops when the ordering no longer changes.
+    """
+    order = frequency(cubes, numVars)
+    edges = [tuple(set(map(abs, c))) for c in cubes if len(c) > 1]
+    if not edges:
+        return order
+    incident = defaultdict(list)
+    for e, cube in enumerate(edges):
+        for v in cube:
+            incident[v].append(e)
+    for _ in range(iterations):
+        position = {v: idx for idx, v in enumerate(order)}
+        centers = [sum(position[v] for v in cube) / len(cube) for cube in edges]
+        target = {v: (sum(centers[e] for e in incident[v]) / len(incident[v])
+                      if incident[v] else position[v]) for v in order}
+        newOrder = sorted(order, key=lambda v: (target[v], position[v]))
+        if newOrder == order:
+            break
+        order = newOrder
+    return order
+
+
+def minato(cubes, numVars):
+    """returns the Minato dynamic weight assignment ordering
+
+    The function gets weight 1, shared equally by its cubes, and each cube
+    shares its weight equally among its literals. The variable with the
+    largest weight is placed next, removed from the cubes, and the weights
+    are assigned again on what is left.
+    """
+    cubes = [set(map(abs, c)) for c in cubes]
+    order = list()
+    while True:
+        cubes = [c for c in cubes if c]
+        if not cubes:
+            break
+        weights = defaultdict(float)
+        for cube in cubes:
+            share = 1.0 / (len(cubes) * len(cube))
+            for v in cube:
+                weights[v] += share
+        var = min(weights, key=lambda v: (-weights[v], v))
+        order.append(var)
+        for cube in cubes:
+            cube.discard(var)
+    return _complete(order, numVars)
+
+
+# heuristics by name, in the order their candidates are tried by best
+HEURISTICS = {
+    "minato": minato,
+    "force": force,
+    "binate": binate,
+    "frequency": frequency,
+}
+
+
+def heuristic(name, cubes, numVars):
+    """returns the ordering of the named heuristic"""
+    try:
+        return HEURISTICS[name](cubes, numVars)
+    except KeyError as error:
+        raise ValueError(f"unknown ordering heuristic {name}") from error
+
+
+def candidates(cubes, numVars, k=None):
+    """returns up to k distinct orderings, one per heuristic"""
+    result = list()
+    for function in HEURISTICS.values():
+        order = function(cubes, numVars)
+        if order not in result:
+            result.append(order)
+    return result[:k]
+
+
+def _buildSize(cubes, numVars, ordering):
+    """builds the bdd of cubes with ordering and returns its node count"""
+    # imported here because myBdd uses this module for its default ordering
+    import boolfunc
+    import myBdd
+    bdd = myBdd.BDD(boolfunc.Expression(cubes=cubes, numVars=numVars), ordering)
+    return bdd.manager.countNodes(bdd.root)
+
+
+def best(cubes, numVars, k=4, timeBudget=None, workers=None):
+    """returns (ordering, node count) of the smallest bdd among the top k candidates
+
+    The candidates are built in a process pool. Builds still running when the
+    time budget in seconds runs out are abandoned; if none finished, the first
+    candidate is returned with a node count of None.
+    """
+    deadline = None if timeBudget is None else time.monotonic() + timeBudget
+    orders = candidates(cubes, numVars, k)
+    bestOrder, bestSize = orders[0], None
+    pool = multiprocessing.Pool(workers)
+    try:
+        results = [pool.apply_async(_buildSize, (cubes, numVars, o)) for o in orders]
+        for result in results:
+            result.wait(None if deadline is None else max(0.0, deadline - time.monotonic()))
+        # keep the smallest bdd, ties go to the earlier heuristic
+        for order, result in zip(orders, results):
+            if not result.ready():
+                continue
+            size = result.get()
+            if bestSize is None or size < bestSize:
+                bestOrder, bestSize = order, size
+    finally:
+        # do not wait for the abandoned builds
+        pool.terminate()
+        pool.join()
+    return bestOrder, bestSize
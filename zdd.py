@@ -0,0 +1,475 @@
+"""Module which stores cube sets as zero-suppressed decision diagrams.
+
+A ZDD represents a set of cubes rather than a Boolean function: every
+literal is a ZDD variable, a path to the one terminal is a cube made of the
+literals whose hi edge it takes, and a node whose hi child is the empty set
+is removed. Sparse covers with millions of cubes share their common
+suffixes, so union, intersection, difference, cofactoring and single cube
+containment run in time proportional to the diagram instead of the cube
+count.
+
+The literals x and x' of a variable x get the codes 2x and 2x + 1 and the
+two adjacent levels of x in the ordering, x first. Nodes live in a
+manager.NodeTable and results in manager.ComputedTable caches, the
+operations run on the explicit stack of manager.run like the BDD ones.
+Nodes are never collected, they live as long as their manager.
+"""
+import collections
+import boolfunc
+import myBdd
+import pcn
+from manager import BDDManager, ComputedTable, NodeTable, run
+
+
+def literalCode(literal):
+    """ returns the zdd variable code of a signed literal """
+    return 2 * literal if literal > 0 else 1 - 2 * literal
+
+
+def codeLiteral(code):
+    """ returns the signed literal of a zdd variable code """
+    return -(code >> 1) if code & 1 else code >> 1
+
+
+class ZDDManager:
+    """class for the manager shared by many ZDDs"""
+
+    # the empty set of cubes and the set holding only the tautology cube
+    EMPTY = 0
+    BASE = 1
+    # names of the set operations supported by apply
+    OPERATIONS = ("union", "intersection", "difference")
+
+    def __init__(self, ordering: list, numVars=None, cacheSize=1 << 16) -> None:
+        """ constructor for ZDDManager class """
+        self.ordering = list(ordering)
+        if len(set(self.ordering)) != len(self.ordering) or any(v <= 0 for v in self.ordering):
+            raise ValueError("invalid ordering list")
+        self.numVars = max(self.ordering, default=0) if numVars is None else numVars
+        # code of the literal at every level and level of every literal code
+        self.codes = [literalCode(s * v) for v in self.ordering for s in (1, -1)]
+        self.levels = {code: level for level, code in enumerate(self.codes)}
+        self.nodes = NodeTable(terminals=2)
+        self.computed = ComputedTable(cacheSize)
+
+    def getLevel(self, u):
+        """ returns the level of the top literal of u, below every literal for a terminal """
+        if u <= self.BASE:
+            return len(self.codes)
+        return self.levels[self.nodes.var[u]]
+
+    def getNode(self, code, lo, hi):
+        """ returns the unique node (code, lo, hi) applying the zero-suppression rule """
+        # cubes containing the literal are the hi child, none means the literal is absent
+        if hi == self.EMPTY:
+            return lo
+        return self.nodes.find(code, lo, hi)
+
+    def _cofactors(self, u, level):
+        """ returns the cubes of u without and with the literal at level, the latter without it """
+        if self.getLevel(u) == level:
+            return self.nodes.lo[u], self.nodes.hi[u]
+        return u, self.EMPTY
+
+    def cube(self, cube):
+        """ returns the set holding the single cube """
+        return self.fromCubes((cube,))
+
+    def fromCubes(self, cubes):
+        """ returns the set of a cube list or any iterable of cubes, duplicates are merged """
+        levels = self.levels
+        try:
+            rows = sorted({tuple(sorted({levels[literalCode(l)] for l in cube})) for cube in cubes})
+        except KeyError as error:
+            raise ValueError("cube variable is not in the ordering") from error
+        return run(self._build(rows, 0, len(rows), 0, False))
+
+    def _build(self, rows, i, j, depth, base):
+        """ returns the set of rows[i:j] for the terminal cases or a generator building it
+
+        The sorted rows[i:j] share their first depth literal levels; base adds
+        the cube ending there.
+        """
+        if i < j and len(rows[i]) == depth:
+            base, i = True, i + 1
+        if i == j:
+            return self.BASE if base else self.EMPTY
+        return self._buildExpand(rows, i, j, depth, base)
+
+    def _buildExpand(self, rows, i, j, depth, base):
+        """ generator splitting rows[i:j] on the smallest literal level at depth """
+        level = rows[i][depth]
+        k = i + 1
+        while k < j and rows[k][depth] == level:
+            k += 1
+        hi = yield self._build(rows, i, k, depth + 1, False)
+        lo = yield self._build(rows, k, j, depth, base)
+        return self.getNode(self.codes[level], lo, hi)
+
+    def paths(self, u):
+        """ yields every cube of u lazily, as a tuple of literals in the ordering """
+        nodes = self.nodes
+        stack = [(u, ())]
+        while stack:
+            v, cube = stack.pop()
+            if v == self.BASE:
+                yield cube
+            elif v != self.EMPTY:
+                stack.append((nodes.hi[v], cube + (codeLiteral(nodes.var[v]),)))
+                stack.append((nodes.lo[v], cube))
+
+    def count(self, u):
+        """ returns the number of cubes of u in O(nodes) """
+        nodes = self.nodes
+        count = {self.EMPTY: 0, self.BASE: 1}
+        for v in self.postorder(u):
+            if v > self.BASE:
+                count[v] = count[nodes.lo[v]] + count[nodes.hi[v]]
+        return count[u]
+
+    def postorder(self, root):
+        """ yields every node reachable from root once in DFS post-order, lo before hi """
+        nodes = self.nodes
+        visited = set()
+        stack = [(root, False)]
+        while stack:
+            u, expanded = stack.pop()
+            if expanded:
+                yield u
+                continue
+            if u in visited:
+                continue
+            visited.add(u)
+            if u <= self.BASE:
+                yield u
+                continue
+            stack.append((u, True))
+            for child in (nodes.hi[u], nodes.lo[u]):
+                if child not in visited:
+                    stack.append((child, False))
+
+    def countNodes(self, *roots):
+        """ returns the number of nodes reachable from roots including terminals """
+        visited = set()
+        for root in roots:
+            visited.update(self.postorder(root))
+        return len(visited)
+
+    def apply(self, op, f, g):
+        """ returns the set operation op, union, intersection or difference, of f and g """
+        if op not in self.OPERATIONS:
+            raise ValueError(f"unknown operation {op}")
+        return run(self._apply(op, f, g))
+
+    def union(self, f, g):
+        """ returns the cubes of f or g """
+        return self.apply("union", f, g)
+
+    def intersection(self, f, g):
+        """ returns the cubes of both f and g """
+        return self.apply("intersection", f, g)
+
+    def difference(self, f, g):
+        """ returns the cubes of f that are not cubes of g """
+        return self.apply("difference", f, g)
+
+    def _apply(self, op, f, g):
+        """ returns op(f, g) for the terminal cases or a generator computing it """
+        empty = self.EMPTY
+        if op == "union":
+            if f == empty or f == g:
+                return g
+            if g == empty:
+                return f
+        elif op == "intersection":
+            if f == empty or g == empty:
+                return empty
+            if f == g:
+                return f
+        else:
+            if f == empty or f == g:
+                return empty
+            if g == empty:
+                return f
+        # union and intersection commute, one cache entry serves both operand orders
+        if op != "difference" and f > g:
+            f, g = g, f
+        result = self.computed.get((op, f, g))
+        if result is not None:
+            return result
+        return self._applyExpand(op, f, g)
+
+    def _applyExpand(self, op, f, g):
+        """ generator computing op(f, g) on the top literal of f and g """
+        level = min(self.getLevel(f), self.getLevel(g))
+        fLo, fHi = self._cofactors(f, level)
+        gLo, gHi = self._cofactors(g, level)
+        nodeLo = yield self._apply(op, fLo, gLo)
+        nodeHi = yield self._apply(op, fHi, gHi)
+        result = self.getNode(self.codes[level], nodeLo, nodeHi)
+        self.computed.put((op, f, g), result)
+        return result
+
+    def cofactor(self, f, var, value):
+        """ returns the cofactor of the cube set f with respect to var set to value
+
+        As for urp.positiveCofactor, the cubes with the opposite literal are
+        dropped and the literal is removed from the others.
+        """
+        code = literalCode(var)
+        if code not in self.levels:
+            raise ValueError(f"variable {var} is not in the ordering")
+        return run(self._cofactor(f, self.levels[code], bool(value)))
+
+    def _cofactor(self, f, level, value):
+        """ returns the cofactor of f for the terminal cases or a generator computing it """
+        # level is the level of the positive literal, the negative one is just below
+        if self.getLevel(f) > level + 1:
+            return f
+        result = self.computed.get(("cofactor", f, level, value))
+        if result is not None:
+            return result
+        return self._cofactorExpand(f, level, value)
+
+    def _cofactorExpand(self, f, level, value):
+        """ generator computing the cofactor of f """
+        nodes = self.nodes
+        if self.getLevel(f) < level:
+            nodeLo = yield self._cofactor(nodes.lo[f], level, value)
+            nodeHi = yield self._cofactor(nodes.hi[f], level, value)
+            result = self.getNode(nodes.var[f], nodeLo, nodeHi)
+        else:
+            # the cubes with x, then the cubes without x split on x'
+            rest, withX = self._cofactors(f, level)
+            neither, withNotX = self._cofactors(rest, level + 1)
+            if value:
+                # a cube with both x and x' is empty and is dropped as well
+                kept = self._cofactors(withX, level + 1)[0]
+                result = yield self._apply("union", kept, neither)
+            else:
+                result = yield self._apply("union", withNotX, neither)
+        self.computed.put(("cofactor", f, level, value), result)
+        return result
+
+    def minimize(self, f):
+        """ returns f without the cubes contained in another cube of f
+
+        A cube is contained in another one when its literals are a superset of
+        the other cube's literals, so only the minimal literal sets are kept.
+        """
+        return run(self._minimal(f))
+
+    def _minimal(self, f):
+        """ returns the minimal cubes of f for the terminal cases or a generator computing them """
+        if f <= self.BASE:
+            return f
+        result = self.computed.get(("minimal", f))
+        if result is not None:
+            return result
+        return self._minimalExpand(f)
+
+    def _minimalExpand(self, f):
+        """ generator computing the minimal cubes of f """
+        nodes = self.nodes
+        nodeLo = yield self._minimal(nodes.lo[f])
+        nodeHi = yield self._minimal(nodes.hi[f])
+        # a cube x.c is contained in a cube d without x when c is a superset of d
+        nodeHi = yield self._nonSupersets(nodeHi, nodeLo)
+        result = self.getNode(nodes.var[f], nodeLo, nodeHi)
+        self.computed.put(("minimal", f), result)
+        return result
+
+    def _nonSupersets(self, f, g):
+        """ returns the cubes of f whose literals contain no cube of g, or a generator computing them """
+        if f == self.EMPTY:
+            return f
+        # the cubes of g with a literal above the top of f are no subsets of
+        # the cubes of f, skipping them here keeps them out of the cache
+        nodes = self.nodes
+        level = self.getLevel(f)
+        while g > self.BASE and self.levels[nodes.var[g]] < level:
+            g = nodes.lo[g]
+        if g == self.EMPTY:
+            return f
+        # every cube contains the tautology cube
+        if f == g or g == self.BASE:
+            return self.EMPTY
+        result = self.computed.get(("nonSupersets", f, g))
+        if result is not None:
+            return result
+        return self._nonSupersetsExpand(f, g, level)
+
+    def _nonSupersetsExpand(self, f, g, level):
+        """ generator computing the cubes of f whose literals contain no cube of g """
+        fLo, fHi = self._cofactors(f, level)
+        gLo, gHi = self._cofactors(g, level)
+        nodeLo = yield self._nonSupersets(fLo, gLo)
+        # x.c contains a cube d without x when c contains d, and x.d when c contains d
+        nodeHi = yield self._nonSupersets(fHi, gLo)
+        nodeHi = yield self._nonSupersets(nodeHi, gHi)
+        result = self.getNode(self.codes[level], nodeLo, nodeHi)
+        self.computed.put(("nonSupersets", f, g), result)
+        return result
+
+    def fromBdd(self, manager: BDDManager, u):
+        """ returns the set of the disjoint cubes of the paths of the bdd edge u to one """
+        if manager.ordering != self.ordering:
+            return self.fromCubes(manager.paths(u))
+        return run(self._fromBdd(manager, u, dict()))
+
+    def _fromBdd(self, manager, u, memo):
+        """ returns the set of the paths of u for the terminal cases or a generator computing it """
+        if u == manager.ONE:
+            return self.BASE
+        if u == manager.ZERO:
+            return self.EMPTY
+        result = memo.get(u)
+        if result is not None:
+            return result
+        return self._fromBddExpand(manager, u, memo)
+
+    def _fromBddExpand(self, manager, u, memo):
+        """ generator computing the set of the paths of the internal bdd edge u """
+        nodes = manager.nodes
+        var, c = nodes.var[u >> 1], u & 1
+        nodeLo = yield self._fromBdd(manager, nodes.lo[u >> 1] ^ c, memo)
+        nodeHi = yield self._fromBdd(manager, nodes.hi[u >> 1] ^ c, memo)
+        # the cubes of the hi paths get x and those of the lo paths x'
+        code = literalCode(var)
+        result = self.getNode(code, self.getNode(code + 1, self.EMPTY, nodeLo), nodeHi)
+        memo[u] = result
+        return result
+
+    def toBdd(self, f, manager: BDDManager):
+        """ returns the bdd edge of the function covered by the cubes of f """
+        nodes = self.nodes
+        result = {self.EMPTY: manager.ZERO, self.BASE: manager.ONE}
+        for u in self.postorder(f):
+            if u > self.BASE:
+                literal = codeLiteral(nodes.var[u])
+                x = manager.variable(abs(literal))
+                if literal < 0:
+                    x = manager.neg(x)
+                lo, hi = result[nodes.lo[u]], result[nodes.hi[u]]
+                # f = x.hi + lo
+                result[u] = manager.ite(x, manager.apply("or", hi, lo), lo)
+        return result[f]
+
+    def clearCache(self):
+        """ empties the computed table """
+        self.computed.clear()
+
+    def size(self):
+        """ returns the number of nodes in the node store including terminals """
+        return self.nodes.liveCount()
+
+    def levelCounts(self):
+        """ returns the (literal, node count) of every level, top level first """
+        counts = collections.Counter(var for var, _, _ in self.nodes.unique)
+        return [(codeLiteral(code), counts[code]) for code in self.codes]
+
+
+class ZDD:
+    """class for a set of cubes stored as a ZDD"""
+
+    def __init__(self, exp: boolfunc.Expression, ordering=None, manager: ZDDManager = None) -> None:
+        """ constructor for ZDD class, the cubes of exp are the elements of the set """
+        self.exp = exp
+        if manager is None:
+            manager = ZDDManager(range(1, exp.numVars + 1) if ordering is None else ordering,
+                                 exp.numVars)
+        elif ordering is not None and list(ordering) != manager.ordering:
+            raise ValueError("ordering does not match the manager ordering")
+        self.manager = manager
+        self.root = manager.fromCubes(exp.cubes)
+
+    @staticmethod
+    def fromNode(root: int, manager: ZDDManager):
+        """ returns the zdd rooted at an existing node index of the manager """
+        zdd = ZDD.__new__(ZDD)
+        zdd.exp = None
+        zdd.manager = manager
+        zdd.root = root
+        return zdd
+
+    @staticmethod
+    def fromPcn(filePath, ordering=None, manager: ZDDManager = None):
+        """ returns the zdd of the cubes of a text or binary pcn file, streamed from the file """
+        source = pcn.CubeSource(filePath)
+        if manager is None:
+            manager = ZDDManager(range(1, source.numVars + 1) if ordering is None else ordering,
+                                 source.numVars)
+        return ZDD.fromNode(manager.fromCubes(source.cubes()), manager)
+
+    @staticmethod
+    def fromBDD(bdd: myBdd.BDD, manager: ZDDManager = None):
+        """ returns the zdd of the disjoint cubes of the paths of a bdd """
+        if manager is None:
+            manager = ZDDManager(bdd.manager.ordering, bdd.manager.numVars)
+        return ZDD.fromNode(manager.fromBdd(bdd.manager, bdd.root), manager)
+
+    def _operand(self, other):
+        """ returns the root of other after checking it shares the manager """
+        if not isinstance(other, ZDD):
+            raise TypeError("expected a ZDD operand")
+        if other.manager is not self.manager:
+            raise ValueError("zdds must share the same manager")
+        return other.root
+
+    def __or__(self, other):
+        """ returns the union of two zdds """
+        return ZDD.fromNode(self.manager.union(self.root, self._operand(other)), self.manager)
+
+    def __and__(self, other):
+        """ returns the intersection of two zdds """
+        return ZDD.fromNode(self.manager.intersection(self.root, self._operand(other)),
+                            self.manager)
+
+    def __sub__(self, other):
+        """ returns the difference of two zdds """
+        return ZDD.fromNode(self.manager.difference(self.root, self._operand(other)),
+                            self.manager)
+
+    def cofactor(self, var, value):
+        """ returns the zdd of the cofactor with respect to var set to value """
+        return ZDD.fromNode(self.manager.cofactor(self.root, var, value), self.manager)
+
+    def minimize(self):
+        """ returns the zdd without the cubes contained in another cube """
+        return ZDD.fromNode(self.manager.minimize(self.root), self.manager)
+
+    def __eq__(self, other) -> bool:
+        """ returns true if both zdds hold the same cubes """
+        if not isinstance(other, ZDD):
+            return NotImplemented
+        return self.manager is other.manager and self.root == other.root
+
+    def __hash__(self) -> int:
+        """ returns the hash of the zdd root """
+        return hash((id(self.manager), self.root))
+
+    def __len__(self) -> int:
+        """ returns the number of cubes """
+        return self.manager.count(self.root)
+
+    def __iter__(self):
+        """ yields the cubes lazily """
+        return self.manager.paths(self.root)
+
+    def nodeCount(self):
+        """ returns the number of nodes of the zdd including terminals """
+        return self.manager.countNodes(self.root)
+
+    def getExpression(self):
+        """ returns the expression of the cube list """
+        return boolfunc.Expression(cubes=tuple(self), numVars=self.manager.numVars)
+
+    def writePcn(self, filePath, binary=False):
+        """ streams the cubes to a text or binary pcn file, returns the number written """
+        return pcn.write_cubes(filePath, self, self.manager.numVars, binary)
+
+    def toBDD(self, manager: BDDManager = None):
+        """ returns the bdd of the function covered by the cubes """
+        if manager is None:
+            manager = BDDManager(self.manager.ordering, self.manager.numVars)
+        return myBdd.BDD.fromNode(self.manager.toBdd(self.root, manager), manager)